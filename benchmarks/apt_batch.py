@@ -0,0 +1,99 @@
+"""
+Benchmark of 'install_packages_from_list' for apt, comparing one apt-get call
+per package with one batched transaction (bisecting on failures). Uses fake
+'sudo', 'flock' and 'apt-get' executables, where 'apt-get' has a fixed cost
+per invocation (dependency resolution, lock, dpkg triggers) plus a small cost
+per package, and fails if any of the "broken" packages is requested.
+Run via:
+```
+python3 benchmarks/apt_batch.py
+```
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.scripts.python.helpers.processing import (
+    InstallCommands,
+    install_packages_from_list,
+)
+
+FAKE_APT_GET = dedent(
+    """\
+    #!/usr/bin/env bash
+    shift  # install
+    shift  # -y
+    for pkg in "$@"; do
+    \tif [[ " $FAKE_APT_BROKEN " == *" $pkg "* ]]; then
+    \t\tsleep "$FAKE_APT_FIXED_COST"
+    \t\techo "E: Unable to locate package $pkg" >&2
+    \t\texit 100
+    \tfi
+    done
+    sleep "$(awk "BEGIN {print $FAKE_APT_FIXED_COST + $# * $FAKE_APT_PKG_COST}")"
+"""
+)
+
+
+def create_fake_bin(path: Path) -> None:
+    """Create fake 'sudo', 'flock' and 'apt-get' executables in the path."""
+    executables = {
+        "sudo": '#!/usr/bin/env bash\nexec "$@"\n',
+        "flock": '#!/usr/bin/env bash\nshift\nexec "$@"\n',
+        "apt-get": FAKE_APT_GET,
+    }
+    for name, content in executables.items():
+        exe = path / name
+        exe.write_text(content)
+        exe.chmod(0o755)
+
+
+def install(packages: list[str], batch: bool) -> None:
+    """Install the packages, hiding the step output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        install_packages_from_list(InstallCommands.APT, packages, batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("-p", "--packages", type=int, default=100)
+    parser.add_argument("-b", "--broken", type=int, default=2)
+    parser.add_argument("--fixed-cost", type=float, default=0.2)
+    parser.add_argument("--package-cost", type=float, default=0.005)
+    args = parser.parse_args()
+
+    packages = [f"pkg{idx}" for idx in range(args.packages)]
+    broken = packages[:: max(args.packages // max(args.broken, 1), 1)]
+    broken = broken[: args.broken]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_fake_bin(Path(tmpdir))
+        os.environ["PATH"] = f"{tmpdir}{os.pathsep}{os.environ['PATH']}"
+        os.environ["FAKE_APT_FIXED_COST"] = str(args.fixed_cost)
+        os.environ["FAKE_APT_PKG_COST"] = str(args.package_cost)
+
+        for label, broken_packages in (
+            ("all succeed", []),
+            (f"{len(broken)} broken", broken),
+        ):
+            os.environ["FAKE_APT_BROKEN"] = " ".join(broken_packages)
+            single_timings = time_call(
+                lambda: install(packages, batch=False), args.repeat
+            )
+            batch_timings = time_call(
+                lambda: install(packages, batch=True), args.repeat
+            )
+            print_timings(f"per package ({label})", single_timings)
+            print_timings(f"batched ({label})", batch_timings)
+            print_comparison(single_timings, batch_timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of the 'bash_check' latency, comparing sourcing 'helpers.bash' (one
+python start-up plus parsing of every helper file) with the flattened bundle.
+Run via:
+```
+python3 benchmarks/bash_check.py
+```
+"""
+import argparse
+import subprocess
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils.common import PIPX_PYTHON_PATH, CommandKind
+from gurk.utils.interface import (
+    PACKAGE_BASH_HELPERS_PATH,
+    bash_check,
+    get_bash_helpers_bundle,
+)
+
+
+def run_check(helpers_path: str, check_name: str) -> None:
+    """Source the given helpers and run a single check function."""
+    subprocess.run(
+        [
+            CommandKind.BASH.exe,
+            "-c",
+            f"source {helpers_path} && {check_name}",
+        ],
+        capture_output=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument("-c", "--check", default="check_install_vscode")
+    args = parser.parse_args()
+
+    bundle_path = get_bash_helpers_bundle()
+    legacy_timings = time_call(
+        lambda: run_check(PACKAGE_BASH_HELPERS_PATH, args.check), args.repeat
+    )
+    bundle_timings = time_call(
+        lambda: run_check(bundle_path, args.check), args.repeat
+    )
+
+    print_timings("source helpers.bash", legacy_timings)
+    print_timings("source bundle", bundle_timings)
+    print_comparison(legacy_timings, bundle_timings)
+
+    # End-to-end (requires the pipx venv that 'bash_check' activates)
+    if (PIPX_PYTHON_PATH.parent / "activate").is_file():
+        print_timings(
+            "bash_check (end-to-end)",
+            time_call(lambda: bash_check(args.check), args.repeat),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the bash task start-up overhead caused by 'get_config_args'.
+
+Compares parsing the '--system-info' JSON in bash with sourcing a pre-rendered
+'--config-args-file'. Run via:
+```
+python3 benchmarks/bash_startup.py
+```
+"""
+import argparse
+import json
+import subprocess
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils.common import PACKAGE_SRC_PATH, CommandKind
+from gurk.utils.interface import render_bash_config_args
+
+INTERFACE_HELPERS_PATH = (
+    PACKAGE_SRC_PATH / "scripts" / "bash" / "helpers" / "_interface.bash"
+)
+SYSTEM_INFO = {
+    "type": "linux",
+    "kernel": "x86_64",
+    "simulate_hardware": False,
+    "name": "ubuntu",
+    "codename": "noble",
+    "version": "24.04",
+    "arch": "amd64",
+    "manufacturer": "lenovo",
+}
+
+
+def run_get_config_args(*args: str) -> None:
+    """Source the interface helpers and run 'get_config_args' once."""
+    subprocess.run(
+        [
+            CommandKind.BASH.exe,
+            "-c",
+            f'source {INTERFACE_HELPERS_PATH} && get_config_args "$@"',
+            "bash",
+            *args,
+        ],
+        check=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp_dir:
+        config_file = Path(tmp_dir) / "config.txt"
+        config_file.touch()
+        config_args_file = Path(tmp_dir) / "config_args.bash"
+        config_args_file.write_text(
+            render_bash_config_args(SYSTEM_INFO, config_file)
+        )
+
+        json_timings = time_call(
+            lambda: run_get_config_args(
+                "--system-info",
+                json.dumps(SYSTEM_INFO),
+                "--config-file",
+                str(config_file),
+            ),
+            args.repeat,
+        )
+        file_timings = time_call(
+            lambda: run_get_config_args(
+                "--config-args-file", str(config_args_file)
+            ),
+            args.repeat,
+        )
+        baseline_timings = time_call(
+            lambda: run_get_config_args(), args.repeat
+        )
+
+    print_timings("bash + helpers (no args)", baseline_timings)
+    print_timings("--system-info JSON", json_timings)
+    print_timings("--config-args-file", file_timings)
+    print_comparison(json_timings, file_timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of creating a generated file structure (empty entries, copies and
+downloads from a local HTTP server), comparing the former serial creation with
+an ownership fix-up per entry with the plan-then-apply engine.
+NOTE: The ownership fix-up runs 'sudo chown/chmod' on the created entries.
+Run via:
+```
+sudo -E python3 benchmarks/filestructure.py
+```
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.scripts.python.helpers.filestructure import (
+    apply_file_op,
+    apply_filestructure,
+    plan_filestructure,
+)
+from gurk.utils.common import stream_print
+from gurk.utils.interface import revert_sudo_permissions
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """HTTP handler without request logging."""
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("--dirs", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--downloads", type=int, default=40)
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+    os.environ.setdefault("SUDO_USER", os.environ.get("USER", "root"))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+        served = tmp_path / "served"
+        served.mkdir()
+        (served / "file.bin").write_bytes(os.urandom(1 << 20))
+        source = tmp_path / "source.txt"
+        source.write_text("source\n")
+
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(_QuietHandler, directory=served)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/file.bin"
+
+        # Every third entry is an empty file/dir, the others copies
+        structure = {
+            f"dir{i}": {
+                f"entry{j}"
+                + (".txt" if j % 2 else ""): (str(source) if j % 3 else None)
+                for j in range(args.entries)
+            }
+            for i in range(args.dirs)
+        }
+        structure["downloads"] = {
+            f"file{i}.bin": url for i in range(args.downloads)
+        }
+        dest = tmp_path / "dest"
+        n_ops = []
+
+        def serial() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            dest.mkdir()
+            for op in plan_filestructure(dest, structure, False, False):
+                apply_file_op(op)
+                revert_sudo_permissions(op.dest)
+
+        def planned() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            dest.mkdir()
+            ops = plan_filestructure(dest, structure, False, False)
+            apply_filestructure(ops, args.jobs)
+            n_ops.append(len(ops))
+
+        serial_timings = time_call(serial, args.repeat)
+        planned_timings = time_call(planned, args.repeat)
+        server.shutdown()
+
+    stream_print(f"{'Operations':<40} {n_ops[0]}")
+    print_timings("serial, fix-up per entry", serial_timings)
+    print_timings(f"plan + apply (jobs={args.jobs})", planned_timings)
+    print_comparison(serial_timings, planned_timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of re-converging an existing file structure with '--force' (copies
+of local files and downloads from a local HTTP server), comparing rewriting
+every entry (the former behaviour) with the diff mode, which only writes
+missing or changed entries.
+Run via:
+```
+python3 benchmarks/filestructure_diff.py
+```
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.scripts.python.helpers import filestructure
+from gurk.scripts.python.helpers.filestructure import (
+    apply_filestructure,
+    plan_filestructure,
+)
+from gurk.utils import downloads
+from gurk.utils.common import stream_print
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """HTTP handler without request logging."""
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("--dirs", type=int, default=20)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--size", type=int, default=1 << 20)
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+        filestructure.FILESTRUCTURE_STATE_PATH = tmp_path / "state.json"
+        filestructure.revert_sudo_permissions = lambda *paths: None
+        downloads.DOWNLOADS_CACHE_PATH = tmp_path / "cache"
+
+        served = tmp_path / "served"
+        sources = tmp_path / "sources"
+        served.mkdir()
+        sources.mkdir()
+        for i in range(args.downloads):
+            (served / f"file{i}.bin").write_bytes(os.urandom(args.size))
+        for i in range(args.files):
+            (sources / f"file{i}.bin").write_bytes(os.urandom(args.size))
+
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(_QuietHandler, directory=served)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        structure = {
+            f"dir{i}": {
+                f"file{j}.bin": str(sources / f"file{j}.bin")
+                for j in range(args.files)
+            }
+            for i in range(args.dirs)
+        }
+        structure["downloads"] = {
+            f"file{i}.bin": f"{url}/file{i}.bin" for i in range(args.downloads)
+        }
+        dest = tmp_path / "dest"
+        dest.mkdir()
+        counts = []
+
+        def converge() -> None:
+            ops = plan_filestructure(dest, structure, True, False)
+            counts.append(apply_filestructure(ops, args.jobs))
+
+        def rewrite() -> None:
+            shutil.rmtree(dest)
+            dest.mkdir()
+            converge()
+
+        converge()
+        rewrite_timings = time_call(rewrite, args.repeat)
+        # One changed source per run
+        diff_timings = time_call(
+            lambda: (
+                (sources / "file0.bin").write_bytes(os.urandom(args.size)),
+                converge(),
+            ),
+            args.repeat,
+        )
+        server.shutdown()
+
+    stream_print(f"{'Entries':<40} {sum(counts[-1].values())}")
+    stream_print(f"{'Diff outcome':<40} {counts[-1]}")
+    print_timings("rewrite every entry", rewrite_timings)
+    print_timings(f"diff (jobs={args.jobs})", diff_timings)
+    print_comparison(rewrite_timings, diff_timings)
+
+
+if __name__ == "__main__":
+    main()
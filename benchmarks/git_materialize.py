@@ -0,0 +1,84 @@
+"""
+Benchmark of materializing a large repository, comparing the former clone
+into a temporary directory followed by a full copy ('shutil.copytree') with
+the checkout from the cached mirror (objects reflinked or hardlinked).
+Run via:
+```
+python3 benchmarks/git_materialize.py
+```
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils import git_repos
+from gurk.utils.common import format_bytes, stream_print
+from gurk.utils.files import get_tree_size
+from gurk.utils.git_repos import checkout_cached_repo, get_cached_repo
+
+
+def git(*args: str, cwd: Path | None = None) -> None:
+    """Run a git command, failing loudly."""
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def create_repo(path: Path, n_files: int, n_commits: int) -> None:
+    """Create a repository with large (incompressible) files."""
+    git("init", "-q", "-b", "main", str(path))
+    for commit in range(n_commits):
+        for i in range(n_files):
+            (path / f"file{i}.bin").write_bytes(os.urandom(1 << 20))
+        git("add", "-A", cwd=path)
+        git("commit", "-q", "-m", f"Commit {commit}", cwd=path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--commits", type=int, default=3)
+    args = parser.parse_args()
+
+    for role in ("AUTHOR", "COMMITTER"):
+        os.environ[f"GIT_{role}_NAME"] = "gurk"
+        os.environ[f"GIT_{role}_EMAIL"] = "gurk@example.com"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+        create_repo(tmp_path / "origin", args.files, args.commits)
+        url = f"file://{tmp_path / 'origin'}"
+        git_repos.GIT_CACHE_PATH = tmp_path / "cache"
+        mirror = get_cached_repo(url)
+        dest = tmp_path / "dest"
+        written = {}
+
+        def clone_and_copy() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            with tempfile.TemporaryDirectory() as clone_dir:
+                git("clone", "-q", "--no-local", url, clone_dir)
+                shutil.copytree(clone_dir, dest)
+            written["copy"] = 2 * get_tree_size(dest)
+
+        def checkout_mirror() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            written["mirror"] = checkout_cached_repo(mirror, url, dest)
+
+        copy_timings = time_call(clone_and_copy, args.repeat)
+        mirror_timings = time_call(checkout_mirror, args.repeat)
+
+    print_timings("clone + copytree", copy_timings)
+    print_timings("checkout from mirror", mirror_timings)
+    print_comparison(copy_timings, mirror_timings)
+    stream_print(
+        f"{'Bytes written per clone':<40} {format_bytes(written['copy'])} -> "
+        f"{format_bytes(written['mirror'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
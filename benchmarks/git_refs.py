@@ -0,0 +1,96 @@
+"""
+Benchmark of the remote ref lookups of a run, comparing one 'ls-remote' per
+'is_git_repo' call with the ref cache (concurrent lookups, reused within and
+across processes). Each 'ls-remote' of the local repositories is delayed to
+simulate a network round trip.
+Run via:
+```
+python3 benchmarks/git_refs.py
+```
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils import git_repos
+from gurk.utils.common import stream_print
+from gurk.utils.git_repos import (
+    get_remote_refs_stats,
+    is_git_repo,
+    resolve_remote_refs,
+    run_git_command,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--repos", type=int, default=4)
+    parser.add_argument("--entries", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+
+        # Fake git that delays 'ls-remote' (the simulated round trip)
+        git = tmp_path / "bin" / "git"
+        git.parent.mkdir()
+        git.write_text(
+            dedent(
+                f"""\
+                #!/usr/bin/env bash
+                [[ "$1" == "ls-remote" ]] && sleep {args.latency}
+                exec {shutil.which("git")} "$@"
+                """
+            )
+        )
+        git.chmod(0o755)
+        os.environ["PATH"] = f"{git.parent}{os.pathsep}{os.environ['PATH']}"
+        git_repos.GIT_CACHE_PATH = tmp_path / "cache"
+
+        urls = []
+        for i in range(args.repos):
+            repo_path = tmp_path / f"repo{i}.git"
+            subprocess.run(["git", "init", "-q", "--bare", str(repo_path)])
+            urls.append(f"file://{repo_path}")
+
+        # A run checks the config repo twice (directory and file), then the
+        # file structure task (another process) checks each of its entries
+        config_urls = [urls[0], urls[0]]
+        entry_urls = [urls[i % len(urls)] for i in range(args.entries)]
+
+        def uncached() -> None:
+            for url in config_urls + entry_urls:
+                run_git_command(f"git ls-remote {url}", timeout=10)
+
+        def cached() -> None:
+            shutil.rmtree(git_repos.GIT_CACHE_PATH, ignore_errors=True)
+            for phase_urls in (config_urls, entry_urls):
+                git_repos._REMOTE_REFS_CACHE.clear()
+                resolve_remote_refs(phase_urls)
+                for url in phase_urls:
+                    is_git_repo(url)
+
+        uncached_timings = time_call(uncached, args.repeat)
+        cached_timings = time_call(cached, args.repeat)
+
+    stats = get_remote_refs_stats()
+    n_lookups = len(config_urls) + len(entry_urls)
+    print_timings("ls-remote per lookup", uncached_timings)
+    print_timings("ref cache", cached_timings)
+    print_comparison(uncached_timings, cached_timings)
+    stream_print(
+        f"{'Round trips per run':<40} {n_lookups} -> "
+        f"{stats['ls-remote'] // args.repeat}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of searching a year of nightly run logs, comparing 'grep -rn' over
+the log files with a search of the (incrementally updated) log index.
+Run via:
+```
+python3 benchmarks/log_index.py
+```
+"""
+import argparse
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils.common import stream_print
+from gurk.utils.log_index import (
+    RUN_ID_FORMAT,
+    get_run_tasks,
+    list_runs,
+    open_log_index,
+    search_logs,
+    write_run_info,
+)
+
+WORDS = (
+    "Reading package lists Building dependency tree Collecting Downloading "
+    "Installing Successfully installed Requirement already satisfied "
+    "Setting up Unpacking Processing triggers warning deprecated"
+).split()
+
+
+def create_runs(
+    logs_path: Path,
+    n_runs: int,
+    n_tasks: int,
+    n_lines: int,
+    start: float | None = None,
+) -> None:
+    """
+    Create finished nightly runs (by default until now), with one failing
+    task every 30 runs.
+    """
+    rng = random.Random(0)
+    if start is None:
+        start = time.time() - n_runs * 24 * 3600
+    for i in range(n_runs):
+        started = start + i * 24 * 3600
+        run_path = logs_path / time.strftime(
+            RUN_ID_FORMAT, time.localtime(started)
+        )
+        run_path.mkdir()
+        tasks = {}
+        for j in range(n_tasks):
+            failed = i % 30 == 0 and j == 0
+            lines = [" ".join(rng.choices(WORDS, k=8)) for _ in range(n_lines)]
+            if failed:
+                lines.append(f"E: Unable to locate package pkg{i}")
+            (run_path / f"task{j}.log").write_text("\n".join(lines) + "\n")
+            tasks[f"task{j}"] = {
+                "status": "Failure" if failed else "Success",
+                "started": started + j * 60,
+                "finished": started + (j + 1) * 60,
+            }
+        write_run_info(
+            run_path,
+            {
+                "started": started,
+                "finished": started + n_tasks * 60,
+                "tasks": tasks,
+            },
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=365)
+    parser.add_argument("--tasks", type=int, default=15)
+    parser.add_argument("--lines", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logs_path = Path(tmpdir)
+        create_runs(logs_path, args.runs, args.tasks, args.lines)
+
+        def update() -> None:
+            with open_log_index(logs_path):
+                pass
+
+        print_timings(
+            f"initial index ({args.runs * args.tasks * args.lines} lines)",
+            time_call(update, 1),
+        )
+
+        def list_latest() -> None:
+            with open_log_index(logs_path, update=False) as conn:
+                get_run_tasks(conn, list_runs(conn)[0]["run_id"])
+
+        def grep() -> None:
+            subprocess.run(
+                ["grep", "-rn", "Unable to locate", str(logs_path)],
+                capture_output=True,
+            )
+
+        def search() -> None:
+            with open_log_index(logs_path) as conn:
+                search_logs(conn, '"Unable to locate"')
+
+        print_timings("no-op update", time_call(update, args.repeat))
+        print_timings("list runs + tasks", time_call(list_latest, args.repeat))
+        grep_timings = time_call(grep, args.repeat)
+        search_timings = time_call(search, args.repeat)
+        print_timings("grep -rn", grep_timings)
+        print_timings("index search (incl. update)", search_timings)
+        print_comparison(grep_timings, search_timings)
+        stream_print(
+            f"{'Index size':<40} "
+            f"{(logs_path / 'index.sqlite').stat().st_size / 1024**2:9.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
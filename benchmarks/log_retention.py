@@ -0,0 +1,76 @@
+"""
+Benchmark of the log retention over a year of nightly runs: archiving the
+older runs once, the per-run cost afterwards (archiving one run, or nothing),
+and deleting runs over a size budget.
+Run via:
+```
+python3 benchmarks/log_retention.py
+```
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from log_index import create_runs
+from utils import print_timings, time_call
+
+from gurk.utils.common import format_bytes, stream_print
+from gurk.utils.files import get_tree_size
+from gurk.utils.log_index import enforce_log_retention, open_log_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=365)
+    parser.add_argument("--tasks", type=int, default=15)
+    parser.add_argument("--lines", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logs_path = Path(tmpdir)
+        create_runs(logs_path, args.runs, args.tasks, args.lines)
+        with open_log_index(logs_path):
+            pass
+        size_before = get_tree_size(logs_path)
+
+        print_timings(
+            f"archive {args.runs - 14} runs",
+            time_call(lambda: enforce_log_retention(logs_path), 1),
+        )
+        size_after = get_tree_size(logs_path)
+
+        next_runs = iter(range(1, args.repeat + 1))
+
+        def archive_one() -> None:
+            start = time.time() + next(next_runs) * 24 * 3600
+            create_runs(logs_path, 1, args.tasks, args.lines, start)
+            enforce_log_retention(logs_path, keep_days=0)
+
+        print_timings(
+            "steady state (nothing to do)",
+            time_call(lambda: enforce_log_retention(logs_path), args.repeat),
+        )
+        print_timings(
+            "steady state (archive a run)",
+            time_call(archive_one, args.repeat),
+        )
+        print_timings(
+            "delete a month of runs",
+            time_call(
+                lambda: enforce_log_retention(
+                    logs_path, max_size=int(size_after * 0.9)
+                ),
+                1,
+            ),
+        )
+        stream_print(
+            f"{'Logs size (with index)':<40} {format_bytes(size_before)} -> "
+            f"{format_bytes(size_after)} -> "
+            f"{format_bytes(get_tree_size(logs_path))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of the logger's CPU time in the parent process on a busy run with
+stdout not being a terminal, but forced colors (as e.g. in CI), comparing live
+rendering with rich and the plain (one line per event) output.
+Run via:
+```
+python3 benchmarks/logger_output.py
+```
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from threading import Thread
+from unittest import mock
+
+from utils import print_comparison, print_timings
+
+from gurk.core import logger as logger_module
+from gurk.core.logger import Logger
+from gurk.utils.common import stream_print
+from gurk.utils.logger import TaskTerminationType
+
+
+def run_busy(
+    output: str | None, n_tasks: int, n_steps: int, interval: float
+) -> float:
+    """
+    Simulate a run of concurrent tasks, each reporting a step at an interval
+    (as the scheduler does for the STEP lines of tasks).
+
+    :param output: Output of the logger, or None to run without a logger
+    :type output: str | None
+    :param n_tasks: Number of concurrent tasks
+    :type n_tasks: int
+    :param n_steps: Number of steps of each task
+    :type n_steps: int
+    :param interval: Seconds between the steps of a task
+    :type interval: float
+    :return: CPU time of the process in seconds (incl. background threads)
+    :rtype: float
+    """
+    logger = Logger(False, output) if output else None
+    with logger or contextlib.nullcontext():
+
+        def task(i: int) -> None:
+            if logger:
+                task_id = logger.add_task(f"task-{i}", total=n_steps + 1)
+            for step in range(n_steps):
+                if logger:
+                    logger.update_task(task_id, f"Installing package {step}")
+                time.sleep(interval)
+            if logger:
+                logger.finish_task(task_id, TaskTerminationType.SUCCESS)
+
+        start = time.process_time()
+        threads = [Thread(target=task, args=(i,)) for i in range(n_tasks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.process_time() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    timings = {}
+    with mock.patch.dict(
+        os.environ, {"FORCE_COLOR": "1"}
+    ), tempfile.TemporaryDirectory() as tmpdir, open(
+        os.devnull, "w"
+    ) as devnull, mock.patch.object(
+        logger_module, "PACKAGE_LOGS_PATH", Path(tmpdir)
+    ), mock.patch.object(
+        logger_module, "enforce_log_retention", return_value=([], [])
+    ):
+        stdout = sys.stdout
+        for output in (None, "rich", "plain"):
+            timings[output] = []
+            for _ in range(args.repeat):
+                sys.stdout = devnull
+                try:
+                    timings[output].append(
+                        run_busy(output, args.tasks, args.steps, args.interval)
+                    )
+                finally:
+                    sys.stdout = stdout
+
+    # CPU time of the logger alone, without that of the simulated tasks
+    baseline = statistics.median(timings.pop(None))
+    for output in timings:
+        timings[output] = [timing - baseline for timing in timings[output]]
+
+    n_events = args.tasks * (args.steps + 2)
+    stream_print(
+        f"Run of {args.tasks} tasks, {n_events} events over "
+        f"{args.steps * args.interval:.1f}s (baseline CPU time: "
+        f"{baseline * 1000:.2f} ms)"
+    )
+    print_timings("rich, logger CPU time", timings["rich"])
+    print_timings("plain, logger CPU time", timings["plain"])
+    print_comparison(timings["rich"], timings["plain"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of adding aliases to a bashrc file, comparing one 'write_marked'
+bash call per alias (sourcing the bash helpers each time) with the in-process,
+batched Python editor.
+Run via:
+```
+python3 benchmarks/marking.py
+```
+"""
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.scripts.python.helpers.marking import write_marked
+from gurk.utils.common import CommandKind
+from gurk.utils.interface import get_bash_helpers_bundle
+
+BASHRC = "# ~/.bashrc\n" + "export PATH=$PATH:/opt/bin\n" * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("--aliases", type=int, default=50)
+    args = parser.parse_args()
+
+    aliases = [
+        f"alias app{i}='(flatpak run org.app.App{i} > /dev/null &)'"
+        for i in range(args.aliases)
+    ]
+    bundle_path = get_bash_helpers_bundle()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bashrc = Path(tmpdir) / ".bashrc"
+
+        def bash_per_alias() -> None:
+            bashrc.write_text(BASHRC)
+            for alias in aliases:
+                subprocess.run(
+                    [
+                        CommandKind.BASH.exe,
+                        "-c",
+                        f'source {bundle_path} && write_marked "$1" "$2"',
+                        "_",
+                        alias,
+                        str(bashrc),
+                    ],
+                    capture_output=True,
+                )
+
+        def python_batch() -> None:
+            bashrc.write_text(BASHRC)
+            write_marked(aliases, bashrc)
+
+        bash_timings = time_call(bash_per_alias, args.repeat)
+        bash_output = bashrc.read_bytes()
+        python_timings = time_call(python_batch, args.repeat)
+        assert bashrc.read_bytes() == bash_output
+
+    print_timings(f"bash, per alias (n={args.aliases})", bash_timings)
+    print_timings("python, batched", python_timings)
+    print_comparison(bash_timings, python_timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of the start-up of a Python task, comparing a new interpreter per
+task with forking it from the (warm) fork server.
+Run via:
+```
+python3 benchmarks/python_startup.py
+```
+"""
+import argparse
+import os
+import pty
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils.common import CommandKind
+from gurk.utils.forkserver import ForkServer
+from gurk.utils.interface import run_script_function
+
+# Task that only imports what the tasks commonly import
+SCRIPT = """\
+from gurk.core.logger import Logger
+from gurk.scripts.python.helpers._interface import get_config_args
+from gurk.scripts.python.helpers.processing import get_clean_lines
+
+
+def main(*args):
+    get_config_args(list(args))
+    Logger.step("done")
+"""
+
+
+def drain(master_fd: int) -> None:
+    """Read the output of an exited task from its PTY."""
+    os.set_blocking(master_fd, False)
+    while True:
+        try:
+            if not os.read(master_fd, 4096):
+                break
+        except OSError:  # Nothing left
+            break
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        script = Path(tmpdir) / "task.py"
+        script.write_text(SCRIPT)
+        wrapper = Path(tmpdir) / "wrapper.py"
+        wrapper.write_text(run_script_function(script, "main", [], run=False))
+
+        master_fd, slave_fd = pty.openpty()
+        env = os.environ.copy()
+
+        def new_interpreter() -> None:
+            process = subprocess.Popen(
+                [CommandKind.PYTHON.exe, "-u", str(wrapper)],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                env=env,
+                start_new_session=True,
+            )
+            assert process.wait() == 0
+            drain(master_fd)
+
+        forkserver = ForkServer()
+        try:
+
+            def forked() -> None:
+                process = forkserver.spawn([str(wrapper)], slave_fd, env)
+                assert process.wait() == 0
+                drain(master_fd)
+
+            warm_up = time_call(forked, 1)  # Includes preloading the modules
+            interpreter_timings = time_call(new_interpreter, args.repeat)
+            forked_timings = time_call(forked, args.repeat)
+        finally:
+            forkserver.close()
+            os.close(master_fd)
+            os.close(slave_fd)
+
+        print_timings("first forked task (incl. preload)", warm_up)
+        print_timings("new interpreter per task", interpreter_timings)
+        print_timings("forked from the fork server", forked_timings)
+        print_comparison(interpreter_timings, forked_timings)
+
+
+if __name__ == "__main__":
+    main()
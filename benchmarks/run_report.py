@@ -0,0 +1,99 @@
+"""
+Benchmark of collecting the results of a run with many tasks, comparing the
+previous scan of all tasks per result with a single pass, and of writing the
+run report (JSON + JUnit XML).
+Run via:
+```
+python3 benchmarks/run_report.py
+```
+"""
+import argparse
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.core.logger import Logger
+from gurk.core.scheduler import Scheduler
+from gurk.utils.logger import TaskTerminationType
+from gurk.utils.report import build_run_report, write_run_report
+
+
+@dataclass(frozen=True)
+class Task:
+    """Stand-in for a resolved task (only its name is used)."""
+
+    name: str
+
+
+def get_results_scan(scheduler: Scheduler) -> list[tuple[str, str, bool]]:
+    """Previous 'Scheduler.get_results', scanning all tasks per result."""
+    all_tasks = []
+    for task, result in scheduler.results.items():
+        for _, task_info in scheduler.logger.task_infos.items():
+            if task_info["name"] == task.name:
+                all_tasks.append(
+                    (
+                        task.name,
+                        str(task_info["logfile"]),
+                        result == TaskTerminationType.SUCCESS,
+                    )
+                )
+    return all_tasks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = Logger(False, "json")
+        logger.logdir = Path(tmpdir)
+        tasks = [Task(f"install-task{i}") for i in range(args.tasks)]
+        scheduler = Scheduler(logger, tasks, "")
+
+        # Record the tasks directly (without emitting their events)
+        now = time.time()
+        for i, task in enumerate(tasks):
+            status = TaskTerminationType.SUCCESS
+            logger.task_infos[i] = {
+                "name": task.name,
+                "total": 5,
+                "completed": 5,
+                "steps": 4,
+                "logfile": logger.logdir / f"{task.name}.log",
+                "exit_code": 0,
+            }
+            logger.run_info["tasks"][task.name] = {
+                "status": status.label,
+                "started": now + i,
+                "finished": now + i + 1,
+            }
+            scheduler.results[task] = status
+        logger.run_info["finished"] = now + args.tasks
+
+        assert get_results_scan(scheduler) == scheduler.get_results()
+        scan_timings = time_call(lambda: get_results_scan(scheduler), 1)
+        pass_timings = time_call(scheduler.get_results, args.repeat)
+        print_timings(f"scan results ({args.tasks} tasks)", scan_timings)
+        print_timings(f"single pass ({args.tasks} tasks)", pass_timings)
+        print_comparison(scan_timings, pass_timings)
+
+        def report() -> None:
+            write_run_report(
+                logger.logdir,
+                build_run_report(logger.run_info, logger.task_infos),
+            )
+
+        print_timings(
+            f"write report ({args.tasks} tasks)",
+            time_call(report, args.repeat),
+        )
+
+
+if __name__ == "__main__":
+    main()
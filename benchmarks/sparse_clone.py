@@ -0,0 +1,99 @@
+"""
+Benchmark of cloning one directory of a large repository, comparing a full
+clone with a partial (blobless) and sparse clone of just that directory.
+Both clone from a local bare repository over 'file://', and the transferred
+bytes are measured as the size of the received objects.
+Run via:
+```
+python3 benchmarks/sparse_clone.py
+```
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.utils.common import format_bytes, stream_print
+from gurk.utils.git_repos import sparse_clone_git_repo
+
+
+def git(*args: str, cwd: Path | None = None) -> None:
+    """Run a git command, failing loudly."""
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def create_bare_repo(path: Path, n_dirs: int, n_commits: int) -> None:
+    """Create a bare repository with a small 'config' and large other dirs."""
+    work = path.with_name("work")
+    git("init", "-q", "-b", "main", str(work))
+    for commit in range(n_commits):
+        (work / "config").mkdir(exist_ok=True)
+        (work / "config" / "settings.cfg").write_text(f"revision={commit}\n")
+        for i in range(n_dirs):
+            (work / f"data{i}").mkdir(exist_ok=True)
+            (work / f"data{i}" / "blob.bin").write_bytes(os.urandom(1 << 20))
+        git("add", "-A", cwd=work)
+        git("commit", "-q", "-m", f"Commit {commit}", cwd=work)
+    git("clone", "-q", "--bare", str(work), str(path))
+    git("config", "uploadpack.allowFilter", "true", cwd=path)
+    shutil.rmtree(work)
+
+
+def get_objects_size(repo_path: Path) -> int:
+    """Get the size of the objects of a repository."""
+    return sum(
+        file.stat().st_size
+        for file in (repo_path / ".git" / "objects").rglob("*")
+        if file.is_file()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--dirs", type=int, default=20)
+    parser.add_argument("--commits", type=int, default=3)
+    args = parser.parse_args()
+
+    env = {
+        f"GIT_{role}_{field}": value
+        for role in ("AUTHOR", "COMMITTER")
+        for field, value in (("NAME", "gurk"), ("EMAIL", "gurk@example.com"))
+    }
+    os.environ.update(env)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bare_repo = Path(tmpdir) / "repo.git"
+        create_bare_repo(bare_repo, args.dirs, args.commits)
+        url = f"file://{bare_repo}"
+        dest = Path(tmpdir) / "clone"
+        sizes = {}
+
+        def full_clone() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            git("clone", "-q", url, str(dest))
+            sizes["full"] = get_objects_size(dest)
+
+        def sparse_clone() -> None:
+            shutil.rmtree(dest, ignore_errors=True)
+            sparse_clone_git_repo(f"{url}?path=config&depth=1", dest)
+            sizes["sparse"] = get_objects_size(dest)
+
+        full_timings = time_call(full_clone, args.repeat)
+        sparse_timings = time_call(sparse_clone, args.repeat)
+
+    print_timings("full clone", full_timings)
+    print_timings("partial + sparse clone (depth=1)", sparse_timings)
+    print_comparison(full_timings, sparse_timings)
+    stream_print(
+        f"{'Transferred objects':<40} {format_bytes(sizes['full'])} -> "
+        f"{format_bytes(sizes['sparse'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import statistics
+import time
+from typing import Callable
+
+from gurk.utils.common import stream_print
+
+
+def time_call(func: Callable[[], object], repeat: int = 20) -> list[float]:
+    """
+    Time repeated calls of a function.
+
+    :param func: Function to call (without arguments)
+    :type func: Callable[[], object]
+    :param repeat: Number of calls to time
+    :type repeat: int
+    :return: Wall times of the individual calls in seconds
+    :rtype: list[float]
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def print_timings(label: str, timings: list[float]) -> None:
+    """
+    Print a one-line summary of timings.
+
+    :param label: Label of the timed variant
+    :type label: str
+    :param timings: Wall times in seconds
+    :type timings: list[float]
+    """
+    stream_print(
+        f"{label:<40} median {statistics.median(timings) * 1000:9.2f} ms"
+        f"   min {min(timings) * 1000:9.2f} ms   (n={len(timings)})"
+    )
+
+
+def print_comparison(baseline: list[float], candidate: list[float]) -> None:
+    """
+    Print the speedup of a candidate over a baseline (by median).
+
+    :param baseline: Wall times of the baseline in seconds
+    :type baseline: list[float]
+    :param candidate: Wall times of the candidate in seconds
+    :type candidate: list[float]
+    """
+    speedup = statistics.median(baseline) / statistics.median(candidate)
+    stream_print(f"{'Speedup (median)':<40} {speedup:9.2f}x")
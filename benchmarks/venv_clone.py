@@ -0,0 +1,46 @@
+"""
+Benchmark of creating a venv with pip, comparing 'venv.create' (which runs
+'ensurepip') with cloning the pre-built base venv.
+Run via:
+```
+python3 benchmarks/venv_clone.py
+```
+"""
+import argparse
+import shutil
+import tempfile
+import venv
+from pathlib import Path
+
+from utils import print_comparison, print_timings, time_call
+
+from gurk.scripts.python.helpers.venvs import clone_venv, get_base_venv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base_venv_dir = get_base_venv()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        venv_dir = Path(tmpdir) / "venv"
+
+        def create() -> None:
+            shutil.rmtree(venv_dir, ignore_errors=True)
+            venv.create(venv_dir, with_pip=True)
+
+        def clone() -> None:
+            shutil.rmtree(venv_dir, ignore_errors=True)
+            clone_venv(base_venv_dir, venv_dir)
+
+        create_timings = time_call(create, args.repeat)
+        clone_timings = time_call(clone, args.repeat)
+
+    print_timings("venv.create (with pip)", create_timings)
+    print_timings("clone base venv", clone_timings)
+    print_comparison(create_timings, clone_timings)
+
+
+if __name__ == "__main__":
+    main()
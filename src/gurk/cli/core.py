@@ -10,6 +10,7 @@ from gurk.core.scheduler import Scheduler
 from gurk.core.task_processor import TaskProcessor
 from gurk.utils.cli import CoreCliProcessor, get_sudo_askpass, prompt_setup
 from gurk.utils.common import ENABLED_CONFIG_FILE, PACKAGE_CONFIG_PATH
+from gurk.utils.events import EventBus
 
 
 def main(argv, prog, description, cmd, _captured=None):
@@ -56,6 +57,21 @@ def main(argv, prog, description, cmd, _captured=None):
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "-o",
+        "--output",
+        choices=("rich", "plain", "json"),
+        default=None,
+        help="Output mode: live progress ('rich'), or one line per task state change/step/message ('plain' or 'json'). Defaults to 'rich' on terminals, else 'plain'",
+    )
+    parser.add_argument(
+        "-e",
+        "--events",
+        type=str,
+        default=None,
+        metavar="TARGET",
+        help="Publish the run's events as JSON lines to a Unix socket ('unix:<path>'), file descriptor ('fd:<n>') or file, without ever blocking the run",
+    )
     parser.add_argument(
         "-y",
         "--yes",
@@ -79,7 +95,8 @@ def main(argv, prog, description, cmd, _captured=None):
         # Prompt to run the 'setup' command upon first usage
         prompt_setup(args.yes)
 
-        with Logger(args.verbose) as logger:
+        events = EventBus(args.events) if args.events else None
+        with Logger(args.verbose, args.output, events) as logger:
             setup_processor = CoreCliProcessor(logger, args, argv, tasks, cmd)
 
             # Process args
@@ -93,13 +110,14 @@ def main(argv, prog, description, cmd, _captured=None):
 
             # Preparation
             if not processed_args.disable_preparation:
-                setup_processor.prepare()
+                setup_processor.prepare(task_processor.resolved_tasks)
 
             # Schedule and run tasks (where possible, in parallel)
             scheduler = Scheduler(
                 logger, task_processor.resolved_tasks, askpass_path
             )
             scheduler.run()
+            setup_processor.wait_for_preparation()
 
             # Save failed tasks (pytest usage)
             if _captured is not None:
@@ -1,6 +1,7 @@
 import sys
 import traceback
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -8,8 +9,11 @@ from gurk.core.logger import Logger, LoggerSeverity
 from gurk.utils.common import (
     DEFAULT_CONFIG_FILE,
     ENABLED_CONFIG_FILE,
+    PACKAGE_SRC_PATH,
     get_config_path,
 )
+from gurk.utils.interface import bash_checks
+from gurk.utils.scripts import ScriptBlockTypes, get_block_spans
 from gurk.utils.system_info import get_system_info
 from gurk.utils.yaml import load_yaml
 
@@ -105,6 +109,73 @@ def print_dict_aligned(
         print(" " * indent + str(data))
 
 
+def print_tasks_status(
+    task_names: list[str], jobs: int = 4, timeout: float = 60
+) -> None:
+    """
+    Print the installation status of the given tasks, based on their bash check
+    functions ('check_<task_name>', e.g. 'check_install_conda'). The checks are
+    split into chunks, each of which runs in a single shell (without a terminal,
+    so nothing can prompt), and the chunks run in parallel.
+
+    :param task_names: Names of the tasks to check
+    :type task_names: list[str]
+    :param jobs: Maximum number of shells running in parallel
+    :type jobs: int
+    :param timeout: Timeout in seconds for each chunk of checks
+    :type timeout: float
+    """
+    # Collect all available check functions, and whether they need the
+    # environment of an interactive shell (which is slow to load)
+    available_checks = {}
+    for checks_file in (PACKAGE_SRC_PATH / "scripts" / "bash").glob(
+        "*/checks.bash"
+    ):
+        lines = checks_file.read_text().splitlines()
+        for block in get_block_spans(checks_file):
+            if block["type"] == ScriptBlockTypes.FUNCTION:
+                start, end = block["lines"]
+                body = "\n".join(lines[start - 1 : end])
+                available_checks[block["name"]] = (
+                    "_load_interactive_env" in body
+                )
+    task_checks = {
+        task_name: f"check_{task_name.replace('-', '_')}"
+        for task_name in task_names
+    }
+    check_names = [
+        check for check in task_checks.values() if check in available_checks
+    ]
+
+    # Run the checks in parallel chunks. Checks needing the interactive
+    # environment share one shell (loaded once), the others are spread evenly
+    interactive = [check for check in check_names if available_checks[check]]
+    others = [check for check in check_names if not available_checks[check]]
+    chunks = [interactive, *(others[idx::jobs] for idx in range(jobs))]
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for chunk_results in executor.map(
+            lambda chunk: bash_checks(
+                chunk, cache=True, timeout=timeout, isolated=True
+            ),
+            [chunk for chunk in chunks if chunk],
+        ):
+            results.update(chunk_results)
+
+    # Print results
+    Logger.richprint("=== Task status ===", color="cyan")
+    maxlen = max((len(task_name) for task_name in task_names), default=0)
+    for task_name, check_name in task_checks.items():
+        if check_name not in results:
+            status, color = "No check available", "bright_black"
+        elif results[check_name].returncode == 0:
+            status, color = "Installed", "green"
+        else:
+            status, color = "Not installed", "red"
+        Logger.richprint(f"{task_name:<{maxlen}} : {status}", color=color)
+    print()  # Extra newline for better readability
+
+
 def main(argv, prog, description):
     parser = ArgumentParser(
         prog=prog,
@@ -134,6 +205,19 @@ def main(argv, prog, description):
         action="store_true",
         help="Print a list of all available tasks",
     )
+    parser.add_argument(
+        "-S",
+        "--status",
+        action="store_true",
+        help="Print the installation status of the tasks (all, or those given with --tasks)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help="Maximum number of parallel shells for --status",
+    )
     parser.add_argument(
         "-c",
         "--custom-config",
@@ -151,6 +235,7 @@ def main(argv, prog, description):
     # Ensure at least one option is provided
     if not (
         args.tasks
+        or args.status
         or args.available_tasks
         or args.custom_config
         or args.default_config
@@ -160,7 +245,7 @@ def main(argv, prog, description):
         args.system_info = True
     try:
         # Task info
-        if args.tasks:
+        if args.tasks and not args.status:
             # Get tasks info from default config
             default_config = load_yaml(DEFAULT_CONFIG_FILE)
 
@@ -193,6 +278,23 @@ def main(argv, prog, description):
                     Logger.richprint(content)
                 print()  # Extra newline for better readability
 
+        # Task status
+        if args.status:
+            default_config = load_yaml(DEFAULT_CONFIG_FILE)
+            task_names = args.tasks or [
+                task_name
+                for task_name in default_config.keys()
+                if not task_name.startswith("_")  # Skip helpers
+            ]
+            for task_name in task_names:
+                if task_name not in default_config:
+                    Logger.logrichprint(
+                        LoggerSeverity.FATAL,
+                        f"Task '{task_name}' not found in default configuration",
+                    )
+                    sys.exit(1)
+            print_tasks_status(task_names, jobs=max(args.jobs, 1))
+
         # Available tasks
         if args.available_tasks:
             # Get tasks info from default config
@@ -0,0 +1,305 @@
+import sqlite3
+import sys
+import time
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from datetime import datetime
+from pathlib import Path
+
+from rich.markup import escape
+
+from gurk.core.logger import Logger, LoggerSeverity
+from gurk.utils.common import PACKAGE_LOGS_PATH
+from gurk.utils.log_index import (
+    LOG_KEEP_DAYS,
+    LOG_KEEP_RUNS,
+    LOG_MAX_SIZE,
+    enforce_log_retention,
+    get_run_tasks,
+    list_runs,
+    open_log_archive,
+    open_log_index,
+    read_archived_file,
+    read_run_info,
+    resolve_run_id,
+    search_logs,
+)
+from gurk.utils.logger import TaskTerminationType
+
+# Colors of the task statuses (by label), running tasks have none
+STATUS_COLORS = {status.label: status.color for status in TaskTerminationType}
+
+
+def format_time(timestamp: float | None) -> str:
+    """
+    Format a timestamp for the listings.
+
+    :param timestamp: Timestamp (or None if unknown)
+    :type timestamp: float | None
+    :return: Formatted date and time, or '-'
+    :rtype: str
+    """
+    if timestamp is None:
+        return "-"
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_duration(started: float | None, finished: float | None) -> str:
+    """
+    Format the duration between two timestamps (e.g. '1h02m', '3m05s').
+
+    :param started: Start timestamp (or None if unknown)
+    :type started: float | None
+    :param finished: End timestamp (or None if unknown/still running)
+    :type finished: float | None
+    :return: Formatted duration, or '-'
+    :rtype: str
+    """
+    if started is None or finished is None:
+        return "-"
+    seconds = max(round(finished - started), 0)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def format_status(status: str | None, running: bool = False) -> str:
+    """
+    Format a task status with its color (rich markup).
+
+    :param status: Status label, or None if not known (yet)
+    :type status: str | None
+    :param running: Whether the task is still running
+    :type running: bool
+    :return: Formatted status
+    :rtype: str
+    """
+    if status is None:
+        return f"{'Running' if running else '-':<8}"
+    color = STATUS_COLORS.get(status, "white")
+    return f"[{color}]{status:<8}[/{color}]"
+
+
+def follow_log(
+    run_path: Path, task: str, poll_interval: float = 0.5
+) -> str | None:
+    """
+    Print a task's log as it is written (like 'tail -f'), until the task (or
+    its run) has finished.
+
+    :param run_path: Path to the log directory of the run
+    :type run_path: Path
+    :param task: Name of the task
+    :type task: str
+    :param poll_interval: Seconds between checks for new output
+    :type poll_interval: float
+    :return: Final status of the task (None if unknown)
+    :rtype: str | None
+    """
+    log_path = run_path / f"{task}.log"
+    position = 0
+    while True:
+        # NOTE: Read after the status, so no output written before the task
+        #       finished is missed
+        run_info = read_run_info(run_path)
+        record = (run_info or {}).get("tasks", {}).get(task)
+        finished = (
+            run_info is None
+            or run_info["finished"] is not None
+            or (record is not None and record["status"] is not None)
+        )
+
+        if log_path.is_file():
+            with open(log_path, "rb") as log_file:
+                log_file.seek(position)
+                data = log_file.read()
+            position += len(data)
+            sys.stdout.write(data.decode("utf-8", errors="replace"))
+            sys.stdout.flush()
+
+        if finished:
+            return record["status"] if record else None
+        time.sleep(poll_interval)
+
+
+def print_archived_log(
+    conn: sqlite3.Connection, run_id: str, task: str
+) -> str | None:
+    """
+    Print the log of a task of an archived run.
+
+    :param conn: Connection to the log index
+    :type conn: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :param task: Name of the task
+    :type task: str
+    :return: Status of the task (None if unknown)
+    :rtype: str | None
+    """
+    with open_log_archive() as archive:
+        data = read_archived_file(archive, run_id, f"{task}.log")
+    sys.stdout.write((data or b"").decode("utf-8", errors="replace"))
+    return next(
+        (
+            record["status"]
+            for record in get_run_tasks(conn, run_id)
+            if record["task"] == task
+        ),
+        None,
+    )
+
+
+def main(argv, prog, description):
+    parser = ArgumentParser(
+        prog=prog,
+        description=description,
+        formatter_class=lambda prog: ArgumentDefaultsHelpFormatter(
+            prog=prog,
+            max_help_position=60,
+        ),
+    )
+    parser.add_argument(
+        "-r",
+        "--run",
+        type=str,
+        default=None,
+        help="Run to show the tasks of (ID, ID prefix or 'latest')",
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        type=str,
+        default=None,
+        help="Full-text search across the logs of all runs (FTS5 syntax, e.g. 'error NOT docker')",
+    )
+    parser.add_argument(
+        "-t",
+        "--task",
+        type=str,
+        default=None,
+        help="Only search the logs of this task",
+    )
+    parser.add_argument(
+        "-f",
+        "--follow",
+        type=str,
+        default=None,
+        metavar="TASK",
+        help="Follow the log of a task until it finishes (in the latest run, or --run)",
+    )
+    parser.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of runs/search results to list",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Archive/delete the logs of older runs now (done in the background on every run)",
+    )
+    parser.add_argument(
+        "--keep-runs",
+        type=int,
+        default=LOG_KEEP_RUNS,
+        help="Number of latest runs to keep unarchived (with --prune)",
+    )
+    parser.add_argument(
+        "--keep-days",
+        type=float,
+        default=LOG_KEEP_DAYS,
+        help="Days to keep runs unarchived (with --prune)",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=LOG_MAX_SIZE // 1024**2,
+        help="Size budget of all logs in MiB, beyond which the oldest runs are deleted (with --prune)",
+    )
+    args = parser.parse_args(argv)
+
+    # Retention of the logs
+    if args.prune:
+        archived, deleted = enforce_log_retention(
+            keep_runs=args.keep_runs,
+            keep_days=args.keep_days,
+            max_size=args.max_size * 1024**2,
+        )
+        Logger.richprint(
+            f"Archived {len(archived)} and deleted {len(deleted)} run(s)",
+            color="green",
+        )
+        return
+
+    with open_log_index() as conn:
+        run_id = None
+        if args.run is not None or args.follow:
+            run_id = resolve_run_id(conn, args.run or "latest")
+            if run_id is None:
+                Logger.logrichprint(
+                    LoggerSeverity.FATAL,
+                    f"No run found for '{args.run or 'latest'}'",
+                )
+                sys.exit(1)
+
+        # Follow a (running) task
+        if args.follow:
+            if not (PACKAGE_LOGS_PATH / run_id).is_dir():  # Archived
+                status = print_archived_log(conn, run_id, args.follow)
+            else:
+                status = follow_log(PACKAGE_LOGS_PATH / run_id, args.follow)
+            Logger.richprint(f"\n{args.follow}: {format_status(status)}")
+            return
+
+        # Full-text search
+        if args.search is not None:
+            matches = search_logs(
+                conn, args.search, run_id, args.task, args.limit
+            )
+            for match in sorted(
+                matches,
+                key=lambda m: (m["run_id"], m["task"], m["lineno"]),
+            ):
+                Logger.richprint(
+                    f"[cyan]{match['run_id']}[/cyan] "
+                    f"[blue]{match['task']}:{match['lineno']}[/blue] "
+                    f"{escape(match['content'])}"
+                )
+            if len(matches) == args.limit:
+                Logger.richprint(
+                    f"(Showing the latest {args.limit} matches, see --limit)",
+                    color="yellow",
+                )
+            return
+
+        # Tasks of a run
+        if run_id is not None:
+            for task in get_run_tasks(conn, run_id):
+                Logger.richprint(
+                    f"{format_status(task['status'], task['finished'] is None)} "
+                    f"{task['task']:<40} "
+                    f"{format_duration(task['started'], task['finished']):>8} "
+                    f"{task['n_lines']:>7} lines  {task['logfile'] or '-'}"
+                )
+            return
+
+        # Latest runs
+        for run in list_runs(conn, args.limit):
+            notes = (
+                f"[red]{run['n_failed']} failed[/red]"
+                if run["n_failed"]
+                else ""
+            )
+            if run["archived"]:
+                notes += " [dim](archived)[/dim]"
+            Logger.richprint(
+                f"[cyan]{run['run_id']}[/cyan]  "
+                f"{format_time(run['started'])}  "
+                f"{format_duration(run['started'], run['finished']):>8}  "
+                f"{run['n_tasks']:>3} task(s)  {notes.strip()}"
+            )
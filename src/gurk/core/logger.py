@@ -1,12 +1,18 @@
+import itertools
+import json
 import shutil
+import sqlite3
 import sys
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
+from threading import Event, Lock, Thread
+from typing import Iterator
 
 from rich import print as richprint
 from rich.console import Console
+from rich.errors import MarkupError
 from rich.progress import (
     BarColumn,
     Progress,
@@ -14,29 +20,61 @@ from rich.progress import (
     TextColumn,
     TimeElapsedColumn,
 )
-
+from rich.text import Text
+
+from gurk.utils.common import PACKAGE_LOGS_PATH
+from gurk.utils.events import EventBus
+from gurk.utils.log_index import (
+    enforce_log_retention,
+    open_log_index,
+    write_run_info,
+)
 from gurk.utils.logger import (
     LoggerEnum,
+    LoggerEvent,
+    LoggerOutput,
     LoggerSeverity,
+    RunInfo,
     TaskInfos,
     TaskTerminationType,
 )
+from gurk.utils.report import build_run_report, write_run_report
+from gurk.utils.system_info import get_resource_usage
+
+# Serializes step messages of (multi-threaded) tasks
+_STEP_LOCK = Lock()
+
+# Serializes the lines of the plain/json outputs
+_OUTPUT_LOCK = Lock()
+
+# Seconds between the resource samples published to the event bus
+RESOURCE_SAMPLE_INTERVAL = 5.0
 
 
 @dataclass
 class Logger:
-    """Logger with progress tracking and rich-formatted output."""
+    """
+    Logger with progress tracking, rendered live with rich (on terminals) or
+    as one line per event (plain text or JSON, e.g. for CI logs).
+    """
 
     # fmt: off
-    verbose:      bool      = field()
-
-    logdir:       Path      = field(init=False)
-    task_infos:   TaskInfos = field(init=False, repr=False, default_factory=dict)
-
-    _tasks_lock:  Lock      = field(init=False, repr=False, default_factory=Lock)
-    _console_out: Console   = field(init=False, repr=False)
-    _console_err: Console   = field(init=False, repr=False)
-    _progress:    Progress  = field(init=False, repr=False)
+    verbose:      bool                = field()
+    output:       LoggerOutput | None = field(default=None)
+    events:       EventBus | None     = field(default=None)
+
+    logdir:       Path                = field(init=False)
+    task_infos:   TaskInfos           = field(init=False, repr=False, default_factory=dict)
+    run_info:     RunInfo             = field(init=False, repr=False)
+
+    _tasks_lock:  Lock                = field(init=False, repr=False, default_factory=Lock)
+    _retention:   Thread              = field(init=False, repr=False)
+    _sampler:     Thread              = field(init=False, repr=False)
+    _stopped:     Event               = field(init=False, repr=False, default_factory=Event)
+    _console_out: Console             = field(init=False, repr=False)
+    _console_err: Console             = field(init=False, repr=False)
+    _progress:    Progress | None     = field(init=False, repr=False, default=None)
+    _task_ids:    Iterator[int]       = field(init=False, repr=False, default_factory=itertools.count)
     # fmt: on
 
     def __post_init__(self):
@@ -44,27 +82,168 @@ class Logger:
         self._console_err = Console(
             log_path=False, log_time=False, stderr=True
         )
-        self._progress = Progress(
-            TimeElapsedColumn(),
-            BarColumn(),
-            TextColumn("{task.description}"),
-            console=self._console_out,
+        if self.output is None:
+            # Live rendering only on terminals (not in CI logs, even if they
+            # force colors, e.g. via FORCE_COLOR)
+            self.output = "rich" if sys.stdout.isatty() else "plain"
+        if self.output == "rich":
+            self._progress = Progress(
+                TimeElapsedColumn(),
+                BarColumn(),
+                TextColumn("{task.description}"),
+                console=self._console_out,
+            )
+        self.logdir = PACKAGE_LOGS_PATH / datetime.now().strftime(
+            "%Y%m%d_%H%M%S"
         )
-        self.logdir = (
-            Path.home()
-            / ".gurk"
-            / "logs"
-            / datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.run_info = {"started": time.time(), "finished": None, "tasks": {}}
+        self._retention = Thread(
+            target=self._enforce_log_retention, daemon=True
         )
+        self._sampler = Thread(target=self._sample_resources, daemon=True)
 
     def __enter__(self):
-        self._progress.__enter__()  # start live-render
+        if self._progress is not None:
+            self._progress.__enter__()  # start live-render
+        self._retention.start()  # clean up older runs in the background
+        if self.events is not None:
+            self._sampler.start()
         return self
 
     def __exit__(self, exc_type, exc, tb):
-        self._progress.__exit__(exc_type, exc, tb)  # stop live-render
+        if self._progress is not None:
+            self._progress.__exit__(exc_type, exc, tb)  # stop live-render
+        if self.events is not None:
+            self._stopped.set()
+            self._sampler.join()
+            self.events.close()
+        with self._tasks_lock:
+            self.run_info["finished"] = time.time()
+            self._save_run_info()
+            self._save_report()
+
+        # Index the run's logs (for 'gurk logs')
+        self._retention.join()
+        if self.logdir.is_dir():
+            try:
+                with open_log_index(self.logdir.parent):
+                    pass
+            except sqlite3.Error as e:
+                self.debug(f"Failed to index the logs of this run: {e}")
         return False  # propagate exceptions
 
+    def _enforce_log_retention(self) -> None:
+        """
+        Archive/delete the logs of older runs (see 'enforce_log_retention').
+        """
+        try:
+            archived, deleted = enforce_log_retention(self.logdir.parent)
+        except (OSError, sqlite3.Error) as e:
+            self.debug(f"Failed to clean up the logs of older runs: {e}")
+            return
+        if archived or deleted:
+            self.debug(
+                f"Archived {len(archived)} and deleted {len(deleted)} "
+                "older run(s) in the logs"
+            )
+
+    def _save_run_info(self) -> None:
+        """
+        Save the run's task statuses to its log directory (if created), for
+        'gurk logs'. Must be called with the tasks lock held.
+        """
+        if self.logdir.is_dir():
+            write_run_info(self.logdir, self.run_info)
+
+    def _save_report(self) -> None:
+        """
+        Save the report of the run to its log directory (if created), see
+        'write_run_report'. Must be called with the tasks lock held.
+        """
+        if not self.logdir.is_dir():
+            return
+        try:
+            write_run_report(
+                self.logdir, build_run_report(self.run_info, self.task_infos)
+            )
+        except OSError as e:
+            self.debug(f"Failed to write the report of this run: {e}")
+
+    def _sample_resources(self) -> None:
+        """
+        Publish samples of the resource usage (and number of running tasks)
+        to the event bus, until the run has finished.
+        """
+        cpu_times = None
+        while True:
+            try:
+                usage, cpu_times = get_resource_usage(cpu_times)
+            except OSError:
+                return
+            with self._tasks_lock:
+                running = sum(
+                    task["status"] is None
+                    for task in self.run_info["tasks"].values()
+                )
+            self.publish({"event": "resources", **usage, "running": running})
+            if self._stopped.wait(RESOURCE_SAMPLE_INTERVAL):
+                return
+
+    def publish(self, event: LoggerEvent) -> None:
+        """
+        Publish an event to the event bus (if any) only, e.g. for the tasks
+        added to a run.
+
+        :param event: Event to publish (without its time)
+        :type event: LoggerEvent
+        """
+        self._emit(event, render=False)
+
+    def _emit(self, event: LoggerEvent, render: bool = True) -> None:
+        """
+        Publish an event to the event bus (if any), and render it as a single
+        (timestamped) line, for the plain/json outputs. Errors go to stderr,
+        everything else to stdout.
+
+        :param event: Event to emit (without its time)
+        :type event: LoggerEvent
+        :param render: Whether to render the event (plain/json output)
+        :type render: bool
+        """
+        if self.events is None and (self.output == "rich" or not render):
+            return
+
+        event = {"time": round(time.time(), 3), **event}
+        if self.events is not None:
+            self.events.publish(event)
+        if self.output == "rich" or not render:
+            return
+        if self.output == "json":
+            line = json.dumps(event, separators=(",", ":"))
+        else:
+            timestamp = datetime.fromtimestamp(event["time"]).isoformat(
+                sep=" ", timespec="milliseconds"
+            )
+            kind = event.get("severity") or event.get("status", event["event"])
+            text = ": ".join(
+                event[key] for key in ("task", "message") if key in event
+            )
+            if "logfile" in event:
+                text += f" (log: {event['logfile']})"
+            # NOTE: Lines of multi-line messages are indented under the first
+            line = f"{timestamp} {kind.upper():<8} {text}".replace(
+                "\n", "\n" + " " * (len(timestamp) + 10)
+            )
+
+        stream = (
+            sys.stderr
+            if event.get("severity") in ("ERROR", "FATAL")
+            else sys.stdout
+        )
+        with _OUTPUT_LOCK:
+            stream.write(f"{line}\n")
+            stream.flush()
+
     def create_log_dir(self) -> None:
         """Create the log directory if it does not exist."""
         self.logdir.mkdir(parents=True, exist_ok=True)
@@ -102,19 +281,31 @@ class Logger:
         :return: The ID of the created task
         :rtype: TaskID
         """
-        task_id = self._progress.add_task(
-            f"{task_name}: starting", total=total
-        )
-        self._progress.update(
-            task_id, description=f"[yellow]⚡Started: {task_name}"
-        )
+        if self._progress is not None:
+            task_id = self._progress.add_task(
+                f"{task_name}: starting", total=total
+            )
+            self._progress.update(
+                task_id, description=f"[yellow]⚡Started: {task_name}"
+            )
+        else:
+            task_id = TaskID(next(self._task_ids))
         with self._tasks_lock:
             self.task_infos[task_id] = {
                 "name": task_name,
                 "total": total or 0,
                 "completed": 0,
+                "steps": 0,
                 "logfile": None,
+                "exit_code": None,
             }
+            self.run_info["tasks"][task_name] = {
+                "status": None,
+                "started": time.time(),
+                "finished": None,
+            }
+            self._save_run_info()
+        self._emit({"event": "started", "task": task_name})
         return task_id
 
     def generate_logfile_path(self, task_id: TaskID) -> Path | None:
@@ -148,10 +339,28 @@ class Logger:
         with self._tasks_lock:
             if task_id in self.task_infos:
                 self.task_infos[task_id]["total"] = total
-        self._progress.update(task_id, total=total)
+        if self._progress is not None:
+            self._progress.update(task_id, total=total)
+
+    def set_exit_code(self, task_id: TaskID, exit_code: int) -> None:
+        """
+        Set the exit code of a task's process (for the run report).
+
+        :param task_id: ID of the task
+        :type task_id: TaskID
+        :param exit_code: Exit code of the task's process
+        :type exit_code: int
+        """
+        with self._tasks_lock:
+            if task_id in self.task_infos:
+                self.task_infos[task_id]["exit_code"] = exit_code
 
     def update_task(
-        self, task_id: TaskID, message: str, advance: bool = True
+        self,
+        task_id: TaskID,
+        message: str,
+        advance: bool = True,
+        warning: bool = False,
     ) -> None:
         """
         Update the progress of a task, optionally advancing it by one step.
@@ -162,6 +371,8 @@ class Logger:
         :type message: str
         :param advance: Whether to advance the task progress by one step
         :type advance: bool
+        :param warning: Whether the update is a warning (plain/json output)
+        :type warning: bool
         """
         with self._tasks_lock:
             if task_id not in self.task_infos:
@@ -169,12 +380,21 @@ class Logger:
             task_info = self.task_infos[task_id]
 
             task_name = task_info["name"]
+            if advance:
+                task_info["steps"] += 1
             if (
                 advance and task_info["completed"] < task_info["total"] - 1
             ):  # Prevent finihing/over-advancing
-                self._progress.advance(task_id, 1)
+                if self._progress is not None:
+                    self._progress.advance(task_id, 1)
                 task_info["completed"] += 1
 
+        event = {"event": "step", "task": task_name, "message": message}
+        if warning:
+            event["severity"] = LoggerSeverity.WARNING.name
+        self._emit(event)
+        if self._progress is None:
+            return
         self._progress.update(
             task_id, description=f"[cyan]▸ Running: {task_name} - {message}"
         )
@@ -224,24 +444,38 @@ class Logger:
         """
         if severity == LoggerSeverity.DEBUG and not self.verbose:
             return
-        elif severity in (LoggerSeverity.ERROR, LoggerSeverity.FATAL):
-            console = self._console_err
-        else:
-            console = self._console_out
-
-        lines = message.splitlines()
-        if lines:
-            # First line: include the severity tag
-            console.log(
-                f"{self.logstart(severity)} {lines[0]}",
-                highlight=syntax_highlight,
+
+        if self.output != "rich" or self.events is not None:
+            try:
+                plain_message = Text.from_markup(message).plain
+            except MarkupError:
+                plain_message = message
+            self._emit(
+                {
+                    "event": "log",
+                    "severity": severity.name,
+                    "message": plain_message,
+                }
             )
-            # Remaining lines: indent under the tag
-            for line in lines[1:]:
+        if self.output == "rich":
+            if severity in (LoggerSeverity.ERROR, LoggerSeverity.FATAL):
+                console = self._console_err
+            else:
+                console = self._console_out
+
+            lines = message.splitlines()
+            if lines:
+                # First line: include the severity tag
                 console.log(
-                    f"{' ' * (len(severity.label) + 3)}{line}",
+                    f"{self.logstart(severity)} {lines[0]}",
                     highlight=syntax_highlight,
-                )  # +3 accounts for the brackets and space
+                )
+                # Remaining lines: indent under the tag
+                for line in lines[1:]:
+                    console.log(
+                        f"{' ' * (len(severity.label) + 3)}{line}",
+                        highlight=syntax_highlight,
+                    )  # +3 accounts for the brackets and space
 
         if severity == LoggerSeverity.DONE:
             sys.exit(0)
@@ -299,6 +533,12 @@ class Logger:
             logfile = task_info["logfile"]
             task_name = task_info["name"]
 
+            task_record = self.run_info["tasks"].get(task_name)
+            if task_record is not None:
+                task_record["status"] = success.label
+                task_record["finished"] = time.time()
+                self._save_run_info()
+
         if success == TaskTerminationType.SUCCESS:
             symbol = "✔"
         elif success == TaskTerminationType.PARTIAL:
@@ -309,6 +549,16 @@ class Logger:
             symbol = "✖"
         else:
             raise ValueError("Unknown task termination type")
+        event = {
+            "event": "finished",
+            "task": task_name,
+            "status": success.label,
+        }
+        if logfile:
+            event["logfile"] = str(logfile)
+        self._emit(event)
+        if self._progress is None:
+            return
         desc = f"[{success.color}]{symbol} {success.label}: {task_name}[/{success.color}]"
         if logfile:
             desc += f" [blue](log: {logfile})[/blue]"
@@ -351,6 +601,7 @@ class Logger:
     def step(message: str, warning: bool = False) -> None:
         """
         Log a step message indicating progress. Only to be used from within tasks.
+        Thread-safe, i.e. messages of concurrent threads do not interleave.
 
         :param message: Message to log
         :type message: str
@@ -362,4 +613,5 @@ class Logger:
         step_type = "STEP_NO_PROGRESS"
         if warning:
             step_type += "_WARNING"
-        print(f"\n__{step_type}__: {message}")
+        with _STEP_LOCK:
+            print(f"\n__{step_type}__: {message}", flush=True)
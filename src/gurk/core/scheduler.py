@@ -6,6 +6,7 @@ import shlex
 import subprocess
 import termios
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from queue import Queue
 from tempfile import NamedTemporaryFile, TemporaryDirectory
@@ -14,7 +15,8 @@ from typing import TextIO
 
 from gurk.core.logger import Logger
 from gurk.utils.common import CommandKind, generate_random_path
-from gurk.utils.interface import run_script_function
+from gurk.utils.forkserver import ForkServer
+from gurk.utils.interface import render_bash_config_args, run_script_function
 from gurk.utils.logger import TaskTerminationType
 from gurk.utils.patterns import PatternCollection
 from gurk.utils.scripts import (
@@ -23,7 +25,7 @@ from gurk.utils.scripts import (
     ScriptBlockTypes,
     get_block_spans,
 )
-from gurk.utils.system_info import get_system_info
+from gurk.utils.system_info import SystemInfo, get_system_info
 from gurk.utils.tasks import ResolvedTask
 
 
@@ -39,10 +41,16 @@ class Scheduler:
     results:   dict[ResolvedTask, TaskTerminationType] = field(init=False, repr=False, default_factory=dict)
     scheduled: set[ResolvedTask]                       = field(init=False, repr=False, default_factory=set)
 
-    lock:      Lock  = field(init=False, repr=False, default_factory=Lock)
-    queue:     Queue = field(init=False, repr=False, default_factory=Queue)
+    lock:       Lock              = field(init=False, repr=False, default_factory=Lock)
+    queue:      Queue             = field(init=False, repr=False, default_factory=Queue)
+    forkserver: ForkServer | None = field(init=False, repr=False, default=None)
     # fmt: on
 
+    @cached_property
+    def system_info(self) -> SystemInfo:
+        """System information passed to every task (retrieved once per run)."""
+        return get_system_info()
+
     @staticmethod
     def _prepare_script(command: Command) -> tuple[Path, int]:
         """
@@ -133,7 +141,11 @@ class Scheduler:
         return tmp_path, n_steps
 
     def _spawn_and_stream(
-        self, proc_cmd: list[str], flog: TextIO, task_id: int
+        self,
+        proc_cmd: list[str],
+        flog: TextIO,
+        task_id: int,
+        fork_argv: list[str] | None = None,
     ) -> TaskTerminationType:
         """
         Spawn a subprocess and stream its output to the logfile and progress tracker.
@@ -144,6 +156,8 @@ class Scheduler:
         :type flog: TextIO
         :param task_id: ID of the task for progress tracking
         :type task_id: int
+        :param fork_argv: Python script (and args) equivalent to the command, to fork from the fork server instead (if running)
+        :type fork_argv: list[str] | None
         :return: Task termination type (SUCCESS, FAILURE, PARTIAL)
         :rtype: TaskTerminationType
         """
@@ -234,6 +248,7 @@ class Scheduler:
                                     task_id,
                                     match.group(1).strip(),
                                     advance=False,
+                                    warning=bool(m_no_progress_warning),
                                 )
 
                     # Log any remaining partial line
@@ -252,13 +267,13 @@ class Scheduler:
             # Child closes the PTY master FD
             os.close(master_fd)
 
-            # Set terminal parameters for unbuffered output
-            try:
-                attrs = termios.tcgetattr(slave_fd)
-                attrs[1] = attrs[1] & ~termios.ECHO
-                termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
-            except termios.error:
-                pass
+        # Set terminal parameters for unbuffered output (of forked processes too)
+        try:
+            attrs = termios.tcgetattr(slave_fd)
+            attrs[1] = attrs[1] & ~termios.ECHO
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+        except termios.error:
+            pass
 
         # 5. Define environment for usage with SUDO_ASKPASS
         def create_sudo_wrapper() -> str:
@@ -288,17 +303,25 @@ class Scheduler:
         # 6. Set non-interactive environment variables
         env["DEBIAN_FRONTEND"] = "noninteractive"
 
-        # 7. Spawn the process with PTY connections
-        process = subprocess.Popen(
-            proc_cmd,
-            bufsize=0,
-            stdin=slave_fd,
-            stdout=slave_fd,
-            stderr=slave_fd,
-            preexec_fn=preexec_setup,
-            env=env,
-            text=False,
-        )
+        # 7. Spawn the process with PTY connections (forked from the warm
+        #    fork server for Python scripts, if possible)
+        process = None
+        if fork_argv is not None and self.forkserver is not None:
+            try:
+                process = self.forkserver.spawn(fork_argv, slave_fd, env)
+            except OSError as e:
+                self.logger.debug(f"Failed to fork from the fork server: {e}")
+        if process is None:
+            process = subprocess.Popen(
+                proc_cmd,
+                bufsize=0,
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                preexec_fn=preexec_setup,
+                env=env,
+                text=False,
+            )
 
         # 8. Parent closes its reference to the PTY slave
         os.close(slave_fd)
@@ -310,6 +333,7 @@ class Scheduler:
         # 10. Wait for process exit and clean up
         exit_code = process.wait()
         t_out.join()
+        self.logger.set_exit_code(task_id, exit_code)
 
         # 11. Final Termination Logic: Check status and PARTIAL event
         if exit_code != 0:
@@ -361,9 +385,22 @@ class Scheduler:
                     pass
 
         # Create args
-        args = task.args + ("--system-info", json.dumps(get_system_info()))
-        if task.config_file:
-            args += ("--config-file", task.config_file)
+        config_args_file = None
+        if task.command.kind == CommandKind.BASH:
+            # Pre-render config args into a sourceable file (no parsing in bash)
+            config_args_file = generate_random_path(
+                suffix=".bash", prefix="config_args_", create=True
+            )
+            config_args_file.write_text(
+                render_bash_config_args(
+                    self.system_info, task.config_file, "--force" in task.args
+                )
+            )
+            args = task.args + ("--config-args-file", str(config_args_file))
+        else:
+            args = task.args + ("--system-info", json.dumps(self.system_info))
+            if task.config_file:
+                args += ("--config-file", task.config_file)
 
         # Create temporary file that will run script/call function
         try:
@@ -389,6 +426,7 @@ class Scheduler:
             os.chmod(tmpwrap_path, os.stat(tmpwrap_path).st_mode | 0o700)
         except Exception:
             safe_unlink(tmpwrap_path)
+            safe_unlink(config_args_file)
             raise
 
         # Get executable to run file. Also, use unbuffered output
@@ -400,6 +438,9 @@ class Scheduler:
 
         # Combine files and args into a runnable command
         proc_cmd = [*exe_cmd, tmpwrap.name]
+        fork_argv = None
+        if task.command.kind == CommandKind.PYTHON and not task.privileged:
+            fork_argv = [tmpwrap.name]
         self.logger.debug(
             f"Running task '{task.name}' with command:"
             f"'{' '.join(proc_cmd)}'"
@@ -415,7 +456,9 @@ class Scheduler:
 
         # Run and stream
         try:
-            success = self._spawn_and_stream(proc_cmd, flog, task_id)
+            success = self._spawn_and_stream(
+                proc_cmd, flog, task_id, fork_argv
+            )
         except Exception as e:
             self.logger.debug(
                 f"Task '{task.name}' failed, as an exception occurred during '_spawn_and_stream': {e}"
@@ -424,6 +467,7 @@ class Scheduler:
         finally:
             safe_unlink(modified_script)
             safe_unlink(tmpwrap_path)
+            safe_unlink(config_args_file)
             flog.close()
             return success
 
@@ -453,6 +497,28 @@ class Scheduler:
 
     def run(self) -> None:
         """Run all scheduled tasks, respecting dependencies."""
+        for task in self.tasks:
+            self.logger.publish({"event": "added", "task": task.name})
+
+        # Fork (unprivileged) Python tasks from a warm process, which has their
+        # modules already imported
+        if any(
+            task.command.kind == CommandKind.PYTHON and not task.privileged
+            for task in self.tasks
+        ):
+            try:
+                self.forkserver = ForkServer()
+            except OSError as e:
+                self.logger.debug(f"Failed to start the fork server: {e}")
+        try:
+            self._run_tasks()
+        finally:
+            if self.forkserver is not None:
+                self.forkserver.close()
+                self.forkserver = None
+
+    def _run_tasks(self) -> None:
+        """Run all tasks until they have finished (or were skipped)."""
         running = {}
         while True:
             with self.lock:
@@ -513,15 +579,16 @@ class Scheduler:
         :return: List of tasks in the format [task_name, task_logfile, successful]
         :rtype: list[tuple[str, str, bool]]
         """
-        all_tasks = []
-        for task, result in self.results.items():
-            for _, task_info in self.logger.task_infos.items():
-                if task_info["name"] == task.name:
-                    all_tasks.append(
-                        (
-                            task.name,
-                            str(task_info["logfile"]),
-                            result == TaskTerminationType.SUCCESS,
-                        )
-                    )
-        return all_tasks
+        task_infos = {
+            task_info["name"]: task_info
+            for task_info in self.logger.task_infos.values()
+        }
+        return [
+            (
+                task.name,
+                str(task_infos[task.name]["logfile"]),
+                result == TaskTerminationType.SUCCESS,
+            )
+            for task, result in self.results.items()
+            if task.name in task_infos
+        ]
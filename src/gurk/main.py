@@ -1,6 +1,6 @@
 import click
 
-from gurk.cli import core, info, setup
+from gurk.cli import core, info, logs, setup
 from gurk.cli.utils import (
     CORE_COMMANDS,
     GROUP_CONTEXT_SETTINGS,
@@ -72,6 +72,17 @@ def info_cmd(ctx: click.Context):
     )
 
 
+@main.command(name="logs", context_settings=SUBCOMMAND_CONTEXT_SETTINGS)
+@click.pass_context
+def logs_cmd(ctx: click.Context):
+    """List past runs and their tasks, search their logs or follow a running task"""
+    logs.main(
+        argv=ctx.args,
+        prog=get_prog(ctx.info_name),
+        description=ctx.command.help,
+    )
+
+
 @main.command(name="pytest", context_settings=SUBCOMMAND_CONTEXT_SETTINGS)
 @click.pass_context
 def pytest_cmd(ctx: click.Context):
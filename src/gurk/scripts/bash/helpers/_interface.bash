@@ -1,6 +1,8 @@
 get_config_args() {
 	: '
 	Parses command-line arguments to extract system information and configuration directory.
+	A pre-rendered "--config-args-file" (see "render_bash_config_args" in "gurk/utils/interface.py")
+	is sourced directly, avoiding any subprocesses.
 	Populates global variables:
 	  - SYSTEM_INFO:       Associative array of system information key-value pairs.
 	  - CONFIG_FILE:       Path to the task configuration file.
@@ -32,6 +34,22 @@ get_config_args() {
 				fi
 				system_info_raw="$1"
 				;;
+			--config-args-file)
+				shift
+				if [[ -z "$1" || "$1" == --* ]]; then
+					echo "Error: --config-args-file requires a value" >&2
+					return 1
+				fi
+				if [[ ! -f "$1" ]]; then
+					echo "Error: Config args file not found: $1" >&2
+					return 1
+				fi
+				source "$1"
+				if [[ -n "$CONFIG_FILE" && ! -f "$CONFIG_FILE" ]]; then
+					echo "Error: Config file not found: $CONFIG_FILE" >&2
+					return 1
+				fi
+				;;
 			--config-file)
 				shift
 				if [[ -z "$1" || "$1" == --* ]]; then
@@ -67,8 +85,11 @@ get_config_args() {
 		for pair in "${pairs[@]}"; do
 			key="${pair%%:*}"
 			val="${pair#*:}"
-			key="$(echo "$key" | xargs)"
-			val="$(echo "$val" | xargs)"
+			# Trim whitespace (without spawning subprocesses)
+			key="${key#"${key%%[![:space:]]*}"}"
+			key="${key%"${key##*[![:space:]]}"}"
+			val="${val#"${val%%[![:space:]]*}"}"
+			val="${val%"${val##*[![:space:]]}"}"
 			SYSTEM_INFO["$key"]="$val"
 		done
 	fi
@@ -194,6 +194,60 @@ _contains() {
 	return 1
 }
 
+_load_interactive_env() {
+	: '
+	Load the environment of an interactive shell (i.e. after sourcing ~/.bashrc) into the global
+	associative array "_GURK_INTERACTIVE_ENV". The interactive shell is only started again if
+	~/.bashrc changed since the last call, so repeated checks within one shell are free.
+
+	NOTE: Call this directly (not in a subshell, e.g. "$(...)"), otherwise nothing is cached.
+
+	Args:
+	  None
+	Outputs:
+	  None
+	Returns:
+	  0 (unless an unexpected error occurs)
+	'
+	local bashrc_content=""
+	if [[ -f "$HOME/.bashrc" ]]; then
+		IFS= read -r -d '' bashrc_content <"$HOME/.bashrc" || true
+	fi
+	if [[ -v _GURK_INTERACTIVE_BASHRC && "$bashrc_content" == "$_GURK_INTERACTIVE_BASHRC" ]]; then
+		return 0
+	fi
+
+	declare -gA _GURK_INTERACTIVE_ENV=()
+	declare -g _GURK_INTERACTIVE_BASHRC="$bashrc_content"
+
+	# Only keep entries after the start marker (ignore any output of ~/.bashrc)
+	local entry started=false
+	while IFS= read -r -d '' entry; do
+		if [[ "$started" == true ]]; then
+			_GURK_INTERACTIVE_ENV["${entry%%=*}"]="${entry#*=}"
+		elif [[ "$entry" == "__GURK_ENV_START__" ]]; then
+			started=true
+		fi
+	done < <(bash -ic 'printf "\0__GURK_ENV_START__\0"; env -0' 2>/dev/null </dev/null)
+}
+
+interactive_command_path() {
+	: '
+	Get the path of a command as found by an interactive shell (i.e. with the PATH after sourcing
+	~/.bashrc). Uses "_load_interactive_env", so call that directly beforehand to cache its results.
+
+	Args:
+	  - command:   Name of the command.
+	Outputs:
+	  Path to the command (empty if not found)
+	Returns:
+	  0 (unless an unexpected error occurs)
+	'
+	local command_name="$1"
+	_load_interactive_env
+	PATH="${_GURK_INTERACTIVE_ENV[PATH]:-$PATH}" command -v "$command_name" || true
+}
+
 _wait_dpkg() {
 	: '
 	Install packages with dpkg lock waiting to avoid conflicts.
@@ -241,20 +295,18 @@ revert_sudo_permissions() {
 	Revert ownership and permissions of folders/files created with sudo to the original user.
 
 	Args:
-	  - target:   Path to the target file or directory.
+	  - targets:  Paths to the target files or directories (at least one).
 	Outputs:
 	  None
 	Returns:
 	  0 (unless an unexpected error occurs)
 	'
-	local target="$1"
-
 	# Change ownership
-	sudo chown -R "$SUDO_USER:$SUDO_USER" "$target"
+	sudo chown -R "$SUDO_USER:$SUDO_USER" "$@"
 
 	# Directories: 775
-	sudo find "$target" -type d -exec chmod 775 {} +
+	sudo find "$@" -type d -exec chmod 775 {} +
 
 	# Files: 664
-	sudo find "$target" -type f -exec chmod 664 {} +
+	sudo find "$@" -type f -exec chmod 664 {} +
 }
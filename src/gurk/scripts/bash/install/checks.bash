@@ -29,7 +29,8 @@ check_install_conda() {
 	Returns:
 	  0 if installed, 1 otherwise
 	'
-	local conda_path=$(bash -ic 'echo $CONDA_EXE')
+	_load_interactive_env
+	local conda_path="${_GURK_INTERACTIVE_ENV[CONDA_EXE]:-}"
 	if [ -n "$conda_path" ]; then
 		echo "$conda_path"
 		return 0
@@ -49,7 +50,8 @@ check_install_mamba() {
 	Returns:
 	  0 if installed, 1 otherwise
 	'
-	local mamba_path=$(bash -ic 'echo $MAMBA_EXE')
+	_load_interactive_env
+	local mamba_path="${_GURK_INTERACTIVE_ENV[MAMBA_EXE]:-}"
 	if [ -n "$mamba_path" ]; then
 		echo "$mamba_path"
 		return 0
@@ -69,7 +71,8 @@ check_install_fzf() {
 	Returns:
 	  0 if installed, 1 otherwise
 	'
-	local fzf_path=$(bash -ic 'command -v fzf || true')
+	_load_interactive_env
+	local fzf_path=$(interactive_command_path fzf)
 	if [ -n "$fzf_path" ]; then
 		echo "$fzf_path"
 		return 0
@@ -222,8 +225,9 @@ check_install_isaacsim() {
 	Returns:
 	  0 if installed, 1 otherwise
 	'
-	local isaacsim_path=$(bash -ic 'echo ${ISAACSIM_PATH}')
-	local isaacsim_python_exe=$(bash -ic 'echo ${ISAACSIM_PYTHON_EXE}')
+	_load_interactive_env
+	local isaacsim_path="${_GURK_INTERACTIVE_ENV[ISAACSIM_PATH]:-}"
+	local isaacsim_python_exe="${_GURK_INTERACTIVE_ENV[ISAACSIM_PYTHON_EXE]:-}"
 	if [ -d "$isaacsim_path" ] && [ -f "$isaacsim_python_exe" ]; then
 		echo "$isaacsim_path"
 		return 0
@@ -247,7 +251,9 @@ check_install_isaaclab() {
 	Returns:
 	  0 if installed (with conda), 1 otherwise
 	'
-	if bash -ic "conda env list" | grep isaaclab; then
+	_load_interactive_env
+	local conda_exe="${_GURK_INTERACTIVE_ENV[CONDA_EXE]:-}"
+	if [ -n "$conda_exe" ] && "$conda_exe" env list | grep isaaclab; then
 		return 0
 	else
 		return 1
@@ -1,17 +1,27 @@
 import subprocess
 from pathlib import Path
-from shutil import copy2, copytree
 from typing import Any
 
 import commentjson
-import requests
 
 from gurk.core.logger import Logger, LoggerSeverity
 from gurk.scripts.python.helpers._interface import get_config_args
-from gurk.scripts.python.helpers.processing import get_clean_lines
+from gurk.scripts.python.helpers.filestructure import (
+    apply_filestructure,
+    plan_filestructure,
+)
+from gurk.scripts.python.helpers.processing import (
+    get_clean_lines,
+    get_jobs_arg,
+)
 from gurk.utils.common import resolve_package_path
-from gurk.utils.git_repos import clone_git_files, is_git_repo
-from gurk.utils.interface import bash_check, revert_sudo_permissions
+from gurk.utils.git_repos import (
+    get_remote_refs_stats,
+    is_remote_url,
+    parse_git_ref,
+    resolve_remote_refs,
+)
+from gurk.utils.interface import bash_check
 from gurk.utils.patterns import PatternCollection
 from gurk.utils.yaml import load_yaml
 
@@ -61,112 +71,7 @@ def configure_filestructure(*args: list[str]) -> None:
             warning=True,
         )
         return
-
-    def recursive_create_structure(
-        base_path: Path, structure: dict[str, Any], overwrite: bool, sudo: bool
-    ) -> None:
-        for name, content in structure.items():
-            dest_path = base_path / name
-            if (content is None or isinstance(content, str)) and (
-                dest_path.exists() and not overwrite
-            ):
-                Logger.step(
-                    f"Path {dest_path} already exists. Skipping creation...",
-                    warning=True,
-                )
-                continue
-
-            if content is None:
-                if Path(name).suffix:
-                    # It's a file
-                    dest_path.touch(exist_ok=True)
-                else:
-                    # It's a directory
-                    dest_path.mkdir(exist_ok=True)
-            elif isinstance(content, str):
-                # Detect URL or symlink
-                url_match = PatternCollection.PATH.patterns["url"].match(
-                    content
-                )
-                symlink_match = PatternCollection.PATH.patterns[
-                    "symlink"
-                ].match(content)
-
-                # Resolve package path (if applicable)
-                content = resolve_package_path(
-                    content if not symlink_match else symlink_match.group(1)
-                )
-                if content is None:
-                    Logger.step(
-                        f"Package resource in path '{content}' could not be resolved. Skipping...",
-                        warning=True,
-                    )
-                    continue
-
-                # Get content based on type
-                if is_git_repo(content):
-                    Logger.step(
-                        f"Cloning git repository {content} into {dest_path}..."
-                    )
-                    cloned_path = clone_git_files(
-                        content, dest_path, overwrite
-                    )
-                    if cloned_path is None:
-                        Logger.step(
-                            f"Failed to clone git repository {content}. Skipping...",
-                            warning=True,
-                        )
-                        continue
-                elif url_match:
-                    Logger.step(
-                        f"Downloading file from {content} to {dest_path}..."
-                    )
-                    response = requests.get(
-                        content, timeout=60, headers={"Accept-Encoding": "*"}
-                    )
-                    if response.status_code == 200:
-                        dest_path.write_bytes(response.content)
-                    else:
-                        Logger.step(
-                            f"Failed to download file from {content}. HTTP status code: {response.status_code}",
-                            warning=True,
-                        )
-                else:
-                    # Assumed local path (possibly symlinked)
-                    content = Path(content).expanduser()
-                    if not content.exists():
-                        Logger.step(
-                            f"Source '{content}' does not exist. Skipping...",
-                            warning=True,
-                        )
-                        continue
-
-                    if symlink_match:
-                        Logger.step(
-                            f"Creating symlink from {content} to {dest_path}..."
-                        )
-                        dest_path.symlink_to(content)
-                    else:
-                        Logger.step(
-                            f"Copying from local path {content} to {dest_path}..."
-                        )
-                        if content.is_file():
-                            copy2(content, dest_path)
-                        elif content.is_dir():
-                            copytree(content, dest_path, dirs_exist_ok=True)
-            elif isinstance(content, dict):
-                # It's a directory with further contents
-                dest_path.mkdir(exist_ok=True)
-                recursive_create_structure(dest_path, content, overwrite, sudo)
-            else:
-                Logger.step(
-                    f"Unsupported entry type '{type(content)}' for {content}. Skipping...",
-                    warning=True,
-                )
-
-            # Revert to user permissions if under HOME directory
-            if not sudo:
-                revert_sudo_permissions(dest_path)
+    jobs = get_jobs_arg(remaining_args)
 
     # Check file structure
     config_data = load_yaml(config_file)
@@ -177,25 +82,72 @@ def configure_filestructure(*args: list[str]) -> None:
         )
         raise ValueError
 
-    # (STEP) Creating file structure...
+    def collect_remote_urls(structure: dict[str, Any]) -> list[str]:
+        urls = []
+        for content in structure.values():
+            if isinstance(content, dict):
+                urls.extend(collect_remote_urls(content))
+            elif isinstance(content, str):
+                # Same resolution as in 'plan_filestructure'
+                symlink_match = PatternCollection.PATH.patterns[
+                    "symlink"
+                ].match(content)
+                content = resolve_package_path(
+                    content if not symlink_match else symlink_match.group(1)
+                )
+                if content is None:
+                    continue
+                url = parse_git_ref(content)["url"]
+                if is_remote_url(url):
+                    urls.append(url)
+        return urls
+
+    # Resolve the refs of all remote sources at once (reused by 'is_git_repo'
+    # and the clones)
+    root = "--root" in remaining_args
+    remote_urls = collect_remote_urls(config_data.get("HOME") or {})
+    if root:
+        remote_urls += collect_remote_urls(config_data.get("ROOT") or {})
+    resolve_remote_refs(remote_urls)
+
+    # (STEP) Planning file structure...
+    ops = []
     if config_data.get("HOME"):
-        recursive_create_structure(
+        ops += plan_filestructure(
             Path.home(),
             config_data["HOME"],
             force,
             False,
         )
     if config_data.get("ROOT"):
-        if "--root" not in remaining_args:
+        if not root:
             Logger.logrichprint(
                 LoggerSeverity.WARNING,
                 "Skipping root (/) file structure configuration, as '--root' flag is not provided.",
             )
         else:
-            recursive_create_structure(
+            ops += plan_filestructure(
                 Path("/"), config_data["ROOT"], False, True
             )
 
+    # (STEP) Creating file structure (only missing/changed entries)...
+    counts = apply_filestructure(ops, jobs)
+    Logger.step(
+        "File structure entries: "
+        + (
+            ", ".join(f"{n} {status}" for status, n in counts.items() if n)
+            or "none"
+        ),
+        warning=counts["failed"] > 0,
+    )
+
+    stats = get_remote_refs_stats()
+    if stats["ls-remote"] or stats["cached"]:
+        Logger.step(
+            f"Resolved git remotes with {stats['ls-remote']} ls-remote "
+            f"call(s), {stats['cached']} round trip(s) saved by the ref cache"
+        )
+
 
 def configure_vscode_keybindings(*args: list[str]) -> None:
     """
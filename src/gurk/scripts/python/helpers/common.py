@@ -1,7 +1,21 @@
 from pathlib import Path
 
 from gurk.core.logger import Logger
-from gurk.utils.interface import PACKAGE_BASH_HELPERS_PATH, run_script_function
+from gurk.scripts.python.helpers.marking import write_marked
+
+
+def add_aliases(commands: list[str]) -> None:
+    """
+    Add aliases to ~/.bashrc (within the GURK markers), skipping those that
+    already exist. The file is edited once for all aliases.
+
+    :param commands: The alias commands to add (e.g. "name='command'")
+    :type commands: list[str]
+    """
+    alias_cmds = [f"alias {command}" for command in commands]
+    written = write_marked(alias_cmds, Path.home() / ".bashrc")
+    for alias_cmd in written or []:
+        Logger.step(f"Sucessfully added alias: {alias_cmd}")
 
 
 def add_alias(command: str) -> None:
@@ -11,12 +25,4 @@ def add_alias(command: str) -> None:
     :param command: The alias command to add
     :type command: str
     """
-    alias_cmd = f"alias {command}"
-    run_script_function(
-        script=PACKAGE_BASH_HELPERS_PATH,
-        function="write_marked",
-        args=[alias_cmd, str(Path.home() / ".bashrc")],
-        run=True,
-        check=False,
-    )
-    Logger.step(f"Sucessfully added alias: {alias_cmd}")
+    add_aliases([command])
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from gurk.utils.common import PACKAGE_CACHE_PATH
+
+# Lock serializing the steps of environment creations that download and
+# extract packages into the package cache (conda's default 'pkgs_dirs'), as
+# conda doesn't lock it
+CONDA_PKGS_LOCK = PACKAGE_CACHE_PATH / "conda" / "pkgs.lock"
+
+# Explicit lockfiles of created environments (see 'get_conda_lockfile')
+CONDA_LOCKS_PATH = PACKAGE_CACHE_PATH / "conda" / "locks"
+
+
+def get_conda_env_names(conda_exe: str) -> set[str] | None:
+    """
+    Get the names of all environments with a single 'env list' call. The root
+    prefix (listed first) is named "base", and environments outside of an
+    'envs' directory (created with '--prefix') have no name.
+
+    :param conda_exe: Path to the conda (or mamba) executable
+    :type conda_exe: str
+    :return: Names of the existing environments, or None if the query failed
+    :rtype: set[str] | None
+    """
+    result = subprocess.run(
+        [conda_exe, "env", "list", "--json"],
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        env_paths = json.loads(result.stdout).get("envs", [])
+    except ValueError:
+        return None
+
+    env_names = set()
+    for i, env_path in enumerate(map(Path, env_paths)):
+        if env_path.parent.name == "envs":
+            env_names.add(env_path.name)
+        elif i == 0:
+            env_names.add("base")
+    return env_names
+
+
+def conda_env_exists(conda_exe: str, env_name: str) -> bool:
+    """
+    Check whether an environment exists by running a command in it (slow, so
+    only if the environments could not be listed, see 'get_conda_env_names').
+
+    :param conda_exe: Path to the conda (or mamba) executable
+    :type conda_exe: str
+    :param env_name: Name of the environment
+    :type env_name: str
+    :return: Whether the environment exists
+    :rtype: bool
+    """
+    result = subprocess.run(
+        [conda_exe, "run", "-n", env_name, "echo", "Environment exists"],
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def solve_conda_env(conda_exe: str, env_file: dict[str, Any]) -> str | None:
+    """
+    Solve an environment specification (its conda packages) without creating
+    it, into an explicit spec (as a lockfile, see 'get_conda_lockfile'). The
+    package cache is only read, so solves may run concurrently.
+
+    :param conda_exe: Path to the conda (or mamba) executable
+    :type conda_exe: str
+    :param env_file: Environment specification (as in an environment.yaml)
+    :type env_file: dict[str, Any]
+    :return: Explicit spec, or None if the solve (or its plan) failed
+    :rtype: str | None
+    """
+    specs = [dep for dep in env_file["dependencies"] if isinstance(dep, str)]
+    channels = [arg for ch in env_file["channels"] for arg in ("-c", ch)]
+    with TemporaryDirectory() as tmp_dir:
+        # NOTE: A prefix that doesn't exist, as the environment may exist
+        result = subprocess.run(
+            [
+                conda_exe,
+                "create",
+                "--dry-run",
+                "--json",
+                "-p",
+                str(Path(tmp_dir) / env_file["name"]),
+                *channels,
+                *specs,
+            ],
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+        )
+    if result.returncode != 0:
+        return None
+    try:
+        links = json.loads(result.stdout)["actions"]["LINK"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    lines = ["@EXPLICIT"]
+    for link in links:
+        url = link.get("url")
+        if not url:
+            return None  # E.g. an older conda that plans without URLs
+        lines.append(f"{url}#{link['md5']}" if link.get("md5") else url)
+    return "\n".join(lines) + "\n"
+
+
+def get_conda_lockfile(env_type: str, env_file: dict[str, Any]) -> Path:
+    """
+    Get the path of the explicit lockfile (exact package URLs and hashes, so
+    no solve is needed) for an environment specification. It changes with the
+    specification, so an outdated lockfile is never used.
+
+    :param env_type: Type of the environment ("conda", "mamba")
+    :type env_type: str
+    :param env_file: Environment specification (as in an environment.yaml)
+    :type env_file: dict[str, Any]
+    :return: Path to the (possibly not yet existing) lockfile
+    :rtype: Path
+    """
+    spec_hash = hashlib.sha1(
+        json.dumps([env_type, env_file], sort_keys=True).encode()
+    ).hexdigest()[:12]
+    return CONDA_LOCKS_PATH / f"{env_file['name']}_{spec_hash}.txt"
+
+
+def write_conda_lockfile(
+    conda_exe: str, env_name: str, lockfile: Path
+) -> bool:
+    """
+    Write the explicit lockfile of an existing environment.
+
+    :param conda_exe: Path to the conda (or mamba) executable
+    :type conda_exe: str
+    :param env_name: Name of the environment
+    :type env_name: str
+    :param lockfile: Path to write the lockfile to
+    :type lockfile: Path
+    :return: Whether the lockfile was written
+    :rtype: bool
+    """
+    # NOTE: micromamba only supports the 'env export' variant
+    for cmd in (
+        [conda_exe, "list", "-n", env_name, "--explicit", "--md5"],
+        [conda_exe, "env", "export", "-n", env_name, "--explicit", "--md5"],
+    ):
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL
+        )
+        if result.returncode == 0 and "@EXPLICIT" in result.stdout:
+            lockfile.parent.mkdir(parents=True, exist_ok=True)
+            tmp_lockfile = lockfile.with_suffix(".tmp")
+            tmp_lockfile.write_text(result.stdout)
+            tmp_lockfile.replace(lockfile)
+            return True
+    return False
@@ -0,0 +1,598 @@
+import json
+import os
+import stat
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from shutil import copy2, copytree, rmtree
+from typing import Any, Literal, TypeAlias, TypedDict, get_args
+
+import requests
+
+from gurk.core.logger import Logger
+from gurk.scripts.python.helpers.processing import (
+    DEFAULT_JOBS,
+    run_concurrently,
+)
+from gurk.utils.common import PACKAGE_CACHE_PATH, resolve_package_path
+from gurk.utils.downloads import (
+    download_file,
+    fetch_url,
+    parse_download_ref,
+    read_downloads_index,
+)
+from gurk.utils.files import (
+    hash_file,
+    inherit_ownership,
+    is_same_file,
+    make_dirs,
+)
+from gurk.utils.git_repos import (
+    clone_git_files,
+    get_local_commit,
+    get_target_commit,
+    is_git_repo,
+    parse_git_ref,
+)
+from gurk.utils.interface import revert_sudo_permissions
+from gurk.utils.patterns import PatternCollection
+
+# Recorded state of downloaded and cloned entries, whose sources can't be
+# compared to directly (see 'FileState')
+FILESTRUCTURE_STATE_PATH = PACKAGE_CACHE_PATH / "filestructure.json"
+
+FileOpStatus: TypeAlias = Literal[
+    "created", "updated", "unchanged", "skipped", "failed"
+]
+
+
+class FileOpKind(Enum):
+    """
+    Kinds of operations to create a file structure entry.
+    """
+
+    # fmt: off
+    MKDIR    = "mkdir"
+    TOUCH    = "touch"
+    CLONE    = "clone"
+    DOWNLOAD = "download"
+    COPY     = "copy"
+    SYMLINK  = "symlink"
+    # fmt: on
+
+    @property
+    def is_leaf_io(self) -> bool:
+        """
+        Whether the operation transfers content (and may run concurrently, as
+        it never creates the parent of another entry).
+        """
+        return self not in (FileOpKind.MKDIR, FileOpKind.TOUCH)
+
+
+class FileState(TypedDict):
+    """
+    TypedDict representing the recorded state of an entry: the revision of
+    its source (SHA-256 of a download, commit of a clone) and the signature
+    of the entry when it was created (see '_get_signature').
+    """
+
+    # fmt: off
+    source:    str
+    revision:  str
+    signature: list[int]
+    # fmt: on
+
+
+@dataclass
+class FileOp:
+    """
+    Data class representing a planned file structure operation.
+    """
+
+    # fmt: off
+    kind:      FileOpKind
+    dest:      Path
+    source:    str | None = None
+    overwrite: bool                   = False
+    sudo:      bool                   = False
+    dest_stat: os.stat_result | None  = None
+    state:     FileState | None       = None
+    # fmt: on
+
+
+def read_filestructure_state() -> dict[str, FileState]:
+    """
+    Read the recorded state of the file structure entries, by path.
+
+    :return: Recorded state per entry path
+    :rtype: dict[str, FileState]
+    """
+    try:
+        return json.loads(FILESTRUCTURE_STATE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_filestructure_state(state: dict[str, FileState]) -> None:
+    """
+    Atomically write the recorded state of the file structure entries, owned
+    by the owner of the cache (see 'inherit_ownership').
+
+    :param state: Recorded state per entry path
+    :type state: dict[str, FileState]
+    """
+    make_dirs(FILESTRUCTURE_STATE_PATH.parent)
+    tmp_path = FILESTRUCTURE_STATE_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+    inherit_ownership(tmp_path)
+    tmp_path.replace(FILESTRUCTURE_STATE_PATH)
+
+
+def _scan_dir(path: Path) -> dict[str, os.DirEntry]:
+    """
+    List a directory once, so its entries are only stat'ed when needed.
+
+    :param path: Path to the directory
+    :type path: Path
+    :return: Entries by name (empty if the directory doesn't exist)
+    :rtype: dict[str, os.DirEntry]
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry for entry in entries}
+    except OSError:
+        return {}
+
+
+def _get_signature(
+    path: Path, path_stat: os.stat_result | None = None
+) -> list[int]:
+    """
+    Get a cheap signature of an entry, which changes when it is modified:
+    size and modification time of a file, or number of entries, total size
+    and latest modification time of a directory tree.
+
+    :param path: Path to the entry
+    :type path: Path
+    :param path_stat: Already known 'lstat' of the entry (if any)
+    :type path_stat: os.stat_result | None
+    :return: Signature of the entry
+    :rtype: list[int]
+    """
+    path_stat = path_stat or path.lstat()
+    if not stat.S_ISDIR(path_stat.st_mode):
+        return [path_stat.st_size, path_stat.st_mtime_ns]
+
+    n_entries, size, mtime = 0, 0, path_stat.st_mtime_ns
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            entry_stat = os.lstat(os.path.join(root, name))
+            n_entries += 1
+            if not stat.S_ISDIR(entry_stat.st_mode):
+                size += entry_stat.st_size
+            mtime = max(mtime, entry_stat.st_mtime_ns)
+    return [n_entries, size, mtime]
+
+
+def plan_filestructure(
+    base_path: Path,
+    structure: dict[str, Any],
+    overwrite: bool,
+    sudo: bool,
+    state: dict[str, FileState] | None = None,
+) -> list[FileOp]:
+    """
+    Plan the operations to create a file structure (see the
+    'configure_filestructure.yaml' config for the entry types). The target
+    tree is stat'ed once (one listing per directory); existing entries are
+    planned too, and compared to their source when applied. Invalid entries
+    are reported and skipped. Directories come before their contents.
+
+    :param base_path: Path to create the structure in
+    :type base_path: Path
+    :param structure: File structure mapping
+    :type structure: dict[str, Any]
+    :param overwrite: Whether to overwrite existing entries
+    :type overwrite: bool
+    :param sudo: Whether the entries are created as root (else their
+                 ownership is reverted to the user)
+    :type sudo: bool
+    :param state: Recorded state of the entries (read if not given)
+    :type state: dict[str, FileState] | None
+    :return: Planned operations
+    :rtype: list[FileOp]
+    """
+    if state is None:
+        state = read_filestructure_state()
+
+    ops = []
+    entries = _scan_dir(base_path)
+    for name, content in structure.items():
+        dest_path = base_path / name
+        try:
+            if name in entries:
+                dest_stat = entries[name].stat(follow_symlinks=False)
+            else:
+                # Nested names (e.g. 'a/b') aren't in the listing
+                dest_stat = dest_path.lstat() if os.sep in name else None
+        except OSError:
+            dest_stat = None
+
+        if content is None:
+            # File (with suffix) or directory
+            kind = FileOpKind.TOUCH if Path(name).suffix else FileOpKind.MKDIR
+            ops.append(
+                FileOp(
+                    kind,
+                    dest_path,
+                    overwrite=overwrite,
+                    sudo=sudo,
+                    dest_stat=dest_stat,
+                )
+            )
+        elif isinstance(content, str):
+            # Detect URL or symlink
+            url_match = PatternCollection.PATH.patterns["url"].match(content)
+            symlink_match = PatternCollection.PATH.patterns["symlink"].match(
+                content
+            )
+
+            # Resolve package path (if applicable)
+            source = resolve_package_path(
+                content if not symlink_match else symlink_match.group(1)
+            )
+            if source is None:
+                Logger.step(
+                    f"Package resource in path '{content}' could not be resolved. Skipping...",
+                    warning=True,
+                )
+                continue
+
+            # Get content based on type
+            if is_git_repo(source):
+                kind = FileOpKind.CLONE
+            elif url_match:
+                kind = FileOpKind.DOWNLOAD
+            else:
+                # Assumed local path (possibly symlinked)
+                source = str(Path(source).expanduser())
+                if not Path(source).exists():
+                    Logger.step(
+                        f"Source '{source}' does not exist. Skipping...",
+                        warning=True,
+                    )
+                    continue
+                kind = FileOpKind.SYMLINK if symlink_match else FileOpKind.COPY
+            ops.append(
+                FileOp(
+                    kind,
+                    dest_path,
+                    source,
+                    overwrite,
+                    sudo,
+                    dest_stat,
+                    state.get(str(dest_path)),
+                )
+            )
+        elif isinstance(content, dict):
+            # It's a directory with further contents
+            ops.append(
+                FileOp(
+                    FileOpKind.MKDIR, dest_path, sudo=sudo, dest_stat=dest_stat
+                )
+            )
+            ops.extend(
+                plan_filestructure(dest_path, content, overwrite, sudo, state)
+            )
+        else:
+            Logger.step(
+                f"Unsupported entry type '{type(content)}' for {content}. Skipping...",
+                warning=True,
+            )
+
+    return ops
+
+
+def _is_tree_unchanged(src: Path, dest: Path) -> bool:
+    """
+    Check if all files of a source directory have the same content in the
+    destination directory (see 'is_same_file'). Additional files in the
+    destination are ignored, as copies merge into existing directories.
+
+    :param src: Path to the source directory
+    :type src: Path
+    :param dest: Path to the destination directory
+    :type dest: Path
+    :return: True if no file has to be copied
+    :rtype: bool
+    """
+    for root, _, files in os.walk(src, followlinks=True):
+        dest_root = dest / Path(root).relative_to(src)
+        for name in files:
+            if not is_same_file(Path(root) / name, dest_root / name):
+                return False
+    return True
+
+
+def _copy_if_changed(src: str, dest: str) -> str:
+    """
+    Copy a file (see 'copy2'), unless the destination has the same content.
+
+    :param src: Path to the source file
+    :type src: str
+    :param dest: Path to the destination file
+    :type dest: str
+    :return: Path to the destination file
+    :rtype: str
+    """
+    if not is_same_file(Path(src), Path(dest)):
+        copy2(src, dest)
+    return dest
+
+
+def _is_unchanged(op: FileOp) -> bool:
+    """
+    Compare an existing entry with its source: copies by size and
+    modification time (or hash), symlinks by target, downloads by SHA-256
+    against the cached download, and clones by commit. Downloads and path
+    clones are matched against their recorded state first, so unchanged
+    entries aren't read. Downloads are only revalidated when overwriting.
+
+    :param op: Operation of an existing entry (with 'dest_stat')
+    :type op: FileOp
+    :return: True if the entry doesn't have to be updated
+    :rtype: bool
+    """
+    mode = op.dest_stat.st_mode
+    if op.kind == FileOpKind.SYMLINK:
+        return stat.S_ISLNK(mode) and os.readlink(op.dest) == op.source
+    elif op.kind == FileOpKind.COPY:
+        source = Path(op.source)
+        if source.is_dir():
+            return stat.S_ISDIR(mode) and _is_tree_unchanged(source, op.dest)
+        return is_same_file(source, op.dest, op.dest_stat)
+    elif op.kind == FileOpKind.DOWNLOAD:
+        url, revision = parse_download_ref(op.source)
+        if revision is None and op.overwrite:
+            revision = fetch_url(op.source)[0].name
+        elif revision is None:
+            entry = read_downloads_index().get(url)
+            revision = entry["sha256"] if entry else None
+        if revision is None or not stat.S_ISREG(mode):
+            return False
+    elif op.kind == FileOpKind.CLONE:
+        revision = get_target_commit(op.source)
+        if revision is None:
+            return False
+        if not parse_git_ref(op.source)["path"]:
+            commit = None
+            if (op.dest / ".git").exists():
+                commit = get_local_commit(op.dest)
+            return commit is not None and commit.startswith(revision)
+    else:
+        return False
+
+    # Downloads and path clones: recorded state, else the file's hash
+    if op.state == {
+        "source": op.source,
+        "revision": revision,
+        "signature": _get_signature(op.dest, op.dest_stat),
+    }:
+        return True
+    if op.kind == FileOpKind.DOWNLOAD and hash_file(op.dest) == revision:
+        op.state = {
+            "source": op.source,
+            "revision": revision,
+            "signature": _get_signature(op.dest, op.dest_stat),
+        }
+        return True
+    return False
+
+
+def apply_file_op(op: FileOp) -> FileOpStatus:
+    """
+    Apply a single file structure operation. An existing entry is compared
+    with its source first (see '_is_unchanged'), and only updated if it
+    changed and the operation overwrites. File system errors (e.g. permission
+    denied, disk full) fail the operation, not the others.
+
+    :param op: Operation to apply
+    :type op: FileOp
+    :return: Outcome of the operation
+    :rtype: FileOpStatus
+    """
+    try:
+        return _apply_file_op(op)
+    except OSError as exc:
+        Logger.step(f"Failed to create {op.dest}: {exc}", warning=True)
+        return "failed"
+
+
+def _apply_file_op(op: FileOp) -> FileOpStatus:
+    """
+    Apply a single file structure operation (see 'apply_file_op').
+
+    :param op: Operation to apply
+    :type op: FileOp
+    :return: Outcome of the operation
+    :rtype: FileOpStatus
+    :raises OSError: If the entry could not be created or updated
+    """
+    exists = op.dest_stat is not None
+    if op.kind in (FileOpKind.MKDIR, FileOpKind.TOUCH):
+        if not exists:
+            if op.kind == FileOpKind.MKDIR:
+                op.dest.mkdir(exist_ok=True)
+            else:
+                op.dest.touch(exist_ok=True)
+            return "created"
+        # NOTE: Symlinks to directories are used as directories
+        mode = op.dest_stat.st_mode
+        is_dir = stat.S_ISDIR(mode) or (
+            stat.S_ISLNK(mode) and op.dest.is_dir()
+        )
+        if is_dir == (op.kind == FileOpKind.MKDIR):
+            return "unchanged"
+        Logger.step(
+            f"Path {op.dest} already exists as another type. Skipping...",
+            warning=True,
+        )
+        return "skipped"
+
+    if exists:
+        try:
+            if _is_unchanged(op):
+                return "unchanged"
+        except (requests.RequestException, ValueError) as exc:
+            Logger.step(
+                f"Failed to check {op.dest} against {op.source}: {exc}",
+                warning=True,
+            )
+            return "failed"
+        if not op.overwrite:
+            Logger.step(
+                f"Path {op.dest} differs from its source. Skipping update "
+                "(requires '--force')...",
+                warning=True,
+            )
+            return "skipped"
+
+        # Replace entries that can't be updated in place
+        mode = op.dest_stat.st_mode
+        if op.kind == FileOpKind.SYMLINK or (
+            op.kind == FileOpKind.COPY
+            and (
+                stat.S_ISLNK(mode)
+                or stat.S_ISDIR(mode) != Path(op.source).is_dir()
+            )
+        ):
+            if stat.S_ISDIR(mode):
+                rmtree(op.dest)
+            else:
+                op.dest.unlink()
+
+    if op.kind == FileOpKind.CLONE:
+        Logger.step(f"Cloning git repository {op.source} into {op.dest}...")
+        revision = get_target_commit(op.source)
+        if clone_git_files(op.source, op.dest, op.overwrite) is None:
+            Logger.step(
+                f"Failed to clone git repository {op.source}. Skipping...",
+                warning=True,
+            )
+            return "failed"
+        if revision and parse_git_ref(op.source)["path"]:
+            op.state = {
+                "source": op.source,
+                "revision": revision,
+                "signature": _get_signature(op.dest),
+            }
+    elif op.kind == FileOpKind.DOWNLOAD:
+        Logger.step(f"Downloading file from {op.source} to {op.dest}...")
+        try:
+            # NOTE: Existing entries were just revalidated (if overwriting)
+            status = download_file(op.source, op.dest, refresh=not exists)
+        except (requests.RequestException, ValueError) as exc:
+            Logger.step(
+                f"Failed to download file from {op.source}: {exc}",
+                warning=True,
+            )
+            return "failed"
+        if status != "downloaded":
+            Logger.step(f"Download of {op.source}: {status}")
+        url, _ = parse_download_ref(op.source)
+        op.state = {
+            "source": op.source,
+            "revision": read_downloads_index()[url]["sha256"],
+            "signature": _get_signature(op.dest),
+        }
+    elif op.kind == FileOpKind.SYMLINK:
+        Logger.step(f"Creating symlink from {op.source} to {op.dest}...")
+        op.dest.symlink_to(op.source)
+    elif op.kind == FileOpKind.COPY:
+        Logger.step(f"Copying from local path {op.source} to {op.dest}...")
+        source = Path(op.source)
+        if source.is_file():
+            copy2(source, op.dest)
+        elif source.is_dir():
+            copytree(
+                source,
+                op.dest,
+                dirs_exist_ok=True,
+                copy_function=_copy_if_changed,
+            )
+    return "updated" if exists else "created"
+
+
+def get_ownership_roots(paths: list[Path]) -> list[Path]:
+    """
+    Get the minimal set of paths whose (recursive) ownership fix-up covers all
+    given paths, i.e. without the paths inside another given path.
+
+    :param paths: Paths to fix the ownership of
+    :type paths: list[Path]
+    :return: Outermost paths, in order
+    :rtype: list[Path]
+    """
+    roots = []
+    for path in sorted(set(paths), key=lambda path: path.parts):
+        if not roots or not path.is_relative_to(roots[-1]):
+            roots.append(path)
+    return roots
+
+
+def apply_filestructure(
+    ops: list[FileOp], jobs: int = DEFAULT_JOBS
+) -> dict[FileOpStatus, int]:
+    """
+    Apply planned file structure operations. Directories and empty files are
+    created first, in order (so parents exist before their contents). Then the
+    clones, downloads and copies run concurrently, each only writing if its
+    entry is missing or changed. Finally (even if interrupted), the ownership
+    of all entries created/updated for the user (or partially, if their
+    operation failed) is reverted at once, and the state of downloaded and
+    cloned entries is recorded.
+
+    :param ops: Planned operations (see 'plan_filestructure')
+    :type ops: list[FileOp]
+    :param jobs: Maximum number of concurrent operations
+    :type jobs: int
+    :return: Number of operations per outcome
+    :rtype: dict[FileOpStatus, int]
+    """
+    structure_ops = [op for op in ops if not op.kind.is_leaf_io]
+    leaf_ops = [op for op in ops if op.kind.is_leaf_io]
+    statuses: list[FileOpStatus] = []
+    try:
+        for op in structure_ops:
+            statuses.append(apply_file_op(op))
+        statuses += run_concurrently(apply_file_op, leaf_ops, jobs)
+    finally:
+        # Operations that didn't finish count as failed
+        statuses += ["failed"] * (len(ops) - len(statuses))
+        applied = list(zip(structure_ops + leaf_ops, statuses))
+
+        user_paths = [
+            op.dest
+            for op, status in applied
+            if status in ("created", "updated", "failed")
+            and not op.sudo
+            and os.path.lexists(op.dest)
+        ]
+        if user_paths:
+            revert_sudo_permissions(*get_ownership_roots(user_paths))
+
+        new_state = {
+            str(op.dest): op.state
+            for op, status in applied
+            if op.state is not None and status != "failed"
+        }
+        if new_state:
+            state = read_filestructure_state()
+            if any(
+                state.get(path) != entry for path, entry in new_state.items()
+            ):
+                _write_filestructure_state({**state, **new_state})
+
+    return {
+        status: statuses.count(status) for status in get_args(FileOpStatus)
+    }
@@ -0,0 +1,165 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Literal
+
+from gurk.core.logger import Logger
+from gurk.utils.common import FilePath
+
+# NOTE: The file is edited in memory, producing the same bytes as the bash
+#       helpers in 'marking.bash' (whose files are read line by line by awk,
+#       so the last line always ends with a newline after an insertion)
+_ENCODING = {"encoding": "utf-8", "errors": "surrogateescape", "newline": ""}
+
+
+def get_gurk_marker(marker_type: Literal["START", "END"]) -> str:
+    """
+    Get a GURK marker string (see '_gurk_marker' in 'marking.bash').
+
+    :param marker_type: "START" or "END"
+    :type marker_type: Literal["START", "END"]
+    :return: Marker string
+    :rtype: str
+    """
+    n_hashes = {"START": 20, "END": 21}[marker_type]
+    return f"{'#' * n_hashes} GURK {marker_type} {'#' * n_hashes}"
+
+
+def _split_lines(text: str) -> list[str]:
+    """
+    Split a file's content into lines, like awk does.
+
+    :param text: Content of the file
+    :type text: str
+    :return: Lines, without their newlines
+    :rtype: list[str]
+    """
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _join_lines(lines: list[str]) -> str:
+    """
+    Join lines into a file's content, like awk prints them.
+
+    :param lines: Lines, without their newlines
+    :type lines: list[str]
+    :return: Content of the file
+    :rtype: str
+    """
+    return "".join(f"{line}\n" for line in lines)
+
+
+def _insert_missing_markers(text: str) -> str | None:
+    """
+    Ensure that both GURK markers exist once in a file's content (see
+    '_insert_missing_markers' in 'marking.bash').
+
+    :param text: Content of the file
+    :type text: str
+    :return: Content with both markers, or None if the marker state is
+             incompatible (duplicated markers)
+    :rtype: str | None
+    """
+    start_marker = get_gurk_marker("START")
+    end_marker = get_gurk_marker("END")
+    lines = _split_lines(text)
+    n_start_markers = sum(start_marker in line for line in lines)
+    n_end_markers = sum(end_marker in line for line in lines)
+
+    if (n_start_markers, n_end_markers) == (0, 0):
+        # Add both markers if none exist
+        return f"{text}\n{start_marker}\n\n{end_marker}\n"
+    elif (n_start_markers, n_end_markers) == (1, 0):
+        # Add end marker after the start marker
+        new_lines = []
+        for line in lines:
+            new_lines.append(line)
+            if start_marker in line:
+                new_lines.append(end_marker)
+        return _join_lines(new_lines)
+    elif (n_start_markers, n_end_markers) == (0, 1):
+        # Add start marker (and an empty line) before the end marker
+        new_lines = []
+        for line in lines:
+            if end_marker in line:
+                new_lines.extend([start_marker, ""])
+            new_lines.append(line)
+        return _join_lines(new_lines)
+    elif (n_start_markers, n_end_markers) == (1, 1):
+        return text
+    # Unsure/incompatible marker state
+    return None
+
+
+def write_marked(
+    contents: list[str], file_path: FilePath, check_existing: bool = True
+) -> list[str] | None:
+    """
+    Write a batch of contents to a file, each wrapped into the GURK markers
+    (see 'write_marked' in 'marking.bash'). The file is read once, the
+    contents are applied in order (each skipped if any of its lines already
+    occurs in the file), and the file is written back atomically, only if
+    anything changed.
+
+    :param contents: Contents (e.g. lines) to write, in order
+    :type contents: list[str]
+    :param file_path: Path to the (existing) destination file
+    :type file_path: FilePath
+    :param check_existing: Whether to skip contents already in the file
+    :type check_existing: bool
+    :return: Contents that were written, or None if the file does not exist
+             or has an incompatible marker state
+    :rtype: list[str] | None
+    """
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        Logger.step(
+            f"(write_marked) File not found: {file_path}", warning=True
+        )
+        return None
+
+    with open(file_path, "r", **_ENCODING) as file:
+        text = original_text = file.read()
+
+    end_marker = get_gurk_marker("END")
+    written = []
+    for content in contents:
+        # NOTE: Like 'grep -F', any line of the content counts as a match
+        if check_existing and any(
+            line in text for line in content.split("\n")
+        ):
+            Logger.step(
+                f"(write_marked) {content} already exists in {file_path} - "
+                "Skipping"
+            )
+            continue
+
+        text = _insert_missing_markers(text)
+        if text is None:
+            Logger.step(
+                f"(write_marked) Skipping, as file '{file_path}' has "
+                "incompatible marker state",
+                warning=True,
+            )
+            return None
+
+        # Insert content (and an empty line) before the end marker
+        new_lines = []
+        for line in _split_lines(text):
+            if end_marker in line:
+                new_lines.extend([content, ""])
+            new_lines.append(line)
+        text = _join_lines(new_lines)
+        written.append(content)
+
+    if text != original_text:
+        tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+        with open(tmp_path, "w", **_ENCODING) as file:
+            file.write(text)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+
+    return written
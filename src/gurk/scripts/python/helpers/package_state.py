@@ -0,0 +1,294 @@
+import json
+import re
+import subprocess
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+
+from gurk.utils.common import FilePath
+
+DPKG_STATUS_PATH = Path("/var/lib/dpkg/status")
+
+# Installed packages (name -> version) per package manager, queried once per
+# process. None means that the state is unknown (e.g. manager not available)
+InstalledPackages = dict[str, str]
+_INSTALLED_PACKAGES_CACHE: dict[str, InstalledPackages | None] = {}
+_INSTALLED_PACKAGES_CACHE_LOCK = Lock()
+
+# Name of a (PyPI) package, optionally with extras and a pinned version
+_PIP_SPEC_RE = re.compile(
+    r"^(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)(\[[^\]]*\])?(==(?P<version>\S+))?$"
+)
+
+
+def parse_dpkg_status(path: FilePath = DPKG_STATUS_PATH) -> InstalledPackages:
+    """
+    Parse the dpkg status database (without calling dpkg or apt).
+
+    :param path: Path to the dpkg status file
+    :type path: FilePath
+    :return: Versions of installed packages, by name (and by 'name:arch')
+    :rtype: InstalledPackages
+    """
+    installed = {}
+
+    def add_paragraph(fields: dict[str, str]) -> None:
+        status = fields.get("Status", "").split()
+        if "Package" not in fields or not status or status[-1] != "installed":
+            return
+        installed[fields["Package"]] = fields.get("Version", "")
+        if "Architecture" in fields:
+            key = f"{fields['Package']}:{fields['Architecture']}"
+            installed[key] = fields.get("Version", "")
+
+    fields = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                # Paragraphs are separated by empty lines
+                add_paragraph(fields)
+                fields = {}
+            elif not line[0].isspace() and ":" in line:
+                # Ignore continuation lines (e.g. descriptions)
+                key, value = line.split(":", 1)
+                fields[key] = value.strip()
+    add_paragraph(fields)
+
+    return installed
+
+
+def parse_snap_list(output: str) -> InstalledPackages:
+    """
+    Parse the output of 'snap list'.
+
+    :param output: Output of the command
+    :type output: str
+    :return: Versions of installed snaps, by name
+    :rtype: InstalledPackages
+    """
+    installed = {}
+    for line in output.splitlines()[1:]:  # Skip header
+        columns = line.split()
+        if len(columns) >= 2:
+            installed[columns[0]] = columns[1]
+    return installed
+
+
+def parse_flatpak_list(output: str) -> InstalledPackages:
+    """
+    Parse the output of 'flatpak list --columns=application,version'.
+
+    :param output: Output of the command
+    :type output: str
+    :return: Versions of installed flatpaks, by application ID
+    :rtype: InstalledPackages
+    """
+    installed = {}
+    for line in output.splitlines():
+        columns = line.split("\t")
+        if not columns[0].strip() or columns[0] == "Application ID":
+            continue  # Skip empty lines and header (if any)
+        installed[columns[0].strip()] = (
+            columns[1].strip() if len(columns) > 1 else ""
+        )
+    return installed
+
+
+def parse_pipx_list(output: str) -> InstalledPackages:
+    """
+    Parse the output of 'pipx list --json'.
+
+    :param output: Output of the command
+    :type output: str
+    :return: Versions of installed pipx packages, by normalized name
+    :rtype: InstalledPackages
+    """
+    installed = {}
+    for venv_name, venv in json.loads(output).get("venvs", {}).items():
+        main_package = venv.get("metadata", {}).get("main_package", {})
+        name = main_package.get("package") or venv_name
+        version = main_package.get("package_version", "")
+        installed[_normalize_pip_name(name)] = version
+    return installed
+
+
+def parse_npm_list(output: str) -> InstalledPackages:
+    """
+    Parse the output of 'npm ls -g --depth=0 --json'.
+
+    :param output: Output of the command
+    :type output: str
+    :return: Versions of globally installed npm packages, by name
+    :rtype: InstalledPackages
+    """
+    dependencies = json.loads(output).get("dependencies", {})
+    return {
+        name: info.get("version", "") for name, info in dependencies.items()
+    }
+
+
+def parse_vscode_list(output: str) -> InstalledPackages:
+    """
+    Parse the output of 'code --list-extensions --show-versions'.
+
+    :param output: Output of the command
+    :type output: str
+    :return: Versions of installed extensions, by lower-case extension ID
+    :rtype: InstalledPackages
+    """
+    installed = {}
+    for line in output.splitlines():
+        extension, _, version = line.strip().partition("@")
+        if extension:
+            installed[extension.lower()] = version
+    return installed
+
+
+# Commands listing the installed packages, and their output parsers
+# fmt: off
+_LIST_COMMANDS: dict[str, tuple[list[str], Callable[[str], InstalledPackages]]] = {
+    "SNAP":    (["snap", "list"], parse_snap_list),
+    "FLATPAK": (["flatpak", "list", "--columns=application,version"], parse_flatpak_list),
+    "NPM":     (["npm", "ls", "-g", "--depth=0", "--json"], parse_npm_list),
+    "PIPX":    (["python3", "-m", "pipx", "list", "--json"], parse_pipx_list),
+    "VSC_EXT": (["code", "--list-extensions", "--show-versions"], parse_vscode_list),
+}
+# fmt: on
+
+
+def _normalize_pip_name(name: str) -> str:
+    """Normalize a python package name (see PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _query_installed_packages(manager: str) -> InstalledPackages | None:
+    """
+    Query the installed packages of a package manager.
+
+    :param manager: Name of the package manager (see InstallCommands)
+    :type manager: str
+    :return: Versions of installed packages by name, or None if unknown
+    :rtype: InstalledPackages | None
+    """
+    try:
+        if manager == "APT":
+            return parse_dpkg_status()
+        elif manager not in _LIST_COMMANDS:
+            return None
+
+        cmd, parser = _LIST_COMMANDS[manager]
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL
+        )
+        if result.returncode != 0 and manager != "NPM":
+            # NOTE: npm also returns non-zero for e.g. invalid peer packages
+            return None
+        return parser(result.stdout)
+    except (OSError, ValueError):
+        # Manager not available, or unexpected output
+        return None
+
+
+def get_installed_packages(
+    manager: str, refresh: bool = False
+) -> InstalledPackages | None:
+    """
+    Get the installed packages of a package manager. The state is only queried
+    once per process, unless refreshed or invalidated.
+
+    :param manager: Name of the package manager (see InstallCommands)
+    :type manager: str
+    :param refresh: Whether to query the state again
+    :type refresh: bool
+    :return: Versions of installed packages by name, or None if unknown
+    :rtype: InstalledPackages | None
+    """
+    with _INSTALLED_PACKAGES_CACHE_LOCK:
+        if refresh or manager not in _INSTALLED_PACKAGES_CACHE:
+            _INSTALLED_PACKAGES_CACHE[manager] = _query_installed_packages(
+                manager
+            )
+        return _INSTALLED_PACKAGES_CACHE[manager]
+
+
+def invalidate_installed_packages(manager: str) -> None:
+    """
+    Invalidate the queried state of a package manager, e.g. after installing.
+
+    :param manager: Name of the package manager (see InstallCommands)
+    :type manager: str
+    """
+    with _INSTALLED_PACKAGES_CACHE_LOCK:
+        _INSTALLED_PACKAGES_CACHE.pop(manager, None)
+
+
+def parse_package_spec(
+    manager: str, spec: str
+) -> tuple[str | None, str | None]:
+    """
+    Get the name and (pinned) version of a package specification, as used in
+    the package list files (e.g. 'curl', 'numpy==1.0' or 'ms-python.python@1.0').
+
+    :param manager: Name of the package manager (see InstallCommands)
+    :type manager: str
+    :param spec: Package specification
+    :type spec: str
+    :return: Name (None if it can not be determined) and version (if pinned)
+    :rtype: tuple[str | None, str | None]
+    """
+    tokens = spec.split()
+    if not tokens:
+        return None, None
+
+    if manager == "APT":
+        if len(tokens) > 1 or re.search(r"[*?\[\]^$]", spec) or spec[0] == "-":
+            return None, None  # Options, globs and regexes
+        name, _, version = spec.partition("=")
+        return name.split("/")[0], version or None
+    elif manager == "SNAP":
+        return tokens[0], None  # Remaining tokens are options (e.g. --classic)
+    elif manager == "FLATPAK":
+        refs = [token for token in tokens if not token.startswith("-")]
+        return (refs[-1].split("//")[0], None) if refs else (None, None)
+    elif manager == "NPM":
+        name, sep, version = tokens[0][1:].rpartition("@")
+        if not sep:
+            return tokens[0], None
+        return tokens[0][0] + name, version
+    elif manager == "PIPX":
+        match = _PIP_SPEC_RE.match(tokens[0])
+        if match is None:
+            return None, None  # E.g. URLs or local paths
+        return _normalize_pip_name(match["name"]), match["version"]
+    elif manager == "VSC_EXT":
+        name, _, version = tokens[0].lower().partition("@")
+        return name, version or None
+    return None, None
+
+
+def split_installed_packages(
+    manager: str, packages: list[str]
+) -> tuple[list[str], list[str]]:
+    """
+    Split packages into those that still need to be installed and those that
+    are already installed (in the pinned version, if any).
+
+    :param manager: Name of the package manager (see InstallCommands)
+    :type manager: str
+    :param packages: Package specifications
+    :type packages: list[str]
+    :return: Missing and installed packages
+    :rtype: tuple[list[str], list[str]]
+    """
+    installed = get_installed_packages(manager)
+    if installed is None:
+        return list(packages), []
+
+    missing, present = [], []
+    for pkg in packages:
+        name, version = parse_package_spec(manager, pkg)
+        if name in installed and version in (None, installed[name]):
+            present.append(pkg)
+        else:
+            missing.append(pkg)
+    return missing, present
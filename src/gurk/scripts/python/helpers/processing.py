@@ -1,8 +1,26 @@
+import re
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
+from typing import Callable, Iterable, TypeVar
 
 from gurk.core.logger import Logger
+from gurk.scripts.python.helpers.package_state import (
+    invalidate_installed_packages,
+    split_installed_packages,
+)
+from gurk.utils.common import format_bytes
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Default number of concurrent jobs (see 'get_jobs_arg')
+DEFAULT_JOBS = 4
+
+# Layer status line of 'docker pull' (e.g. "a1b2c3d4e5f6: Pull complete")
+_DOCKER_LAYER_RE = re.compile(r"^([0-9a-f]{12}): (.+)$")
 
 
 class InstallCommands(Enum):
@@ -32,6 +50,40 @@ class InstallCommands(Enum):
     DOCKER  = "docker pull"
     # fmt: on
 
+    @property
+    def batchable(self) -> bool:
+        """
+        Whether the command can install multiple packages in one invocation.
+        """
+        return self in (
+            InstallCommands.APT,
+            InstallCommands.NPM,
+            InstallCommands.VSC_EXT,
+        )
+
+    @property
+    def transactional(self) -> bool:
+        """
+        Whether a batched installation fails as a whole if any of its packages
+        fails (e.g. one apt transaction), i.e. installs none of them.
+        """
+        return self in (InstallCommands.APT, InstallCommands.NPM)
+
+    def build(self, packages: list[str]) -> str:
+        """
+        Build the command installing the given packages in one invocation.
+
+        :param packages: List of package names to install
+        :type packages: list[str]
+        :return: The shell command
+        :rtype: str
+        """
+        if self == InstallCommands.VSC_EXT:
+            # Every extension needs its own flag
+            exe, flag = self.value.split(" ", 1)
+            return " ".join([exe, *(f"{flag} {pkg}" for pkg in packages)])
+        return f"{self.value} {' '.join(packages)}"
+
 
 def get_clean_lines(filename: Path) -> list[str]:
     """
@@ -54,8 +106,99 @@ def get_clean_lines(filename: Path) -> list[str]:
     return clean_lines
 
 
-def install_packages_from_list(
+def _install_packages(
+    install_command: InstallCommands, packages: list[str]
+) -> bool:
+    """
+    Runs the installation command once for all given packages.
+
+    :param install_command: InstallCommands enum value specifying the installation command
+    :type install_command: InstallCommands
+    :param packages: List of package names to install
+    :type packages: list[str]
+    :return: Whether the installation succeeded
+    :rtype: bool
+    """
+    cmd = install_command.build(packages)
+    return subprocess.run(cmd, shell=True).returncode == 0
+
+
+def _install_packages_bisecting(
+    install_command: InstallCommands, packages: list[str]
+) -> None:
+    """
+    Installs packages in one batch. If the batch fails, it is split in halves,
+    which are retried recursively until the failing packages are isolated.
+
+    :param install_command: InstallCommands enum value specifying the installation command
+    :type install_command: InstallCommands
+    :param packages: List of package names to install
+    :type packages: list[str]
+    """
+    if _install_packages(install_command, packages):
+        for pkg in packages:
+            Logger.step(f"Successfully installed package: {pkg}")
+    elif len(packages) == 1:
+        Logger.step(f"Failed to install package: {packages[0]}", warning=True)
+    else:
+        middle = len(packages) // 2
+        _install_packages_bisecting(install_command, packages[:middle])
+        _install_packages_bisecting(install_command, packages[middle:])
+
+
+def _install_packages_with_fallback(
     install_command: InstallCommands, packages: list[str]
+) -> None:
+    """
+    Installs packages in one batch. If the batch fails, the packages that are
+    still not installed afterwards are retried one by one, to isolate failures.
+
+    :param install_command: InstallCommands enum value specifying the installation command
+    :type install_command: InstallCommands
+    :param packages: List of package names to install
+    :type packages: list[str]
+    """
+    if _install_packages(install_command, packages):
+        missing = []
+    else:
+        invalidate_installed_packages(install_command.name)
+        missing, _ = split_installed_packages(install_command.name, packages)
+
+    for pkg in packages:
+        if pkg not in missing:
+            Logger.step(f"Successfully installed package: {pkg}")
+        elif not _install_packages(install_command, [pkg]):
+            Logger.step(f"Failed to install package: {pkg}", warning=True)
+        else:
+            Logger.step(f"Successfully installed package: {pkg}")
+
+
+def _skip_installed_packages(
+    install_command: InstallCommands, packages: list[str]
+) -> list[str]:
+    """
+    Reports packages that are already installed, and returns the others.
+
+    :param install_command: InstallCommands enum value specifying the installation command
+    :type install_command: InstallCommands
+    :param packages: List of package names to install
+    :type packages: list[str]
+    :return: Packages that still need to be installed
+    :rtype: list[str]
+    """
+    packages, installed = split_installed_packages(
+        install_command.name, packages
+    )
+    for pkg in installed:
+        Logger.step(f"Package already installed: {pkg}")
+    return packages
+
+
+def install_packages_from_list(
+    install_command: InstallCommands,
+    packages: list[str],
+    batch: bool | None = None,
+    skip_installed: bool = True,
 ) -> None:
     """
     Installs a list of packages using the specified package manager command.
@@ -64,18 +207,38 @@ def install_packages_from_list(
     :type install_command: InstallCommands
     :param packages: List of package names to install
     :type packages: list[str]
+    :param batch: Whether to install all packages in one invocation (on failure, bisecting resp. retrying the missing packages one by one to find the failing ones). Defaults to whether the command is batchable.
+    :type batch: bool | None
+    :param skip_installed: Whether to skip packages that are already installed (see 'package_state')
+    :type skip_installed: bool
     """
+    if batch is None:
+        batch = install_command.batchable
+
+    if skip_installed:
+        packages = _skip_installed_packages(install_command, packages)
+        if not packages:
+            return
+    invalidate_installed_packages(install_command.name)
+
+    if batch and packages:
+        if install_command.transactional:
+            _install_packages_bisecting(install_command, packages)
+        else:
+            _install_packages_with_fallback(install_command, packages)
+        return
+
     for pkg in packages:
-        cmd = f"{install_command.value} {pkg}"
-        result = subprocess.run(cmd, shell=True)
-        if result.returncode != 0:
+        if not _install_packages(install_command, [pkg]):
             Logger.step(f"Failed to install package: {pkg}", warning=True)
         else:
             Logger.step(f"Successfully installed package: {pkg}")
 
 
 def install_packages_from_txt_file(
-    install_command: InstallCommands, package_file: Path
+    install_command: InstallCommands,
+    package_file: Path,
+    skip_installed: bool = True,
 ) -> None:
     """
     Installs packages listed in the given requirements file using the specified package manager command.
@@ -84,5 +247,224 @@ def install_packages_from_txt_file(
     :type install_command: InstallCommands
     :param package_file: Path to the requirements file
     :type package_file: Path
+    :param skip_installed: Whether to skip packages that are already installed
+    :type skip_installed: bool
+    """
+    install_packages_from_list(
+        install_command,
+        get_clean_lines(package_file),
+        skip_installed=skip_installed,
+    )
+
+
+def get_jobs_arg(args: list[str], default: int = DEFAULT_JOBS) -> int:
     """
-    install_packages_from_list(install_command, get_clean_lines(package_file))
+    Get the number of concurrent jobs from a '--jobs=<n>' argument.
+
+    :param args: (Remaining) task arguments
+    :type args: list[str]
+    :param default: Number of jobs if not specified
+    :type default: int
+    :return: Number of concurrent jobs (at least 1)
+    :rtype: int
+    """
+    for arg in args:
+        if arg.startswith("--jobs="):
+            try:
+                return max(int(arg.split("=", 1)[1]), 1)
+            except ValueError:
+                Logger.step(
+                    f"Invalid argument '{arg}' - Ignoring", warning=True
+                )
+    return default
+
+
+def run_concurrently(
+    func: Callable[[T], R], items: Iterable[T], jobs: int = DEFAULT_JOBS
+) -> list[R]:
+    """
+    Run a function for all items, with at most 'jobs' running at once.
+
+    :param func: Function to run per item
+    :type func: Callable[[T], R]
+    :param items: Items to run the function for
+    :type items: Iterable[T]
+    :param jobs: Maximum number of concurrent runs
+    :type jobs: int
+    :return: Results of the function, in the order of the items
+    :rtype: list[R]
+    """
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        return list(executor.map(func, items))
+
+
+def normalize_docker_ref(ref: str) -> str:
+    """
+    Normalize a docker image reference, so that identical images compare equal
+    (e.g. 'ubuntu' and 'docker.io/library/ubuntu:latest').
+
+    :param ref: Docker image reference
+    :type ref: str
+    :return: Fully qualified image reference
+    :rtype: str
+    """
+    name, _, digest = ref.partition("@")
+    if not digest and ":" not in name.rsplit("/", 1)[-1]:
+        name += ":latest"
+
+    registry, sep, path = name.partition("/")
+    if not sep or not (
+        "." in registry or ":" in registry or registry == "localhost"
+    ):
+        registry, path = "docker.io", name
+    elif registry in ("index.docker.io", "registry-1.docker.io"):
+        registry = "docker.io"
+    if registry == "docker.io" and "/" not in path:
+        path = f"library/{path}"
+
+    return f"{registry}/{path}" + (f"@{digest}" if digest else "")
+
+
+def pull_docker_image(ref: str) -> tuple[bool, int]:
+    """
+    Pull a docker image, reporting the progress of its layers via Logger.step.
+    The reported size is that of the (unpacked) image, as 'docker pull' doesn't
+    report the transferred bytes; the layers that were actually downloaded
+    (not already present) are counted instead.
+
+    :param ref: Docker image reference
+    :type ref: str
+    :return: Whether the pull succeeded, and the (unpacked) size of the image
+             in bytes if it was newly downloaded (0 if it was up to date)
+    :rtype: tuple[bool, int]
+    """
+    Logger.step(f"Pulling docker image: {ref}")
+    process = subprocess.Popen(
+        ["docker", "pull", ref],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+    )
+    layers, done_layers, pulled_layers = set(), set(), set()
+    downloaded = False
+    for line in process.stdout:
+        line = line.strip()
+        match = _DOCKER_LAYER_RE.match(line)
+        if match is not None:
+            layer, status = match.groups()
+            layers.add(layer)
+            if status in ("Pull complete", "Already exists"):
+                done_layers.add(layer)
+                if status == "Pull complete":
+                    pulled_layers.add(layer)
+                Logger.step(
+                    f"Pulling docker image: {ref} "
+                    f"({len(done_layers)}/{len(layers)} layers)"
+                )
+        elif line.startswith("Status: Downloaded newer image"):
+            downloaded = True
+    if process.wait() != 0:
+        Logger.step(f"Failed to pull docker image: {ref}", warning=True)
+        return False, 0
+
+    # Size of the (newly downloaded) image
+    n_bytes = 0
+    if downloaded:
+        result = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{.Size}}", ref],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 0 and result.stdout.strip().isdigit():
+            n_bytes = int(result.stdout.strip())
+
+    status = (
+        f"image size {format_bytes(n_bytes)}, "
+        f"{len(pulled_layers)}/{len(layers)} layers downloaded"
+        if downloaded
+        else "up to date"
+    )
+    Logger.step(f"Successfully pulled docker image: {ref} ({status})")
+    return True, n_bytes
+
+
+def pull_docker_images(images: list[str], jobs: int = DEFAULT_JOBS) -> int:
+    """
+    Pull docker images concurrently (the docker daemon pulls multiple images at
+    once). Identical references are only pulled once.
+
+    :param images: Docker image references
+    :type images: list[str]
+    :param jobs: Maximum number of concurrent pulls
+    :type jobs: int
+    :return: Total (unpacked) size of the newly downloaded images in bytes
+    :rtype: int
+    """
+    refs = {}
+    for image in images:
+        ref = normalize_docker_ref(image)
+        if ref in refs:
+            Logger.step(f"Skipping duplicate docker image: {image}")
+        else:
+            refs[ref] = image
+
+    results = run_concurrently(pull_docker_image, refs.keys(), jobs)
+    n_pulled = sum(success for success, _ in results)
+    n_bytes = sum(n_bytes for _, n_bytes in results)
+    Logger.step(
+        f"Pulled {n_pulled}/{len(refs)} docker image(s), "
+        f"new images of {format_bytes(n_bytes)} (image size)",
+        warning=n_pulled < len(refs),
+    )
+    return n_bytes
+
+
+def install_packages_concurrently(
+    install_command: InstallCommands,
+    packages: list[str],
+    jobs: int = DEFAULT_JOBS,
+    skip_installed: bool = True,
+) -> None:
+    """
+    Installs packages with one invocation each, running up to 'jobs' of them
+    at once. The first package is installed alone, so that any state shared by
+    the installations (e.g. pipx's shared libraries) is only created once. The
+    output of failed installations is printed after all of them finished (so
+    it never interleaves with the steps).
+
+    :param install_command: InstallCommands enum value specifying the installation command
+    :type install_command: InstallCommands
+    :param packages: List of package names to install
+    :type packages: list[str]
+    :param jobs: Maximum number of concurrent installations
+    :type jobs: int
+    :param skip_installed: Whether to skip packages that are already installed (see 'package_state')
+    :type skip_installed: bool
+    """
+    if skip_installed:
+        packages = _skip_installed_packages(install_command, packages)
+    if not packages:
+        return
+    invalidate_installed_packages(install_command.name)
+
+    def install(pkg: str) -> str | None:
+        """Install a package, returning its output if it failed."""
+        result = subprocess.run(
+            f"{install_command.value} {pkg}",
+            shell=True,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+        )
+        if result.returncode != 0:
+            Logger.step(f"Failed to install package: {pkg}", warning=True)
+            return f"{result.stdout}{result.stderr}\n"
+        Logger.step(f"Successfully installed package: {pkg}")
+        return None
+
+    outputs = [install(packages[0])]
+    outputs += run_concurrently(install, packages[1:], jobs)
+    for output in outputs:
+        if output is not None:
+            sys.stdout.write(output)
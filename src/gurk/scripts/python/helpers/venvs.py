@@ -0,0 +1,82 @@
+import hashlib
+import shutil
+import sys
+import venv
+from pathlib import Path
+
+from gurk.utils.common import PACKAGE_CACHE_PATH
+
+# Pre-built (pip-bootstrapped) venvs to clone new venvs from
+BASE_VENVS_PATH = PACKAGE_CACHE_PATH / "venvs"
+
+# Marks a completely built base venv
+_BASE_VENV_COMPLETE_FILE = ".gurk_complete"
+
+
+def get_base_venv() -> Path:
+    """
+    Get a venv with pip for the current python interpreter, creating it if
+    needed. Cloning it (see 'clone_venv') is much faster than creating a venv
+    with pip, which runs 'ensurepip' every time.
+
+    :return: Path to the base venv
+    :rtype: Path
+    """
+    interpreter = str(Path(sys.executable).resolve())
+    base_venv_dir = BASE_VENVS_PATH / (
+        f"base_py{sys.version_info.major}{sys.version_info.minor}_"
+        f"{hashlib.sha1(interpreter.encode()).hexdigest()[:12]}"
+    )
+    if (base_venv_dir / _BASE_VENV_COMPLETE_FILE).is_file():
+        return base_venv_dir
+
+    shutil.rmtree(base_venv_dir, ignore_errors=True)
+    venv.create(base_venv_dir, with_pip=True)
+    (base_venv_dir / _BASE_VENV_COMPLETE_FILE).touch()
+    return base_venv_dir
+
+
+def clone_venv(source_dir: Path, venv_dir: Path) -> None:
+    """
+    Clone a venv to a new location. Besides copying, the absolute paths in the
+    venv scripts (e.g. shebangs of 'bin/pip' and 'bin/activate') are updated.
+
+    :param source_dir: Path to the venv to clone
+    :type source_dir: Path
+    :param venv_dir: Path to the new venv
+    :type venv_dir: Path
+    """
+    shutil.copytree(
+        source_dir,
+        venv_dir,
+        symlinks=True,
+        ignore=shutil.ignore_patterns(_BASE_VENV_COMPLETE_FILE),
+    )
+
+    old_path, new_path = str(source_dir).encode(), str(venv_dir).encode()
+    files = [venv_dir / "pyvenv.cfg", *(venv_dir / "bin").iterdir()]
+    for file in files:
+        if file.is_symlink() or not file.is_file():
+            continue
+        content = file.read_bytes()
+        if old_path in content:
+            file.write_bytes(content.replace(old_path, new_path))
+
+
+def create_venv(venv_dir: Path, base_venv_dir: Path | None) -> None:
+    """
+    Create a venv with pip by cloning a base venv (see 'get_base_venv'), or
+    from scratch if there is none or cloning it fails.
+
+    :param venv_dir: Path to the new venv
+    :type venv_dir: Path
+    :param base_venv_dir: Path to the base venv, if any
+    :type base_venv_dir: Path | None
+    """
+    if base_venv_dir is not None:
+        try:
+            clone_venv(base_venv_dir, venv_dir)
+            return
+        except OSError:
+            shutil.rmtree(venv_dir, ignore_errors=True)
+    venv.create(venv_dir, with_pip=True)
@@ -1,7 +1,9 @@
 import os
 import shutil
 import subprocess
-import venv
+import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from typing import TypedDict
@@ -11,7 +13,21 @@ from ruamel.yaml import YAML
 
 from gurk.core.logger import Logger, LoggerSeverity
 from gurk.scripts.python.helpers._interface import get_config_args
-from gurk.utils.interface import bash_check
+from gurk.scripts.python.helpers.conda import (
+    CONDA_PKGS_LOCK,
+    conda_env_exists,
+    get_conda_env_names,
+    get_conda_lockfile,
+    solve_conda_env,
+    write_conda_lockfile,
+)
+from gurk.scripts.python.helpers.processing import (
+    get_jobs_arg,
+    run_concurrently,
+)
+from gurk.scripts.python.helpers.venvs import create_venv, get_base_venv
+from gurk.utils.files import file_lock
+from gurk.utils.interface import bash_checks
 
 
 def install_pip_environments(*args: list[str]) -> None:
@@ -22,7 +38,7 @@ def install_pip_environments(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, force, _ = get_config_args(args)
+    _, config_file, force, remaining_args = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of pip packages, as no task config file is provided",
@@ -42,6 +58,7 @@ def install_pip_environments(*args: list[str]) -> None:
 
     # (STEP) Creating virtual environments in {Path.home() / '.virtualenvs'}
     base_venv_dir = Path.home() / ".virtualenvs"
+    venvs_to_create = {}
     for venv_name, packages in pip_envs.items():
         if not packages:
             Logger.step(
@@ -65,24 +82,74 @@ def install_pip_environments(*args: list[str]) -> None:
                     f"Removing existing '{venv_name}' environment to create a new one",
                 )
                 shutil.rmtree(venv_dir)
+        venvs_to_create[venv_name] = packages
+    if not venvs_to_create:
+        return
+
+    # Environments are cloned from a base venv (with pip), and share pip's cache
+    start_time = time.perf_counter()
+    try:
+        template_venv_dir = get_base_venv()
+    except (OSError, subprocess.CalledProcessError) as exc:
+        Logger.step(
+            f"Failed to create the base environment ({exc}) - creating the "
+            "environments from scratch",
+            warning=True,
+        )
+        template_venv_dir = None
+
+    # Output of failed installations, printed after all of them
+    failed_outputs: dict[str, str] = {}
 
-        # Create new virtual environment
-        venv.create(venv_dir, with_pip=True)
-        pip_executable = venv_dir / "bin" / "pip"
+    def install_venv(venv_name: str) -> bool:
+        """Create a virtual environment and install its packages."""
+        venv_start_time = time.perf_counter()
+        venv_dir = base_venv_dir / venv_name
+        try:
+            create_venv(venv_dir, template_venv_dir)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            failed_outputs[venv_name] = f"{exc}\n"
+            Logger.step(
+                f"Failed to create environment '{venv_name}'",
+                warning=True,
+            )
+            return False
 
         # Install packages
         result = subprocess.run(
-            [str(pip_executable), "install", *packages],
+            [
+                str(venv_dir / "bin" / "pip"),
+                "install",
+                *venvs_to_create[venv_name],
+            ],
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
         )
+        duration = time.perf_counter() - venv_start_time
         if result.returncode != 0:
+            failed_outputs[venv_name] = f"{result.stdout}{result.stderr}\n"
             Logger.step(
-                f"Failed to install packages for environment '{venv_name}'",
+                f"Failed to install packages for environment '{venv_name}' ({duration:.1f}s)",
                 warning=True,
             )
+            return False
         else:
             Logger.step(
-                f"Successfully installed packages for environment '{venv_name}'"
+                f"Successfully installed packages for environment '{venv_name}' ({duration:.1f}s)"
             )
+            return True
+
+    results = run_concurrently(
+        install_venv, venvs_to_create.keys(), get_jobs_arg(remaining_args)
+    )
+    for output in failed_outputs.values():
+        sys.stdout.write(output)
+    Logger.step(
+        f"Created {sum(results)}/{len(results)} environment(s) in "
+        f"{time.perf_counter() - start_time:.1f}s",
+        warning=not all(results),
+    )
 
 
 def install_conda_environments(*args: list[str]) -> None:
@@ -121,8 +188,11 @@ def install_conda_environments(*args: list[str]) -> None:
 
     # Check if conda types are installed
     conda_exe = {"conda": None, "mamba": None}
+    results = bash_checks(
+        [f"check_install_{t}" for t in conda_exe.keys()], cache=True
+    )
     for conda_type in conda_exe.keys():
-        result = bash_check(f"check_install_{conda_type}")
+        result = results[f"check_install_{conda_type}"]
         if result.returncode == 0:
             conda_exe[conda_type] = result.stdout.strip()
 
@@ -151,7 +221,17 @@ def install_conda_environments(*args: list[str]) -> None:
 
         return True
 
+    # Query existing environments (once per type) - None if unknown
+    env_names = {
+        conda_type: get_conda_env_names(exe)
+        for conda_type, exe in conda_exe.items()
+        if exe is not None
+    }
+    update = "--update" in remaining_args
+    use_lockfile = "--lockfile" in remaining_args
+
     # (STEP) Creating conda environments
+    env_jobs = {}
     for env_name, env_spec in conda_envs.items():
         # Get and check conda environment type
         env_type = env_spec.get("type", None)
@@ -181,79 +261,138 @@ def install_conda_environments(*args: list[str]) -> None:
             env_file["dependencies"].append("pip")
             env_file["dependencies"].append({"pip": pip_packages})
 
-        env_yaml_path = NamedTemporaryFile(delete=False, suffix=".yaml").name
-        with open(env_yaml_path, "w") as f:
-            YAML().dump(env_file, f)
-
-        # Executable command
-        conda_cmd = [
-            conda_exe[env_type],
-            "env",
-            "create",
-            "-y",
-            "-f",
-            env_yaml_path,
-        ]
-
-        # Check if environment already exists
-        check_cmd = [
-            conda_exe[env_type],
-            "run",
-            "-n",
-            env_name,
-            "echo",
-            "Environment exists",
-        ]
-        result = subprocess.run(
-            check_cmd,
-            capture_output=True,
-            text=True,
-        )
-        if (
-            result.returncode == 0
-            and "--update" not in remaining_args
-            and not force
-        ):
+        # Check if environment already exists (probed, if it's unknown)
+        if env_names[env_type] is not None:
+            exists = env_name in env_names[env_type]
+        else:
+            exists = conda_env_exists(conda_exe[env_type], env_name)
+        if exists and not update and not force:
             Logger.step(
                 f"Environment '{env_name}' already exists - Skipping creation",
                 warning=True,
             )
             continue
 
-        # Handle --update flag
-        if "--update" in remaining_args:
-            conda_cmd = ["update" if x == "create" else x for x in conda_cmd]
-        else:
-            if force:
-                result = subprocess.run(
-                    [conda_exe[env_type], "env", "remove", "-n", env_name],
-                    capture_output=True,
-                    text=True,
-                )
-                if not result.returncode == 0:
-                    Logger.step(
-                        f"Failed to remove existing environment '{env_name}' - Skipping creation",
-                        warning=True,
-                    )
-                    continue
-            else:
+        env_jobs[env_name] = (env_type, env_file, exists, pip_packages)
+    if not env_jobs:
+        return
+
+    # Environments share conda's package cache (so packages are downloaded
+    # once): they are solved concurrently, and only written into the package
+    # cache one at a time (see 'CONDA_PKGS_LOCK')
+    start_time = time.perf_counter()
+
+    def run(
+        cmd: list[str], lock: bool = False
+    ) -> subprocess.CompletedProcess[str]:
+        """Run a conda command, capturing its output."""
+        with file_lock(CONDA_PKGS_LOCK) if lock else nullcontext():
+            return subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                stdin=subprocess.DEVNULL,
+            )
+
+    # Output of failed creations, printed after all of them (see 'create_env')
+    failed_outputs: dict[str, str] = {}
+
+    def create_env(env_name: str) -> bool:
+        """Create (or update) a conda environment."""
+        env_start_time = time.perf_counter()
+        env_type, env_file, exists, pip_packages = env_jobs[env_name]
+        exe = conda_exe[env_type]
+
+        # Remove existing environment (if forced)
+        if exists and not update:
+            result = run([exe, "env", "remove", "-y", "-n", env_name])
+            if not result.returncode == 0:
                 Logger.step(
-                    f"Environment '{env_name}' already exists - Skipping creation",
+                    f"Failed to remove existing environment '{env_name}' - Skipping creation",
                     warning=True,
                 )
-                continue
+                return False
 
-        # Create environment
-        Logger.step(
-            f"Creating environment '{env_name}' with {env_type}...",
-        )
-        result = subprocess.run(conda_cmd)
+        # Create environment from an explicit spec - its lockfile if available,
+        # else solved first (concurrently), so that only the download and
+        # extraction into the package cache is serialized
+        lockfile = get_conda_lockfile(env_type, env_file)
+        from_lockfile = use_lockfile and not update and lockfile.is_file()
+        explicit_spec = None
+        if from_lockfile:
+            explicit_spec = lockfile.read_text()
+        elif not update:
+            explicit_spec = solve_conda_env(exe, env_file)
+
+        if explicit_spec is not None:
+            Logger.step(
+                f"Creating environment '{env_name}' with {env_type}"
+                f"{' from lockfile' if from_lockfile else ''}...",
+            )
+            with NamedTemporaryFile("w", suffix=".txt") as spec_file:
+                spec_file.write(explicit_spec)
+                spec_file.flush()
+                result = run(
+                    [
+                        exe,
+                        "create",
+                        "-y",
+                        "-n",
+                        env_name,
+                        "--file",
+                        spec_file.name,
+                    ],
+                    lock=True,
+                )
+            if result.returncode == 0 and pip_packages:
+                pip_cmd = ["python", "-m", "pip", "install", *pip_packages]
+                result = run([exe, "run", "-n", env_name, *pip_cmd])
+        else:
+            # NOTE: Solved while locked (updates, or if the solve failed)
+            Logger.step(
+                f"{'Updating' if update else 'Creating'} environment '{env_name}' with {env_type}...",
+            )
+            env_yaml_path = NamedTemporaryFile(
+                delete=False, suffix=".yaml"
+            ).name
+            with open(env_yaml_path, "w") as f:
+                YAML().dump(env_file, f)
+            result = run(
+                [
+                    exe,
+                    "env",
+                    "update" if update else "create",
+                    "-y",
+                    "-f",
+                    env_yaml_path,
+                ],
+                lock=True,
+            )
+            os.remove(env_yaml_path)
+        if result.returncode == 0 and use_lockfile and not from_lockfile:
+            write_conda_lockfile(exe, env_name, lockfile)
+
+        duration = time.perf_counter() - env_start_time
         if result.returncode != 0:
+            failed_outputs[env_name] = f"{result.stdout}{result.stderr}\n"
             Logger.step(
-                f"Failed to create environment '{env_name}'", warning=True
+                f"Failed to create environment '{env_name}' ({duration:.1f}s)",
+                warning=True,
             )
+            return False
         else:
-            Logger.step(f"Successfully created environment '{env_name}'")
+            Logger.step(
+                f"Successfully created environment '{env_name}' ({duration:.1f}s)"
+            )
+            return True
 
-        # Cleanup
-        os.remove(env_yaml_path)
+    results = run_concurrently(
+        create_env, env_jobs.keys(), get_jobs_arg(remaining_args)
+    )
+    for output in failed_outputs.values():
+        sys.stdout.write(output)
+    Logger.step(
+        f"Created {sum(results)}/{len(results)} environment(s) in "
+        f"{time.perf_counter() - start_time:.1f}s",
+        warning=not all(results),
+    )
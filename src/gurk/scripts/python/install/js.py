@@ -7,7 +7,7 @@ from packaging import version
 
 from gurk.core.logger import Logger
 from gurk.scripts.python.helpers._interface import get_config_args
-from gurk.scripts.python.helpers.common import add_alias
+from gurk.scripts.python.helpers.common import add_aliases
 from gurk.scripts.python.helpers.processing import (
     InstallCommands,
     get_clean_lines,
@@ -54,6 +54,7 @@ def install_js_repositories(*args: list[str]) -> None:
     npm_pkg_dir = Path("/opt/npm")
 
     # (STEP) Installing npm repositories
+    aliases = []
     for repo in repos:
         parsed = parse_git_ref(repo)
         pkg_name = Path(parsed["url"]).stem
@@ -152,10 +153,12 @@ def install_js_repositories(*args: list[str]) -> None:
                 ["sudo", "mv", str(repo_path), str(target)], check=True
             )
 
-            # Add alias
-            if "--create-aliases" in remaining_args:
-                add_alias(
-                    f"{pkg_name}='(cd {target} && {package_manager} start > /dev/null &)'"
-                )
+            # Add alias (all at once, after the installations)
+            aliases.append(
+                f"{pkg_name}='(cd {target} && {package_manager} start > /dev/null &)'"
+            )
 
             Logger.step(f"Successfully installed {pkg_name} to {target}")
+
+    if "--create-aliases" in remaining_args and aliases:
+        add_aliases(aliases)
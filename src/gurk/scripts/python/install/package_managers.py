@@ -6,12 +6,15 @@ import commentjson
 
 from gurk.core.logger import Logger, LoggerSeverity
 from gurk.scripts.python.helpers._interface import get_config_args
-from gurk.scripts.python.helpers.common import add_alias
+from gurk.scripts.python.helpers.common import add_aliases
 from gurk.scripts.python.helpers.processing import (
     InstallCommands,
     get_clean_lines,
+    get_jobs_arg,
+    install_packages_concurrently,
     install_packages_from_list,
     install_packages_from_txt_file,
+    pull_docker_images,
 )
 from gurk.utils.interface import bash_check
 
@@ -24,7 +27,7 @@ def install_apt_packages(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, force, _ = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of apt packages, as no task config file is provided",
@@ -33,7 +36,9 @@ def install_apt_packages(*args: list[str]) -> None:
         return
 
     # (STEP) Installing apt packages
-    install_packages_from_txt_file(InstallCommands.APT, config_file)
+    install_packages_from_txt_file(
+        InstallCommands.APT, config_file, skip_installed=not force
+    )
 
 
 def install_snap_packages(*args: list[str]) -> None:
@@ -44,7 +49,7 @@ def install_snap_packages(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, force, _ = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of snap packages, as no task config file is provided",
@@ -103,7 +108,9 @@ def install_snap_packages(*args: list[str]) -> None:
     start_snapd_service()
 
     # (STEP) Installing snap packages
-    install_packages_from_txt_file(InstallCommands.SNAP, config_file)
+    install_packages_from_txt_file(
+        InstallCommands.SNAP, config_file, skip_installed=not force
+    )
 
 
 def install_flatpak_packages(*args: list[str]) -> None:
@@ -114,7 +121,7 @@ def install_flatpak_packages(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, remaining_args = get_config_args(args)
+    _, config_file, force, remaining_args = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of flatpak packages, as no task config file is provided",
@@ -141,15 +148,20 @@ def install_flatpak_packages(*args: list[str]) -> None:
     )
 
     # (STEP) Installing flatpak packages
-    install_packages_from_txt_file(InstallCommands.FLATPAK, config_file)
+    install_packages_from_txt_file(
+        InstallCommands.FLATPAK, config_file, skip_installed=not force
+    )
 
     # Add aliases for flatpak packages
     if "--create-aliases" in remaining_args:
         Logger.step("Adding aliases for flatpak packages...")
-        for pkg in get_clean_lines(config_file):
-            # Use probable package name for alias
-            pkg_name = pkg.split(".")[-1]
-            add_alias(f"{pkg_name}='(flatpak run {pkg} > /dev/null &)'")
+        # Use probable package name for alias
+        add_aliases(
+            [
+                f"{pkg.split('.')[-1]}='(flatpak run {pkg} > /dev/null &)'"
+                for pkg in get_clean_lines(config_file)
+            ]
+        )
 
 
 def install_npm_packages(*args: list[str]) -> None:
@@ -160,7 +172,7 @@ def install_npm_packages(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, force, _ = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of npm packages, as no task config file is provided",
@@ -172,7 +184,9 @@ def install_npm_packages(*args: list[str]) -> None:
     install_packages_from_list(InstallCommands.APT, ["npm", "nodejs"])
 
     # (STEP) Installing npm packages
-    install_packages_from_txt_file(InstallCommands.NPM, config_file)
+    install_packages_from_txt_file(
+        InstallCommands.NPM, config_file, skip_installed=not force
+    )
 
 
 def install_pipx_packages(*args: list[str]) -> None:
@@ -183,7 +197,7 @@ def install_pipx_packages(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, force, remaining_args = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of pipx packages, as no task config file is provided",
@@ -192,7 +206,12 @@ def install_pipx_packages(*args: list[str]) -> None:
         return
 
     # (STEP) Installing pipx packages
-    install_packages_from_txt_file(InstallCommands.PIPX, config_file)
+    install_packages_concurrently(
+        InstallCommands.PIPX,
+        get_clean_lines(config_file),
+        jobs=get_jobs_arg(remaining_args),
+        skip_installed=not force,
+    )
 
 
 def install_vscode_extensions(*args: list[str]) -> None:
@@ -203,7 +222,7 @@ def install_vscode_extensions(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, force, _ = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping installation of VSCode extensions, as no task config file is provided",
@@ -221,7 +240,9 @@ def install_vscode_extensions(*args: list[str]) -> None:
         raise EnvironmentError
 
     # Install extensions
-    install_packages_from_txt_file(InstallCommands.VSC_EXT, config_file)
+    install_packages_from_txt_file(
+        InstallCommands.VSC_EXT, config_file, skip_installed=not force
+    )
 
 
 def install_docker_images(*args: list[str]) -> None:
@@ -232,7 +253,7 @@ def install_docker_images(*args: list[str]) -> None:
     :type args: list[str]
     """
     # Parse config args
-    _, config_file, _, _ = get_config_args(args)
+    _, config_file, _, remaining_args = get_config_args(args)
     if config_file is None:
         Logger.step(
             "Skipping pulling of docker images, as no task config file is provided",
@@ -272,4 +293,4 @@ def install_docker_images(*args: list[str]) -> None:
         return
 
     # (STEP) Pulling docker images
-    install_packages_from_list(InstallCommands.DOCKER, docker_images)
+    pull_docker_images(docker_images, jobs=get_jobs_arg(remaining_args))
@@ -5,20 +5,38 @@ import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from textwrap import dedent
+from threading import Thread
 
 from gurk.core.logger import Logger
+from gurk.scripts.python.helpers.package_state import (
+    parse_package_spec,
+    split_installed_packages,
+)
+from gurk.scripts.python.helpers.processing import get_clean_lines
 from gurk.utils.common import (
     ENABLED_CONFIG_FILE,
     SETUP_DONE_FILE,
     generate_random_path,
     resolve_package_path,
 )
-from gurk.utils.git_repos import clone_git_files, is_git_repo
+from gurk.utils.git_repos import (
+    clone_git_files,
+    is_git_repo,
+    is_remote_url,
+    parse_git_ref,
+    resolve_remote_refs,
+)
 from gurk.utils.interface import prompt_bool
 from gurk.utils.logger import TaskTerminationType
 from gurk.utils.system_info import get_system_info
+from gurk.utils.tasks import ResolvedTask
 from gurk.utils.yaml import load_yaml
 
+# Apt archive, and directory to download packages ahead into (see 'prefetch_apt_packages')
+APT_ARCHIVES_PATH = Path("/var/cache/apt/archives")
+APT_PREFETCH_PATH = Path("/var/cache/apt/gurk-prefetch")
+
 
 def get_sudo_askpass() -> Path:
     """
@@ -116,6 +134,12 @@ class CoreCliProcessor:
     argv:    list[str]     = field(repr=False)
     tasks:   list[str]     = field(repr=False)
     command: str           = field(repr=False)
+
+    _preparation_id:  int | None    = field(init=False, repr=False, default=None)
+    _prefetch_thread: Thread | None = field(init=False, repr=False, default=None)
+    _prefetch_result: subprocess.CompletedProcess[str] | None = field(
+        init=False, repr=False, default=None
+    )
     # fmt: on
 
     def process_args(self) -> tuple[CoreCliArgs, Path | None]:
@@ -134,6 +158,15 @@ class CoreCliProcessor:
         # Tasks
         main_setup_args.tasks = self.tasks or []
 
+        # Resolve the refs of remote config repos at once (reused by
+        # 'is_git_repo' and the clones)
+        config_urls = [
+            parse_git_ref(str(path))["url"]
+            for path in (self.args.config_directory, self.args.config_file)
+            if path is not None
+        ]
+        resolve_remote_refs([url for url in config_urls if is_remote_url(url)])
+
         # Config directory
         if is_git_repo(str(self.args.config_directory)):
             # Git repo
@@ -261,11 +294,19 @@ class CoreCliProcessor:
 
         self.logger.debug(f"System information: {system_info}")
 
-    def prepare(self) -> None:
+    def prepare(
+        self, resolved_tasks: list[ResolvedTask] | None = None
+    ) -> None:
         """
-        Prepare the system for setup.
+        Prepare the system for setup: Update the apt package lists (once), and
+        then upgrade the apt packages while the apt packages required by the
+        given tasks are downloaded ahead (see 'prefetch_apt_packages'). The
+        preparation task is finished by 'wait_for_preparation'.
+
+        :param resolved_tasks: Tasks that will be run
+        :type resolved_tasks: list[ResolvedTask] | None
         """
-        requirements_id = self.logger.add_task("gurk-preparation", total=2)
+        requirements_id = self.logger.add_task("gurk-preparation", total=3)
         log_file = self.logger.generate_logfile_path(requirements_id)
 
         # Update apt packages
@@ -280,13 +321,33 @@ class CoreCliProcessor:
                 f"=== APT UPDATE OUTPUT ===\n{result_update.stdout}\n{result_update.stderr}\n"
             )
 
+        # Download required apt packages in the background
+        prefetch_packages = (
+            self.collect_apt_packages(resolved_tasks or [])
+            if result_update.returncode == 0
+            else []
+        )
+
+        def prefetch() -> None:
+            self._prefetch_result = self.prefetch_apt_packages(
+                prefetch_packages
+            )
+
+        self._preparation_id = requirements_id
+        self._prefetch_thread = Thread(target=prefetch, daemon=True)
+        self._prefetch_thread.start()
+
         # Upgrade apt packages
         result_upgrade = subprocess.run(
             ["sudo", "apt-get", "-y", "upgrade"],
             capture_output=True,
             text=True,
         )
-        self.logger.update_task(requirements_id, "Upgraded apt packages")
+        self.logger.update_task(
+            requirements_id,
+            f"Upgraded apt packages - downloading {len(prefetch_packages)} "
+            "apt package(s) ahead",
+        )
         with open(log_file, "a") as lf:
             lf.write(
                 f"=== APT UPGRADE OUTPUT ===\n{result_upgrade.stdout}\n{result_upgrade.stderr}\n"
@@ -296,14 +357,127 @@ class CoreCliProcessor:
         success = (
             result_update.returncode == 0 and result_upgrade.returncode == 0
         )
-        self.logger.finish_task(
-            requirements_id,
-            success=TaskTerminationType.SUCCESS
-            if success
-            else TaskTerminationType.FAILURE,
-        )
         if not success:
+            self._preparation_id = None
+            self.logger.finish_task(
+                requirements_id, success=TaskTerminationType.FAILURE
+            )
             self.logger.fatal("Failed to run preparation steps")
 
         self.logger.debug("System preparation completed successfully")
         return success
+
+    def wait_for_preparation(self) -> None:
+        """
+        Wait for the background part of the preparation (apt prefetch) to end,
+        and finish the preparation task.
+        """
+        if self._prefetch_thread is None:
+            return
+        self._prefetch_thread.join()
+        self._prefetch_thread = None
+
+        if self._preparation_id is None:
+            return
+        result_prefetch = self._prefetch_result
+        if result_prefetch is not None:
+            log_file = self.logger.generate_logfile_path(self._preparation_id)
+            with open(log_file, "a") as lf:
+                lf.write(
+                    f"=== APT PREFETCH OUTPUT ===\n"
+                    f"{result_prefetch.stdout}\n{result_prefetch.stderr}\n"
+                )
+        self.logger.finish_task(
+            self._preparation_id,
+            success=TaskTerminationType.SUCCESS
+            if result_prefetch is not None and result_prefetch.returncode == 0
+            else TaskTerminationType.PARTIAL,
+        )
+        self._preparation_id = None
+
+    @staticmethod
+    def collect_apt_packages(resolved_tasks: list[ResolvedTask]) -> list[str]:
+        """
+        Collect the apt packages that the given tasks will install: those
+        their scripts install (see 'Command.apt_packages') and the contents of
+        'install_apt_packages' config files. Packages that are installed or
+        unknown to apt (e.g. from repositories that tasks add) are left out.
+
+        :param resolved_tasks: Tasks that will be run
+        :type resolved_tasks: list[ResolvedTask]
+        :return: Apt packages to download
+        :rtype: list[str]
+        """
+        packages = []
+        for task in resolved_tasks:
+            packages.extend(task.command.apt_packages)
+            if (
+                task.command.function == "install_apt_packages"
+                and task.config_file is not None
+            ):
+                packages.extend(get_clean_lines(task.config_file))
+
+        # Skip installed packages and those that can not be interpreted
+        packages, _ = split_installed_packages(
+            "APT", list(dict.fromkeys(packages))
+        )
+        names = {}
+        for pkg in packages:
+            name = parse_package_spec("APT", pkg)[0]
+            if name is not None:
+                names[pkg] = name
+        if not names:
+            return []
+
+        # Skip unknown packages (one of them would fail the whole download)
+        result = subprocess.run(
+            ["apt-cache", "policy", *dict.fromkeys(names.values())],
+            capture_output=True,
+            text=True,
+        )
+        known = {
+            line[:-1]
+            for line in result.stdout.splitlines()
+            if line and not line[0].isspace() and line.endswith(":")
+        }
+        return [pkg for pkg, name in names.items() if name in known]
+
+    @staticmethod
+    def prefetch_apt_packages(
+        packages: list[str],
+    ) -> subprocess.CompletedProcess[str]:
+        """
+        Download apt packages (and their dependencies) without installing them,
+        so that later installations only need to unpack them. The download does
+        not need the dpkg lock, so it can run alongside e.g. an upgrade. It is
+        done into a separate directory (to not compete for apt's archive lock),
+        and the packages are moved to the apt archive afterwards, holding the
+        gurk dpkg flock only for the move.
+
+        :param packages: Apt packages to download
+        :type packages: list[str]
+        :return: Result of the download
+        :rtype: CompletedProcess
+        """
+        if not packages:
+            return subprocess.CompletedProcess(
+                args=[], returncode=0, stdout="", stderr=""
+            )
+
+        script = dedent(
+            f"""\
+            mkdir -p {APT_PREFETCH_PATH}/partial
+            apt-get install -y --download-only \\
+                -o Dir::Cache::Archives={APT_PREFETCH_PATH} "$@"
+            rc=$?
+            flock /var/lib/dpkg/lock-frontend \\
+                find {APT_PREFETCH_PATH} -maxdepth 1 -name '*.deb' \\
+                -exec mv -t {APT_ARCHIVES_PATH} {{}} +
+            exit $rc
+        """
+        )
+        return subprocess.run(
+            ["sudo", "sh", "-c", script, "sh", *packages],
+            capture_output=True,
+            text=True,
+        )
@@ -18,6 +18,7 @@ ENABLED_CONFIG_FILE = PACKAGE_CONFIG_PATH / "enabled.yaml"
 PACKAGE_TESTS_PATH = PACKAGE_SRC_PATH.parents[1] / "tests"
 PIPX_PYTHON_PATH = Path(sys.executable)
 SETUP_DONE_FILE = Path.home() / ".gurk" / "setup.done"
+PACKAGE_LOGS_PATH = Path.home() / ".gurk" / "logs"
 PACKAGE_CACHE_PATH = Path.home() / ".cache" / "gurk"
 PACKAGE_CACHE_PATH.mkdir(parents=True, exist_ok=True)
 
@@ -120,6 +121,25 @@ def stream_print(text: str, stderr: bool = False) -> None:
         print(text)
 
 
+def format_bytes(n_bytes: int) -> str:
+    """
+    Format a number of bytes as a human-readable string (e.g. '1.5 GiB').
+
+    :param n_bytes: Number of bytes
+    :type n_bytes: int
+    :return: Formatted number of bytes
+    :rtype: str
+    """
+    size = float(n_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
 class ScriptExtension(Enum):
     """Enumeration of supported script file extensions."""
 
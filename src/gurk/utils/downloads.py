@@ -0,0 +1,376 @@
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Literal, TypeAlias, TypedDict
+from urllib.parse import parse_qs, urldefrag
+
+import requests
+
+from gurk.utils.common import PACKAGE_CACHE_PATH
+from gurk.utils.files import (
+    file_lock,
+    hash_file,
+    inherit_ownership,
+    make_dirs,
+    materialize_file,
+)
+
+# Content-addressed cache of downloaded files (see 'fetch_url')
+DOWNLOADS_CACHE_PATH = PACKAGE_CACHE_PATH / "downloads"
+DOWNLOADS_INDEX_FILE = "index.json"
+DOWNLOADS_INDEX_LOCK = "index.lock"
+
+# Limits of the downloads cache (see 'evict_downloads_cache')
+DOWNLOADS_MAX_SIZE = 5 * 1024**3  # 5 GiB
+DOWNLOADS_MAX_AGE = 30 * 24 * 3600  # 30 days
+
+# Streaming of downloads
+DOWNLOAD_CHUNK_SIZE = 1024**2  # 1 MiB
+DOWNLOAD_RETRIES = 3
+
+DownloadStatus: TypeAlias = Literal[
+    "cached", "not-modified", "downloaded", "resumed"
+]
+
+
+class DownloadCacheEntry(TypedDict):
+    """TypedDict representing an entry (per URL) of the downloads index."""
+
+    # fmt: off
+    sha256:        str
+    size:          int
+    etag:          str | None
+    last_modified: str | None
+    last_used:     float
+    # fmt: on
+
+
+def parse_download_ref(ref: str) -> tuple[str, str | None]:
+    """
+    Parse a download reference of the form `<url>[#sha256=<hex>]`. The
+    checksum is a fragment, so it is never sent to the server.
+
+    :param ref: Download reference
+    :type ref: str
+    :return: URL (without fragment) and expected (lowercase) SHA-256 or None
+    :rtype: tuple[str, str | None]
+    """
+    url, fragment = urldefrag(ref)
+    sha256 = parse_qs(fragment).get("sha256", [None])[0]
+    return url, sha256.lower() if sha256 else None
+
+
+def get_blob_path(sha256: str) -> Path:
+    """
+    Get the path of a file in the downloads cache by its content hash.
+
+    :param sha256: SHA-256 of the file
+    :type sha256: str
+    :return: Path to the (possibly not existing) cached file
+    :rtype: Path
+    """
+    return DOWNLOADS_CACHE_PATH / "objects" / sha256[:2] / sha256
+
+
+def read_downloads_index() -> dict[str, DownloadCacheEntry]:
+    """
+    Read the index of the downloads cache, which maps URLs to the content
+    hash and HTTP validators of their last download.
+
+    :return: Index of the downloads cache
+    :rtype: dict[str, DownloadCacheEntry]
+    """
+    try:
+        return json.loads(
+            (DOWNLOADS_CACHE_PATH / DOWNLOADS_INDEX_FILE).read_text()
+        )
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_downloads_index(index: dict[str, DownloadCacheEntry]) -> None:
+    """
+    Atomically write the index of the downloads cache (owned by the owner of
+    the cache, see 'inherit_ownership').
+
+    :param index: Index of the downloads cache
+    :type index: dict[str, DownloadCacheEntry]
+    """
+    index_path = DOWNLOADS_CACHE_PATH / DOWNLOADS_INDEX_FILE
+    tmp_path = index_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(index, indent=2, sort_keys=True))
+    inherit_ownership(tmp_path)
+    tmp_path.replace(index_path)
+
+
+def _update_downloads_index(url: str, entry: DownloadCacheEntry) -> None:
+    """
+    Record the (last) download of a URL in the downloads index.
+
+    :param url: URL of the download
+    :type url: str
+    :param entry: Index entry of the URL
+    :type entry: DownloadCacheEntry
+    """
+    with file_lock(DOWNLOADS_CACHE_PATH / DOWNLOADS_INDEX_LOCK):
+        index = read_downloads_index()
+        index[url] = entry
+        _write_downloads_index(index)
+
+
+def evict_downloads_cache(
+    max_size: int | None = None,
+    max_age: float | None = None,
+    keep: tuple[str, ...] = (),
+) -> list[str]:
+    """
+    Evict files from the downloads cache: first those unused for longer than
+    the maximum age, then the least recently used until the cache fits the
+    maximum size. A file is used by any of the URLs it was downloaded from.
+
+    :param max_size: Maximum total size in bytes (default: DOWNLOADS_MAX_SIZE)
+    :type max_size: int | None
+    :param max_age: Maximum age in seconds (default: DOWNLOADS_MAX_AGE)
+    :type max_age: float | None
+    :param keep: Hashes of files to keep regardless
+    :type keep: tuple[str, ...]
+    :return: Hashes of the evicted files
+    :rtype: list[str]
+    """
+    max_size = DOWNLOADS_MAX_SIZE if max_size is None else max_size
+    max_age = DOWNLOADS_MAX_AGE if max_age is None else max_age
+
+    evicted = []
+    with file_lock(DOWNLOADS_CACHE_PATH / DOWNLOADS_INDEX_LOCK):
+        index = read_downloads_index()
+        blobs: dict[str, tuple[float, int]] = {}
+        for entry in index.values():
+            last_used, size = blobs.get(entry["sha256"], (0.0, entry["size"]))
+            blobs[entry["sha256"]] = (max(last_used, entry["last_used"]), size)
+
+        total_size = sum(size for _, size in blobs.values())
+        now = time.time()
+        for sha256, (last_used, size) in sorted(
+            blobs.items(), key=lambda item: item[1][0]
+        ):
+            expired = now - last_used > max_age
+            if sha256 in keep or not (expired or total_size > max_size):
+                continue
+            get_blob_path(sha256).unlink(missing_ok=True)
+            index = {
+                url: entry
+                for url, entry in index.items()
+                if entry["sha256"] != sha256
+            }
+            total_size -= size
+            evicted.append(sha256)
+        _write_downloads_index(index)
+
+    return evicted
+
+
+def _stream_download(
+    url: str,
+    part_path: Path,
+    response: requests.Response | None = None,
+    timeout: int = 60,
+) -> tuple[requests.Response, bool]:
+    """
+    Stream a URL to a partial file in chunks. An existing partial file is
+    resumed with an HTTP Range request, if the server supports it and the
+    file didn't change since (If-Range). Broken transfers are resumed up to
+    DOWNLOAD_RETRIES times.
+
+    :param url: URL to download
+    :type url: str
+    :param part_path: Path to the partial file
+    :type part_path: Path
+    :param response: Already started (full) response to stream first
+    :type response: requests.Response | None
+    :param timeout: Timeout of each request in seconds
+    :type timeout: int
+    :return: Last response (for its validators), and whether it was resumed
+    :rtype: tuple[requests.Response, bool]
+    """
+    meta_path = part_path.with_suffix(".json")
+    resumed = False
+    error: Exception | None = None
+    for _ in range(DOWNLOAD_RETRIES + 1):
+        try:
+            if response is None:
+                # NOTE: Without 'identity', ranges would be of the encoding
+                headers = {"Accept-Encoding": "identity"}
+                offset = part_path.stat().st_size if part_path.is_file() else 0
+                try:
+                    validator = json.loads(meta_path.read_text())["validator"]
+                except (OSError, ValueError, KeyError):
+                    validator = None
+                if offset and validator:
+                    headers["Range"] = f"bytes={offset}-"
+                    headers["If-Range"] = validator
+                response = requests.get(
+                    url, headers=headers, stream=True, timeout=timeout
+                )
+
+            if response.status_code == 416:
+                # The partial file is not a prefix of the current file
+                part_path.unlink(missing_ok=True)
+                continue
+            response.raise_for_status()
+
+            # Remember the validator to safely resume later
+            append = response.status_code == 206
+            validator = response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+            meta_path.write_text(json.dumps({"validator": validator}))
+            inherit_ownership(meta_path)
+            resumed = resumed or append
+            with open(part_path, "ab" if append else "wb") as part_file:
+                inherit_ownership(part_path)
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    part_file.write(chunk)
+            return response, resumed
+        except (
+            requests.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as exc:
+            error = exc
+        finally:
+            if response is not None:
+                response.close()
+            response = None
+
+    raise error or requests.RequestException(f"Failed to download {url}")
+
+
+def fetch_url(
+    ref: str, refresh: bool = True, timeout: int = 60
+) -> tuple[Path, DownloadStatus]:
+    """
+    Get a file into the downloads cache (everything in it is owned by the
+    owner of the cache, see 'inherit_ownership'):
+    - With an expected SHA-256 that is already cached, without any request
+    - With a cached previous download, by a conditional request (ETag or
+      Last-Modified), so unchanged files are not transferred again
+    - Else by a streamed (and resumable) download, verified against the
+      expected SHA-256 (if any)
+
+    :param ref: Download reference (see 'parse_download_ref')
+    :type ref: str
+    :param refresh: Whether to revalidate cached downloads (without a hash)
+    :type refresh: bool
+    :param timeout: Timeout of each request in seconds
+    :type timeout: int
+    :return: Path to the cached file, and how it was obtained
+    :rtype: tuple[Path, DownloadStatus]
+    :raises requests.RequestException: If the download failed
+    :raises ValueError: If the checksum does not match
+    """
+    url, sha256 = parse_download_ref(ref)
+    key = hashlib.sha1(url.encode()).hexdigest()[:16]
+    part_path = DOWNLOADS_CACHE_PATH / "partial" / f"{key}.part"
+
+    with file_lock(part_path.with_suffix(".lock")):
+        entry = read_downloads_index().get(url)
+        cached = entry is not None and get_blob_path(entry["sha256"]).is_file()
+        response = None
+
+        if sha256 and get_blob_path(sha256).is_file():
+            # Content-addressed hit (possibly from another URL)
+            status = "cached"
+            if entry is None or entry["sha256"] != sha256:
+                entry = {
+                    "sha256": sha256,
+                    "size": get_blob_path(sha256).stat().st_size,
+                    "etag": None,
+                    "last_modified": None,
+                }
+        elif cached and not refresh:
+            status = "cached"
+        elif cached:
+            # Revalidation, falling back to the cached file when offline
+            headers = {"Accept-Encoding": "identity"}
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+            try:
+                response = requests.get(
+                    url, headers=headers, stream=True, timeout=timeout
+                )
+            except requests.ConnectionError:
+                status = "cached"
+            else:
+                if response.status_code == 304:
+                    response.close()
+                    status = "not-modified"
+                else:
+                    status = None
+        else:
+            status = None
+
+        if status is None:
+            # (Full) download, streamed to a partial file
+            make_dirs(part_path.parent)
+            response, resumed = _stream_download(
+                url, part_path, response, timeout
+            )
+            digest = hash_file(part_path)
+            if sha256 and digest != sha256:
+                part_path.unlink()
+                raise ValueError(
+                    f"Checksum mismatch for {url}: expected {sha256}, "
+                    f"got {digest}"
+                )
+
+            blob_path = get_blob_path(digest)
+            make_dirs(blob_path.parent)
+            part_path.replace(blob_path)
+            part_path.with_suffix(".json").unlink(missing_ok=True)
+            status = "resumed" if resumed else "downloaded"
+            entry = {
+                "sha256": digest,
+                "size": blob_path.stat().st_size,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+
+        entry["last_used"] = time.time()
+        _update_downloads_index(url, entry)
+
+    evict_downloads_cache(keep=(entry["sha256"],))
+    return get_blob_path(entry["sha256"]), status
+
+
+def download_file(
+    ref: str, dest_path: Path, refresh: bool = True, timeout: int = 60
+) -> DownloadStatus:
+    """
+    Download a file (through the downloads cache, see 'fetch_url') to a
+    destination path, replacing any existing file. The destination is a
+    reflink or copy of the cached file (never a hardlink, as it may be
+    modified).
+
+    :param ref: Download reference (see 'parse_download_ref')
+    :type ref: str
+    :param dest_path: Destination path
+    :type dest_path: Path
+    :param refresh: Whether to revalidate cached downloads (without a hash)
+    :type refresh: bool
+    :param timeout: Timeout of each request in seconds
+    :type timeout: int
+    :return: How the file was obtained
+    :rtype: DownloadStatus
+    :raises requests.RequestException: If the download failed
+    :raises ValueError: If the checksum does not match
+    """
+    blob_path, status = fetch_url(ref, refresh, timeout)
+    if dest_path.is_symlink() or dest_path.is_file():
+        dest_path.unlink()
+    elif dest_path.is_dir():
+        shutil.rmtree(dest_path)
+    materialize_file(blob_path, dest_path)
+    return status
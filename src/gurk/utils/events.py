@@ -0,0 +1,162 @@
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import BinaryIO
+
+from gurk.utils.logger import LoggerEvent
+
+# Maximum number of events buffered for a slow consumer (further events are
+# dropped, so publishing never blocks)
+EVENT_BUFFER_SIZE = 10000
+
+# Seconds between attempts to (re)open the target of the events
+EVENT_RETRY_INTERVAL = 1.0
+
+
+def open_event_target(target: str) -> BinaryIO:
+    """
+    Open the target of an event stream: a Unix socket ('unix:<path>'), an
+    open file descriptor ('fd:<n>', e.g. of a pipe) or a file (any other
+    path, appended to).
+
+    :param target: Target of the events
+    :type target: str
+    :return: Buffered binary stream to write the events to
+    :rtype: BinaryIO
+    :raises OSError: If the target can't be opened (e.g. no one listens)
+    """
+    if target.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(target.removeprefix("unix:"))
+        except OSError:
+            sock.close()
+            raise
+        stream = sock.makefile("wb")
+        sock.close()  # NOTE: Closed with the stream
+        return stream
+    elif target.startswith("fd:"):
+        return os.fdopen(int(target.removeprefix("fd:")), "wb", closefd=False)
+    return open(target, "ab")
+
+
+@dataclass
+class EventBus:
+    """
+    Event bus publishing events as newline-delimited JSON (see
+    'open_event_target'). Publishing never blocks: events are buffered and
+    written in batches by a background thread, and dropped (counted in a
+    'dropped' event) while the buffer is full or the target unavailable.
+    """
+
+    # fmt: off
+    target:      str                        = field()
+    buffer_size: int                        = field(default=EVENT_BUFFER_SIZE)
+
+    dropped:     int                        = field(init=False, default=0)
+
+    _queue:      Queue[LoggerEvent | None]  = field(init=False, repr=False)
+    _lock:       Lock                       = field(init=False, repr=False, default_factory=Lock)
+    _thread:     Thread                     = field(init=False, repr=False)
+    # fmt: on
+
+    def __post_init__(self):
+        self._queue = Queue(self.buffer_size)
+        self._thread = Thread(target=self._write_events, daemon=True)
+        self._thread.start()
+
+    def publish(self, event: LoggerEvent) -> None:
+        """
+        Publish an event (without blocking). The event must not be modified
+        afterwards.
+
+        :param event: Event to publish
+        :type event: LoggerEvent
+        """
+        try:
+            self._queue.put_nowait(event)
+        except Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Write the buffered events, and close the target. Gives up after the
+        timeout (e.g. if the consumer doesn't read anymore).
+
+        :param timeout: Maximum seconds to wait for the buffered events
+        :type timeout: float
+        """
+        deadline = time.monotonic() + timeout
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)  # Sentinel
+                break
+            except Full:
+                if time.monotonic() > deadline:
+                    return
+        self._thread.join(max(deadline - time.monotonic(), 0))
+
+    def _write_events(self) -> None:
+        """Write the buffered events to the target, until closed."""
+        stream, retry_at = None, 0.0
+        closed = False
+        while not closed:
+            # Take all buffered events at once
+            events = [self._queue.get()]
+            try:
+                while True:
+                    events.append(self._queue.get_nowait())
+            except Empty:
+                pass
+            if None in events:
+                events = events[: events.index(None)]
+                closed = True
+
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                events.insert(
+                    0,
+                    {
+                        "time": round(time.time(), 3),
+                        "event": "dropped",
+                        "count": dropped,
+                    },
+                )
+
+            if stream is None and time.monotonic() >= retry_at:
+                try:
+                    stream = open_event_target(self.target)
+                except OSError:
+                    retry_at = time.monotonic() + EVENT_RETRY_INTERVAL
+            try:
+                if stream is None:
+                    raise OSError("Event target not available")
+                stream.write(
+                    "".join(
+                        json.dumps(event, separators=(",", ":")) + "\n"
+                        for event in events
+                    ).encode()
+                )
+                stream.flush()
+            except OSError:
+                # Lost (and the target reopened on the next attempt)
+                with self._lock:
+                    self.dropped += dropped + len(events) - bool(dropped)
+                if stream is not None:
+                    try:
+                        stream.close()
+                    except OSError:
+                        pass
+                stream = None
+
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
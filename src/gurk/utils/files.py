@@ -0,0 +1,295 @@
+import errno
+import fcntl
+import filecmp
+import hashlib
+import os
+import shutil
+import stat
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+# ioctl request to share the extents of a file (copy-on-write) on filesystems
+# that support it (e.g. btrfs, XFS), see 'ioctl_ficlone(2)'
+FICLONE = 0x40049409
+
+# Whether reflinks work between two devices (source, destination), and the
+# errors of 'FICLONE' that mean they don't (other errors are not remembered)
+_REFLINK_SUPPORT: dict[tuple[int, int], bool] = {}
+_REFLINK_UNSUPPORTED_ERRNOS = (
+    errno.EOPNOTSUPP,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTTY,
+)
+_REFLINK_LOCK = Lock()
+
+HASH_CHUNK_SIZE = 1024**2  # 1 MiB
+
+
+def inherit_ownership(path: Path, recursive: bool = False) -> None:
+    """
+    Give a path the owner of its parent directory, if created by root. Thus,
+    paths that root creates in a user's directories (e.g. in the caches, as
+    tasks run via 'sudo -E' keep $HOME) remain writable by the user. Does
+    nothing unless running as root.
+
+    :param path: Path created by this process
+    :type path: Path
+    :param recursive: Whether to include the contents of a directory
+    :type recursive: bool
+    """
+    if os.geteuid() != 0:
+        return
+    parent_stat = path.parent.stat()
+    owner = (parent_stat.st_uid, parent_stat.st_gid)
+    if owner == (0, 0):
+        return
+
+    os.lchown(path, *owner)
+    if recursive and path.is_dir() and not path.is_symlink():
+        for root, dirs, files in os.walk(path):
+            for name in (*dirs, *files):
+                os.lchown(os.path.join(root, name), *owner)
+
+
+def make_dirs(path: Path) -> None:
+    """
+    Create a directory and its missing parents, each with the owner of the
+    directory it is created in (see 'inherit_ownership').
+
+    :param path: Path of the directory
+    :type path: Path
+    """
+    missing = []
+    while not path.exists():
+        missing.append(path)
+        path = path.parent
+    for dir_path in reversed(missing):
+        dir_path.mkdir(exist_ok=True)
+        inherit_ownership(dir_path)
+
+
+@contextmanager
+def file_lock(lock_path: Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an exclusive lock on a file (across threads and processes).
+
+    :param lock_path: Path to the lock file
+    :type lock_path: Path
+    :param blocking: Whether to wait for the lock
+    :type blocking: bool
+    :return: Whether the lock is held (always True if blocking)
+    :rtype: Iterator[bool]
+    """
+    make_dirs(lock_path.parent)
+    created = not lock_path.exists()
+    with open(lock_path, "a") as lock_file:
+        if created:
+            inherit_ownership(lock_path)
+        try:
+            fcntl.flock(
+                lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+            )
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def hash_file(path: Path) -> str:
+    """
+    Get the SHA-256 of a file, reading it in chunks.
+
+    :param path: Path to the file
+    :type path: Path
+    :return: Hex digest
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_same_file(
+    src: Path, dest: Path, dest_stat: os.stat_result | None = None
+) -> bool:
+    """
+    Check if a file has the same content as its source. Files with the same
+    size and modification time (as preserved by copies) are assumed equal,
+    like rsync's quick check; otherwise files of the same size are compared
+    byte by byte (stopping at the first difference).
+
+    :param src: Path to the source file
+    :type src: Path
+    :param dest: Path to the destination file
+    :type dest: Path
+    :param dest_stat: Already known 'lstat' of the destination (if any)
+    :type dest_stat: os.stat_result | None
+    :return: True if the destination is a regular file with the same content
+    :rtype: bool
+    """
+    if dest_stat is None:
+        try:
+            dest_stat = dest.lstat()
+        except OSError:
+            return False
+    src_stat = src.stat()
+    if (
+        not stat.S_ISREG(dest_stat.st_mode)
+        or dest_stat.st_size != src_stat.st_size
+    ):
+        return False
+    if dest_stat.st_mtime_ns == src_stat.st_mtime_ns:
+        return True
+    return filecmp.cmp(src, dest, shallow=False)
+
+
+def reflink_file(src: Path, dest: Path) -> bool:
+    """
+    Clone a file as a reflink (no data is written, the extents are shared
+    until either file is modified). The support of each pair of devices is
+    remembered, so unsupported filesystems are only probed once.
+
+    :param src: Path to the source file
+    :type src: Path
+    :param dest: Path to the (not yet existing) destination file
+    :type dest: Path
+    :return: True if the file was cloned, False if reflinks are not supported
+    :rtype: bool
+    :raises FileExistsError: If the destination file exists already
+    :raises OSError: If cloning failed for another reason (e.g. no space)
+    """
+    devices = (src.stat().st_dev, dest.parent.stat().st_dev)
+    with _REFLINK_LOCK:
+        if _REFLINK_SUPPORT.get(devices) is False:
+            return False
+
+    with open(src, "rb") as src_file, open(dest, "xb") as dest_file:
+        try:
+            fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+        except OSError as e:
+            dest.unlink()  # Created above
+            if e.errno not in _REFLINK_UNSUPPORTED_ERRNOS:
+                raise
+            with _REFLINK_LOCK:
+                _REFLINK_SUPPORT[devices] = False
+            return False
+    shutil.copystat(src, dest)
+
+    with _REFLINK_LOCK:
+        _REFLINK_SUPPORT[devices] = True
+    return True
+
+
+def materialize_file(src: Path, dest: Path, hardlink: bool = False) -> int:
+    """
+    Materialize a file at a new path with as little writing as possible: as a
+    reflink if supported, else as a hardlink (only for immutable files, as
+    both paths share the inode), else as a copy.
+
+    :param src: Path to the source file
+    :type src: Path
+    :param dest: Path to the (not yet existing) destination file
+    :type dest: Path
+    :param hardlink: Whether the file is immutable and may be hardlinked
+    :type hardlink: bool
+    :return: Number of bytes written
+    :rtype: int
+    """
+    if src.is_symlink():
+        dest.symlink_to(os.readlink(src))
+        return 0
+    if reflink_file(src, dest):
+        return 0
+    if hardlink:
+        try:
+            os.link(src, dest)
+            return 0
+        except OSError:
+            pass
+    shutil.copy2(src, dest)
+    return dest.stat().st_size
+
+
+def materialize_tree(src: Path, dest: Path, hardlink: bool = False) -> int:
+    """
+    Materialize a directory tree at a new path (see 'materialize_file').
+    Existing directories are merged into.
+
+    :param src: Path to the source directory
+    :type src: Path
+    :param dest: Path to the destination directory
+    :type dest: Path
+    :param hardlink: Whether the files are immutable and may be hardlinked
+    :type hardlink: bool
+    :return: Number of bytes written
+    :rtype: int
+    """
+    n_bytes = 0
+    for root, dirs, files in os.walk(src):
+        root_path = Path(root)
+        dest_root = dest / root_path.relative_to(src)
+        dest_root.mkdir(parents=True, exist_ok=True)
+        for name in list(dirs):
+            if (root_path / name).is_symlink():
+                dirs.remove(name)
+                files.append(name)
+        for name in files:
+            n_bytes += materialize_file(
+                root_path / name, dest_root / name, hardlink
+            )
+    return n_bytes
+
+
+def move_path(src: Path, dest: Path) -> int:
+    """
+    Move a file or directory, which is a rename on the same filesystem, or a
+    materialization (see 'materialize_tree') followed by a removal otherwise.
+
+    :param src: Path to move
+    :type src: Path
+    :param dest: Path to move to (must not exist)
+    :type dest: Path
+    :return: Number of bytes written
+    :rtype: int
+    """
+    try:
+        src.rename(dest)
+        return 0
+    except OSError:
+        pass
+
+    if src.is_dir() and not src.is_symlink():
+        n_bytes = materialize_tree(src, dest)
+        shutil.rmtree(src)
+    else:
+        n_bytes = materialize_file(src, dest)
+        src.unlink()
+    return n_bytes
+
+
+def get_tree_size(path: Path, exclude: tuple[str, ...] = ()) -> int:
+    """
+    Get the total size of the files in a directory (symlinks not followed).
+
+    :param path: Path to the directory
+    :type path: Path
+    :param exclude: Names of top-level entries to exclude (e.g. ".git")
+    :type exclude: tuple[str, ...]
+    :return: Size in bytes
+    :rtype: int
+    """
+    n_bytes = 0
+    for root, dirs, files in os.walk(path):
+        if Path(root) == Path(path):
+            dirs[:] = [name for name in dirs if name not in exclude]
+            files = [name for name in files if name not in exclude]
+        n_bytes += sum((Path(root) / name).lstat().st_size for name in files)
+    return n_bytes
@@ -0,0 +1,312 @@
+import atexit
+import importlib
+import io
+import json
+import os
+import pkgutil
+import runpy
+import selectors
+import socket
+import subprocess
+import sys
+import traceback
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from gurk.utils.common import PACKAGE_SRC_PATH, CommandKind
+
+# Modules imported once by the fork server, so that forked tasks don't have
+# to (the python helpers are added by 'preload_modules')
+FORKSERVER_PRELOAD = ("gurk.core.logger", "gurk.utils.interface")
+FORKSERVER_HELPERS_PATH = PACKAGE_SRC_PATH / "scripts" / "python" / "helpers"
+
+# Maximum size of a request (mostly the environment of the task)
+_MAX_REQUEST_SIZE = 1024**2
+
+
+def preload_modules() -> None:
+    """
+    Import the modules used by Python tasks (see 'FORKSERVER_PRELOAD' and the
+    python helpers). Modules that fail to import are left to the tasks.
+    """
+    helpers = [
+        f"gurk.scripts.python.helpers.{module.name}"
+        for module in pkgutil.iter_modules([str(FORKSERVER_HELPERS_PATH)])
+    ]
+    for name in (*FORKSERVER_PRELOAD, *helpers):
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+
+def _run_child(argv: list[str], env: dict[str, str], cwd: str) -> int:
+    """
+    Run a script in a forked child, like 'python -u <argv>' would, with its
+    stdio already on the task's terminal.
+
+    :param argv: Script to run and its arguments
+    :type argv: list[str]
+    :param env: Environment of the task
+    :type env: dict[str, str]
+    :param cwd: Working directory of the task
+    :type cwd: str
+    :return: Exit code of the script
+    :rtype: int
+    """
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+
+    # Unbuffered stdio (as with 'python -u')
+    sys.stdin = io.TextIOWrapper(
+        io.FileIO(0, "r", closefd=False), encoding="utf-8"
+    )
+    sys.stdout, sys.stderr = (
+        io.TextIOWrapper(
+            io.FileIO(fd, "w", closefd=False),
+            encoding="utf-8",
+            errors="backslashreplace",
+            write_through=True,
+        )
+        for fd in (1, 2)
+    )
+
+    sys.argv = list(argv)
+    sys.path[0] = os.path.dirname(os.path.abspath(argv[0]))
+    try:
+        runpy.run_path(argv[0], run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        # Same as the interpreter: None is 0, other non-integers are printed
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code & 0xFF
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Without the frames of the fork server (as for a new interpreter)
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename in (
+            __file__,
+            runpy.__file__,
+            "<frozen runpy>",
+        ):
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+        code = 1
+    atexit._run_exitfuncs()
+    return code
+
+
+def _fork_child(request: dict, slave_fd: int) -> int:
+    """
+    Fork a child running a task on its terminal (see '_run_child'), as the
+    leader of a new session and without any other file descriptors (as the
+    processes spawned by the scheduler).
+
+    :param request: Request of the task ('argv', 'env' and 'cwd')
+    :type request: dict
+    :param slave_fd: Slave end of the task's PTY
+    :type slave_fd: int
+    :return: PID of the child
+    :rtype: int
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 1
+    try:
+        os.setsid()
+        for fd in (0, 1, 2):
+            os.dup2(slave_fd, fd)
+        os.closerange(3, os.sysconf("SC_OPEN_MAX"))
+        code = _run_child(request["argv"], request["env"], request["cwd"])
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+
+def serve(control_fd: int) -> None:
+    """
+    Serve the requests of the scheduler on the control socket, until it is
+    closed. Each request carries the task's PTY and a reply socket, which
+    receives the PID of the forked child and then its exit code.
+
+    :param control_fd: File descriptor of the control socket
+    :type control_fd: int
+    """
+    control = socket.socket(fileno=control_fd)
+    preload_modules()
+
+    selector = selectors.DefaultSelector()
+    selector.register(control, selectors.EVENT_READ)
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is control:
+                data, fds, _, _ = socket.recv_fds(
+                    control, _MAX_REQUEST_SIZE, 2
+                )
+                if not data:  # Closed by the scheduler
+                    return
+                slave_fd, reply_fd = fds
+                reply = socket.socket(fileno=reply_fd)
+                try:
+                    pid = _fork_child(json.loads(data), slave_fd)
+                except OSError:
+                    reply.close()  # The scheduler spawns the task instead
+                    continue
+                finally:
+                    os.close(slave_fd)
+                pidfd = os.pidfd_open(pid)
+                selector.register(pidfd, selectors.EVENT_READ, (pid, reply))
+                try:
+                    reply.sendall(f"{pid}\n".encode())
+                except OSError:
+                    pass
+            else:
+                # Child exited
+                pid, reply = key.data
+                selector.unregister(key.fd)
+                os.close(key.fd)
+                _, status = os.waitpid(pid, 0)
+                try:
+                    reply.sendall(
+                        f"{os.waitstatus_to_exitcode(status)}\n".encode()
+                    )
+                except OSError:
+                    pass
+                reply.close()
+
+
+@dataclass
+class ForkedProcess:
+    """
+    Process forked by the fork server, with the same interface as a
+    'subprocess.Popen' for waiting.
+    """
+
+    # fmt: off
+    pid:        int        = field()
+    _reply:     TextIO     = field(repr=False)
+
+    returncode: int | None = field(init=False, default=None)
+    # fmt: on
+
+    def wait(self) -> int:
+        """
+        Wait for the process to exit.
+
+        :return: Exit code (negative signal number if killed by a signal)
+        :rtype: int
+        :raises ChildProcessError: If the fork server exited meanwhile
+        """
+        if self.returncode is None:
+            with self._reply:
+                line = self._reply.readline()
+            if not line:
+                raise ChildProcessError(
+                    f"Fork server exited before process {self.pid}"
+                )
+            self.returncode = int(line)
+        return self.returncode
+
+
+@dataclass
+class ForkServer:
+    """
+    Warm Python process (once per run) that has the modules of Python tasks
+    already imported, and forks a child per task instead of starting a new
+    interpreter (see 'serve').
+    """
+
+    # fmt: off
+    python:   str              = field(default=CommandKind.PYTHON.exe)
+
+    _control: socket.socket    = field(init=False, repr=False)
+    _process: subprocess.Popen = field(init=False, repr=False)
+    # fmt: on
+
+    def __post_init__(self):
+        # NOTE: Messages (and their file descriptors) are kept apart, so
+        #       tasks can be spawned from multiple threads
+        self._control, server_end = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET
+        )
+        try:
+            # NOTE: In a new session, so a Ctrl+C is left to the scheduler
+            self._process = subprocess.Popen(
+                [
+                    self.python,
+                    "-m",
+                    "gurk.utils.forkserver",
+                    str(server_end.fileno()),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(server_end.fileno(),),
+                start_new_session=True,
+            )
+        except OSError:
+            self._control.close()
+            raise
+        finally:
+            server_end.close()
+
+    def spawn(
+        self, argv: list[str], slave_fd: int, env: dict[str, str]
+    ) -> ForkedProcess:
+        """
+        Run a Python script (and its arguments) like 'python -u <argv>', on
+        the given terminal.
+
+        :param argv: Script to run and its arguments
+        :type argv: list[str]
+        :param slave_fd: Slave end of the task's PTY (stdin, stdout, stderr)
+        :type slave_fd: int
+        :param env: Environment of the task
+        :type env: dict[str, str]
+        :return: Forked process
+        :rtype: ForkedProcess
+        :raises OSError: If the fork server is not running (anymore)
+        """
+        sock, server_end = socket.socketpair()
+        reply = sock.makefile("r")
+        sock.close()  # NOTE: Closed with the reply
+        try:
+            request = json.dumps(
+                {"argv": argv, "env": env, "cwd": os.getcwd()}
+            ).encode()
+            socket.send_fds(
+                self._control, [request], [slave_fd, server_end.fileno()]
+            )
+        except OSError:
+            reply.close()
+            raise
+        finally:
+            server_end.close()
+
+        line = reply.readline()
+        if not line:
+            reply.close()
+            raise ChildProcessError("Fork server failed to fork the process")
+        return ForkedProcess(int(line), reply)
+
+    def close(self) -> None:
+        """Stop the fork server (running tasks are not affected)."""
+        self._control.close()
+        self._process.wait()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]))
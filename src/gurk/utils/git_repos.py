@@ -1,15 +1,46 @@
+import hashlib
+import json
 import os
+import re
 import shlex
 import shutil
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import Lock
 from typing import Literal, TypeAlias, TypedDict, overload
 from urllib.parse import parse_qs, urlparse
 
-import git
+from gurk.utils.common import PACKAGE_CACHE_PATH, FilePath, format_bytes
+from gurk.utils.files import (
+    file_lock,
+    get_tree_size,
+    inherit_ownership,
+    materialize_tree,
+    move_path,
+)
 
-from gurk.utils.common import PACKAGE_CACHE_PATH, generate_random_path
+# Bare mirrors of cloned repositories, keyed by URL (see 'get_cached_repo')
+GIT_CACHE_PATH = PACKAGE_CACHE_PATH / "git"
+GIT_CACHE_INDEX_FILE = "index.json"
+GIT_CACHE_INDEX_LOCK = "index.lock"
+
+# Limits of the git cache (see 'evict_git_cache')
+GIT_CACHE_MAX_SIZE = 5 * 1024**3  # 5 GiB
+GIT_CACHE_MAX_AGE = 30 * 24 * 3600  # 30 days
+
+# Remote refs are reused across processes for this long (see
+# 'resolve_remote_refs')
+GIT_REFS_CACHE_FILE = "refs.json"
+GIT_REFS_CACHE_LOCK = "refs.lock"
+GIT_REFS_TTL = 300  # 5 minutes
+
+# Per-process remote refs by URL (None for invalid repositories)
+_REMOTE_REFS_CACHE: dict[str, dict[str, str] | None] = {}
+_REMOTE_REFS_STATS = {"ls-remote": 0, "cached": 0}
+_REMOTE_REFS_LOCK = Lock()
 
 
 def run_git_command(
@@ -48,6 +79,16 @@ class GitRefInfo(TypedDict):
     # fmt: on
 
 
+class GitCacheEntry(TypedDict):
+    """TypedDict representing an entry of the git cache index."""
+
+    # fmt: off
+    url:       str
+    last_used: float
+    size:      int
+    # fmt: on
+
+
 GitRef: TypeAlias = str  # See 'parse_git_ref' function for expected format
 
 
@@ -142,88 +183,579 @@ def get_remote_heads(url: str, HEAD: bool = False):
     :param HEAD: If True, return the default branch's commit hash only (default: False)
     :type HEAD: bool
     """
-    flags = " --heads" if not HEAD else ""
-    result = run_git_command(f"git ls-remote{flags} {url}", timeout=10)
+    refs = get_remote_refs(url)
+    if refs is None:
+        raise RuntimeError(f"Failed to list the remote refs of {url}")
+
+    if HEAD:
+        return refs.get("HEAD")
+
+    return {
+        ref.removeprefix("refs/heads/"): commit
+        for ref, commit in refs.items()
+        if ref.startswith("refs/heads/")
+    }
+
+
+def is_remote_url(url: str) -> bool:
+    """
+    Check if a repository URL is remote, following git's own rules: URLs with
+    a scheme and scp-like '[user@]host:path' strings are, other paths aren't.
+
+    :param url: Repository URL (without GitRef query)
+    :type url: str
+    :return: True if the URL is remote, False if it is a local path
+    :rtype: bool
+    """
+    if "://" in url:
+        return True
+    host, sep, _ = url.partition(":")
+    return bool(sep and host and "/" not in host)
+
+
+def is_local_git_repo(path: FilePath) -> bool:
+    """
+    Check if a local path is a Git repository (with a working tree or bare),
+    without spawning git.
+
+    :param path: Path to check
+    :type path: FilePath
+    :return: True if the path is a Git repository, False otherwise
+    :rtype: bool
+    """
+    path = Path(path)
+    for repo_path in (path, Path(f"{path}.git")):
+        if (repo_path / ".git").exists() or (
+            (repo_path / "HEAD").is_file() and (repo_path / "objects").is_dir()
+        ):
+            return True
+    return False
+
+
+def get_remote_refs_stats() -> dict[str, int]:
+    """
+    Get the number of 'ls-remote' calls made by this process, and of lookups
+    answered by the ref cache instead (i.e. round trips saved).
+
+    :return: Counts with keys 'ls-remote' and 'cached'
+    :rtype: dict[str, int]
+    """
+    with _REMOTE_REFS_LOCK:
+        return dict(_REMOTE_REFS_STATS)
+
+
+def _ls_remote(url: str) -> dict[str, str] | None:
+    """
+    List the refs of a remote repository.
+
+    :param url: URL of the repository
+    :type url: str
+    :return: Commit hashes by ref name (incl. 'HEAD'), or None if it failed
+    :rtype: dict[str, str] | None
+    """
+    result = run_git_command(f"git ls-remote {shlex.quote(url)}", timeout=10)
+    with _REMOTE_REFS_LOCK:
+        _REMOTE_REFS_STATS["ls-remote"] += 1
     if result.returncode != 0:
-        raise RuntimeError(result.stderr)
+        return None
 
-    heads = {}
+    refs = {}
     for line in result.stdout.strip().splitlines():
         commit, ref = line.split()
-        branch = ref.removeprefix("refs/heads/")
-        heads[branch] = commit
+        refs[ref] = commit
+    return refs
+
+
+def resolve_remote_refs(
+    urls: list[str], jobs: int = 8
+) -> dict[str, dict[str, str] | None]:
+    """
+    Resolve the refs of several remote repositories. Refs are reused within
+    this process, and across processes for GIT_REFS_TTL seconds (on disk).
+    The remaining repositories are listed concurrently.
+
+    :param urls: URLs of the repositories (duplicates are resolved once)
+    :type urls: list[str]
+    :param jobs: Maximum number of concurrent 'ls-remote' calls
+    :type jobs: int
+    :return: Refs by URL (see '_ls_remote'), None for invalid repositories
+    :rtype: dict[str, dict[str, str] | None]
+    """
+    resolved = {}
+    pending = []
+    with _REMOTE_REFS_LOCK:
+        disk_cache = None
+        for url in dict.fromkeys(urls):
+            if url in _REMOTE_REFS_CACHE:
+                resolved[url] = _REMOTE_REFS_CACHE[url]
+                _REMOTE_REFS_STATS["cached"] += 1
+                continue
+
+            if disk_cache is None:
+                disk_cache = _read_remote_refs_cache()
+            entry = disk_cache.get(url)
+            if entry and time.time() - entry["time"] < GIT_REFS_TTL:
+                resolved[url] = _REMOTE_REFS_CACHE[url] = entry["refs"]
+                _REMOTE_REFS_STATS["cached"] += 1
+            else:
+                pending.append(url)
+
+    if not pending:
+        return resolved
+
+    with ThreadPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+        listed = dict(zip(pending, executor.map(_ls_remote, pending)))
+    with _REMOTE_REFS_LOCK:
+        _REMOTE_REFS_CACHE.update(listed)
+    resolved.update(listed)
+
+    # Only valid repositories are remembered across processes, as a failure
+    # may be temporary (e.g. no network)
+    try:
+        with file_lock(GIT_CACHE_PATH / GIT_REFS_CACHE_LOCK):
+            now = time.time()
+            disk_cache = {
+                url: entry
+                for url, entry in _read_remote_refs_cache().items()
+                if now - entry["time"] < GIT_REFS_TTL
+            }
+            for url, refs in listed.items():
+                if refs is not None:
+                    disk_cache[url] = {"time": now, "refs": refs}
+            refs_cache_path = GIT_CACHE_PATH / GIT_REFS_CACHE_FILE
+            tmp_path = refs_cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(disk_cache))
+            inherit_ownership(tmp_path)
+            tmp_path.replace(refs_cache_path)
+    except OSError:
+        pass  # E.g. cache not writable - the refs are only reused in-process
+
+    return resolved
+
+
+def get_remote_refs(url: str) -> dict[str, str] | None:
+    """
+    Get the refs of a remote repository (see 'resolve_remote_refs').
+
+    :param url: URL of the repository
+    :type url: str
+    :return: Commit hashes by ref name (incl. 'HEAD'), or None if invalid
+    :rtype: dict[str, str] | None
+    """
+    return resolve_remote_refs([url])[url]
+
+
+def _read_remote_refs_cache() -> dict[str, dict]:
+    """
+    Read the on-disk cache of remote refs.
+
+    :return: Entries with keys 'time' and 'refs' by URL
+    :rtype: dict[str, dict]
+    """
+    try:
+        return json.loads((GIT_CACHE_PATH / GIT_REFS_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def get_mirror_key(url: str) -> str:
+    """
+    Get the key (directory name) of the cached mirror of a repository.
+
+    :param url: URL of the repository
+    :type url: str
+    :return: Readable repository name followed by a hash of the full URL
+    :rtype: str
+    """
+    name = url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+    name = re.sub(r"[^\w.-]", "_", name.removesuffix(".git"))[:32] or "repo"
+    return f"{name}_{hashlib.sha1(url.encode()).hexdigest()[:12]}"
+
+
+def read_git_cache_index() -> dict[str, GitCacheEntry]:
+    """
+    Read the index of the git cache, which maps the mirror keys to their URL,
+    last usage and size (so no cached repository has to be opened to look up
+    or evict a mirror).
+
+    :return: Index of the git cache
+    :rtype: dict[str, GitCacheEntry]
+    """
+    try:
+        return json.loads((GIT_CACHE_PATH / GIT_CACHE_INDEX_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_git_cache_index(index: dict[str, GitCacheEntry]) -> None:
+    """
+    Atomically write the index of the git cache.
+
+    :param index: Index of the git cache
+    :type index: dict[str, GitCacheEntry]
+    """
+    index_path = GIT_CACHE_PATH / GIT_CACHE_INDEX_FILE
+    tmp_path = index_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(index, indent=2, sort_keys=True))
+    inherit_ownership(tmp_path)
+    tmp_path.replace(index_path)
+
+
+def evict_git_cache(
+    max_size: int | None = None,
+    max_age: float | None = None,
+    keep: tuple[str, ...] = (),
+) -> list[str]:
+    """
+    Evict mirrors from the git cache: first those unused for longer than the
+    maximum age, then the least recently used until the cache fits the
+    maximum size. Mirrors in use (e.g. being fetched) are never evicted.
+
+    :param max_size: Maximum total size in bytes (default: GIT_CACHE_MAX_SIZE)
+    :type max_size: int | None
+    :param max_age: Maximum age in seconds (default: GIT_CACHE_MAX_AGE)
+    :type max_age: float | None
+    :param keep: Keys of mirrors to keep regardless
+    :type keep: tuple[str, ...]
+    :return: URLs of the evicted mirrors
+    :rtype: list[str]
+    """
+    max_size = GIT_CACHE_MAX_SIZE if max_size is None else max_size
+    max_age = GIT_CACHE_MAX_AGE if max_age is None else max_age
+
+    evicted = []
+    with file_lock(GIT_CACHE_PATH / GIT_CACHE_INDEX_LOCK):
+        index = read_git_cache_index()
+        total_size = sum(entry["size"] for entry in index.values())
+        now = time.time()
+        for key, entry in sorted(
+            index.items(), key=lambda item: item[1]["last_used"]
+        ):
+            expired = now - entry["last_used"] > max_age
+            if key in keep or not (expired or total_size > max_size):
+                continue
+            with file_lock(
+                GIT_CACHE_PATH / f"{key}.lock", blocking=False
+            ) as locked:
+                if not locked:
+                    continue
+                shutil.rmtree(GIT_CACHE_PATH / key, ignore_errors=True)
+            (GIT_CACHE_PATH / f"{key}.lock").unlink(missing_ok=True)
+            del index[key]
+            total_size -= entry["size"]
+            evicted.append(entry["url"])
+        _write_git_cache_index(index)
+
+    return evicted
+
+
+def _touch_git_cache_index(key: str, url: str) -> None:
+    """
+    Record the usage (and current size) of a mirror in the git cache index,
+    and evict other mirrors if needed.
+
+    :param key: Key of the mirror
+    :type key: str
+    :param url: URL of the mirrored repository
+    :type url: str
+    """
+    with file_lock(GIT_CACHE_PATH / GIT_CACHE_INDEX_LOCK):
+        index = read_git_cache_index()
+        index[key] = {
+            "url": url,
+            "last_used": time.time(),
+            "size": get_tree_size(GIT_CACHE_PATH / key),
+        }
+        _write_git_cache_index(index)
+    evict_git_cache(keep=(key,))
+
+
+def has_commit(repo_path: Path, rev: str) -> bool:
+    """
+    Check if a (local) repository contains a commit.
+
+    :param repo_path: Path to the repository
+    :type repo_path: Path
+    :param rev: Commit hash (or any revision)
+    :type rev: str
+    :return: True if the commit exists in the repository
+    :rtype: bool
+    """
+    result = run_git_command(
+        f"git -C {shlex.quote(str(repo_path))} cat-file -e "
+        f"{shlex.quote(rev)}^{{commit}}"
+    )
+    return result.returncode == 0
+
+
+def get_local_commit(repo_path: FilePath, rev: str = "HEAD") -> str | None:
+    """
+    Get the commit hash a revision of a (local) repository points to.
+
+    :param repo_path: Path to the repository
+    :type repo_path: FilePath
+    :param rev: Revision to resolve
+    :type rev: str
+    :return: Commit hash, or None if the revision does not exist
+    :rtype: str | None
+    """
+    result = run_git_command(
+        f"git -C {shlex.quote(str(repo_path))} rev-parse --verify --quiet "
+        f"{shlex.quote(rev)}^{{commit}}"
+    )
+    return result.stdout.strip() or None
+
+
+def get_target_commit(repo: GitRef) -> str | None:
+    """
+    Get the commit a GitRef currently refers to: the requested commit, or
+    the head of its branch (or HEAD). Remote heads are looked up in the
+    cached remote refs (see 'resolve_remote_refs').
+
+    :param repo: GitRef string of the repository
+    :type repo: GitRef
+    :return: Commit hash (possibly abbreviated, if requested as such), or
+             None if it could not be resolved
+    :rtype: str | None
+    """
+    parsed = parse_git_ref(repo)
+    if parsed["commit"]:
+        return parsed["commit"]
+
+    ref = f"refs/heads/{parsed['branch']}" if parsed["branch"] else "HEAD"
+    if not is_remote_url(parsed["url"]):
+        return get_local_commit(parsed["url"], ref)
+    return (get_remote_refs(parsed["url"]) or {}).get(ref)
+
+
+def _is_mirror_current(mirror: Path, parsed: GitRefInfo) -> bool:
+    """
+    Check if a mirror contains the requested commit, or if its branch (or
+    HEAD) matches the remote (using the cached remote refs).
+
+    :param mirror: Path to the mirror
+    :type mirror: Path
+    :param parsed: Parsed GitRef of the repository
+    :type parsed: GitRefInfo
+    :return: True if the mirror doesn't need to be fetched
+    :rtype: bool
+    """
+    if parsed["commit"]:
+        return has_commit(mirror, parsed["commit"])
+
+    remote_refs = get_remote_refs(parsed["url"])
+    ref = f"refs/heads/{parsed['branch']}" if parsed["branch"] else "HEAD"
+    if not remote_refs or ref not in remote_refs:
+        return False
 
-    return heads
+    result = run_git_command(
+        f"git -C {shlex.quote(str(mirror))} rev-parse --verify --quiet "
+        f"{shlex.quote(ref)}"
+    )
+    return result.stdout.strip() == remote_refs[ref]
 
 
 def get_cached_repo(repo: GitRef) -> Path | None:
     """
-    Check if a Git repository with the specified commit exists in the cache.
+    Get the cached bare mirror of a Git repository. On a miss, the repository
+    is mirrored into the cache; otherwise it is fetched incrementally, unless
+    the requested commit (or the remote branch head) is already cached.
+    Everything written into the cache gets the owner of the cache (see
+    'inherit_ownership'), so running as root keeps it usable for the user.
 
-    :param repo: GitRef string of the repository to check
+    :param repo: GitRef string of the repository
     :type repo: GitRef
-    :return: None if not cached, or Path to cached repo if found
+    :return: Path to the mirror, or None if it could not be cloned/fetched
     :rtype: Path | None
+    :raises OSError: If the cache is not usable (e.g. not writable)
     """
     parsed = parse_git_ref(repo)
-    if parsed["commit"]:
-        # Case 1: commit specified
-        parsed["commit"] = parsed["commit"]
-    elif parsed["branch"]:
-        # Case 2: branch specified → resolve to commit
-        heads = get_remote_heads(parsed["url"])
-        if parsed["branch"] not in heads:
-            raise ValueError(
-                f"Branch '{parsed['branch']}' not found on remote"
+    key = get_mirror_key(parsed["url"])
+    mirror = GIT_CACHE_PATH / key
+
+    with file_lock(GIT_CACHE_PATH / f"{key}.lock"):
+        if key in read_git_cache_index() and (mirror / "HEAD").is_file():
+            # Hit: update the mirror unless it is up to date
+            if not _is_mirror_current(mirror, parsed):
+                result = run_git_command(
+                    f"git -C {shlex.quote(str(mirror))} fetch --prune origin"
+                )
+                if result.returncode != 0:
+                    return None
+        else:
+            # Miss: mirror all refs of the repository
+            shutil.rmtree(mirror, ignore_errors=True)
+            tmp_mirror = mirror.with_suffix(".tmp")
+            shutil.rmtree(tmp_mirror, ignore_errors=True)
+            result = run_git_command(
+                f"git clone --mirror {shlex.quote(parsed['url'])} "
+                f"{shlex.quote(str(tmp_mirror))}"
+            )
+            if result.returncode != 0:
+                shutil.rmtree(tmp_mirror, ignore_errors=True)
+                return None
+            inherit_ownership(tmp_mirror, recursive=True)
+            tmp_mirror.rename(mirror)
+
+        # Commits not reachable from any ref have to be fetched explicitly
+        if parsed["commit"] and not has_commit(mirror, parsed["commit"]):
+            run_git_command(
+                f"git -C {shlex.quote(str(mirror))} fetch origin "
+                f"{shlex.quote(parsed['commit'])}"
             )
+            if not has_commit(mirror, parsed["commit"]):
+                return None
 
-        parsed["commit"] = heads[parsed["branch"]]
-    else:
-        # Case 3: neither commit nor branch specified → use default branch HEAD
-        parsed["commit"] = get_remote_heads(parsed["url"], HEAD=True)
-
-    # Check cache
-    cached_repo = None
-    git_cache_dir = PACKAGE_CACHE_PATH / "git"
-    git_cache_dir.mkdir(parents=True, exist_ok=True)
-    for repo_dir in git_cache_dir.iterdir():
-        if not repo_dir.is_dir():
-            continue
-
-        # Check if it's a git repo
-        try:
-            repo_obj = git.Repo(repo_dir)
-        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
-            continue
+        # Fetched objects/refs (e.g. 'FETCH_HEAD', 'packed-refs')
+        inherit_ownership(mirror, recursive=True)
 
-        # Check if it has an 'origin' remote
-        try:
-            origin = repo_obj.remotes.origin
-        except AttributeError:
-            continue
-
-        # Check remote URL
-        if origin.url != parsed["url"]:
-            continue
-
-        # Repo found
-        if repo_obj.head.commit.hexsha == parsed["commit"]:
-            # Already at desired commit
-            cached_repo = repo_dir
+    _touch_git_cache_index(key, parsed["url"])
+    return mirror
+
+
+def _checkout_revision(dest_path: Path, parsed: GitRefInfo) -> bool:
+    """
+    Check out the requested revision of a clone (made with '--no-checkout'),
+    fetching the commit if needed. If the GitRef has a path, only that path
+    is checked out.
+
+    :param dest_path: Path to the clone
+    :type dest_path: Path
+    :param parsed: Parsed GitRef of the repository
+    :type parsed: GitRefInfo
+    :return: True if the revision was checked out
+    :rtype: bool
+    """
+    dest = shlex.quote(str(dest_path))
+    if parsed["commit"] and not has_commit(dest_path, parsed["commit"]):
+        depth = (
+            f" --depth {parsed['depth']}"
+            if parsed["depth"] is not None
+            else ""
+        )
+        run_git_command(
+            f"git -C {dest} fetch{depth} origin "
+            f"{shlex.quote(parsed['commit'])}"
+        )
+
+    git_cmds = []
+    if parsed["path"]:
+        sparse_path = "/" + parsed["path"].strip("/")
+        git_cmds.append(
+            f"sparse-checkout set --no-cone {shlex.quote(sparse_path)}"
+        )
+    revision = parsed["commit"] or parsed["branch"] or "HEAD"
+    git_cmds.append(f"checkout --quiet {shlex.quote(revision)}")
+    for git_cmd in git_cmds:
+        result = run_git_command(f"git -C {dest} {git_cmd}")
+        if result.returncode != 0:
+            return False
+    return True
+
+
+def clone_uncached_repo(repo: GitRef, dest_path: Path) -> int | None:
+    """
+    Clone a repository directly from its URL, without the git cache (e.g. for
+    shallow clones of repositories that aren't cached, or if the cache is not
+    usable).
+
+    :param repo: GitRef string of the repository
+    :type repo: GitRef
+    :param dest_path: Destination path of the clone
+    :type dest_path: Path
+    :return: Number of bytes written, or None if the clone failed
+    :rtype: int | None
+    """
+    parsed = parse_git_ref(repo)
+    git_clone_cmd = "git clone --quiet --no-checkout"
+    if parsed["depth"] is not None:
+        git_clone_cmd += f" --depth {parsed['depth']}"
+    if parsed["branch"]:
+        git_clone_cmd += f" --branch {shlex.quote(parsed['branch'])}"
+    result = run_git_command(
+        f"{git_clone_cmd} {shlex.quote(parsed['url'])} "
+        f"{shlex.quote(str(dest_path))}"
+    )
+    if result.returncode != 0 or not _checkout_revision(dest_path, parsed):
+        return None
+    return get_tree_size(dest_path)
+
+
+def checkout_cached_repo(
+    mirror: Path, repo: GitRef, dest_path: Path
+) -> int | None:
+    """
+    Check out a repository from its cached mirror, writing as little as
+    possible. The clone first borrows the mirror's objects ('--shared'), then
+    gets its own copies of them: reflinks where supported, else hardlinks (the
+    objects are immutable), so the checkout stays valid after the mirror is
+    evicted. Privileged checkouts don't hardlink, as the ownership of their
+    files is reverted afterwards, which would change the mirror's objects
+    (sharing the inodes) too. With a depth, the shallow history is fetched over 'file://'
+    instead. If the GitRef has a path, only that path is checked out. The
+    origin remote is pointed back to the repository URL.
+
+    :param mirror: Path to the cached mirror (see 'get_cached_repo')
+    :type mirror: Path
+    :param repo: GitRef string of the repository
+    :type repo: GitRef
+    :param dest_path: Destination path of the checkout
+    :type dest_path: Path
+    :return: Number of bytes written, or None if the checkout failed
+    :rtype: int | None
+    """
+    parsed = parse_git_ref(repo)
+    dest = shlex.quote(str(dest_path))
+    branch = (
+        f" --branch {shlex.quote(parsed['branch'])}"
+        if parsed["branch"]
+        else ""
+    )
+
+    # NOTE: The mirror is locked so it is not fetched/evicted meanwhile
+    with file_lock(GIT_CACHE_PATH / f"{mirror.name}.lock"):
+        if parsed["depth"] is not None:
+            # NOTE: '--depth' is ignored for local clones
+            result = run_git_command(
+                f"git clone --quiet --no-checkout --depth {parsed['depth']}"
+                f"{branch} {shlex.quote(f'file://{mirror}')} {dest}"
+            )
+            if result.returncode != 0:
+                return None
+            objects_written = get_tree_size(dest_path / ".git" / "objects")
         else:
-            # Checkout desired commit
-            repo_obj.git.fetch("origin", parsed["commit"])
-            repo_obj.git.checkout(parsed["commit"])
+            result = run_git_command(
+                f"git clone --quiet --no-checkout --shared{branch} "
+                f"{shlex.quote(str(mirror))} {dest}"
+            )
+            if result.returncode != 0:
+                return None
+            objects_path = dest_path / ".git" / "objects"
+            objects_written = materialize_tree(
+                mirror / "objects", objects_path, hardlink=os.geteuid() != 0
+            )
+            (objects_path / "info" / "alternates").unlink()
 
-        # Repo matched, no need to check further
-        break
+    if not _checkout_revision(dest_path, parsed):
+        return None
+    result = run_git_command(
+        f"git -C {dest} remote set-url origin {shlex.quote(parsed['url'])}"
+    )
+    if result.returncode != 0:
+        return None
 
-    return cached_repo
+    # Written: everything except the objects that are shared with the mirror
+    return get_tree_size(dest_path, exclude=(".git",)) + (
+        get_tree_size(dest_path / ".git", exclude=("objects",))
+        + objects_written
+    )
 
 
 def is_git_repo(repo: GitRef) -> bool:
     """
-    Check if a string is a valid Git repository URL.
+    Check if a string is a valid Git repository URL. Local paths are checked
+    without spawning git, and remote refs are cached (see
+    'resolve_remote_refs').
 
     :param repo: GitRef string to check
     :type repo: GitRef
@@ -231,8 +763,9 @@ def is_git_repo(repo: GitRef) -> bool:
     :rtype: bool
     """
     parsed = parse_git_ref(repo)
-    result = run_git_command(f"git ls-remote {parsed['url']}", timeout=10)
-    return result.returncode == 0
+    if not is_remote_url(parsed["url"]):
+        return is_local_git_repo(parsed["url"])
+    return get_remote_refs(parsed["url"]) is not None
 
 
 def handle_existing_dest(dest_path: Path, overwrite: bool) -> bool:
@@ -285,31 +818,81 @@ def clone_git_repo(
     if not handle_existing_dest(dest_path, overwrite):
         return None
 
-    temp_repo = get_cached_repo(repo)
-    if not temp_repo:
-        tmp_dir = generate_random_path()
+    # NOTE: Shallow clones are only made from the cache if the repository is
+    #       cached already, as mirroring it would fetch the whole history
+    if parsed["depth"] is not None and (
+        get_mirror_key(parsed["url"]) not in read_git_cache_index()
+    ):
+        n_bytes = clone_uncached_repo(repo, dest_path)
+    else:
         try:
-            git_clone_cmd = f"git clone {parsed['url']} {tmp_dir}"
-            if parsed["branch"]:
-                git_clone_cmd += f" --branch {parsed['branch']}"
-            if parsed["depth"] is not None:
-                git_clone_cmd += f" --depth {parsed['depth']}"
-            result = run_git_command(git_clone_cmd)
-            if result.returncode != 0:
-                print(f"Git clone failed for {parsed['url']}")
-                return None
-            repo_obj = git.Repo(tmp_dir)
+            mirror = get_cached_repo(repo)
+            n_bytes = None
+            if mirror is not None:
+                n_bytes = checkout_cached_repo(mirror, repo, dest_path)
+        except OSError as e:
+            print(f"Git cache not usable ({e}), cloning without it")
+            shutil.rmtree(dest_path, ignore_errors=True)
+            n_bytes = clone_uncached_repo(repo, dest_path)
+    if n_bytes is None:
+        print(f"Git clone failed for {parsed['url']}")
+        shutil.rmtree(dest_path, ignore_errors=True)
+        return None
 
-            if parsed["commit"]:
-                repo_obj.git.fetch("origin", parsed["commit"])
-                repo_obj.git.checkout(parsed["commit"])
+    print(f"Cloned {parsed['url']} ({format_bytes(n_bytes)} written)")
+    return dest_path
 
-            temp_repo = tmp_dir
-        except git.exc.GitCommandError:
-            return None
 
-    # Copy from cache or temporary location
-    shutil.copytree(temp_repo, dest_path)
+def sparse_clone_git_repo(repo: GitRef, dest_path: Path) -> Path | None:
+    """
+    Clone only the path of a GitRef: blobs are fetched on demand (partial
+    clone with '--filter=blob:none'), and only for the checked out path
+    (non-cone sparse checkout, so the path may be a file or a directory).
+    With a depth, only the trees of the last commits are fetched as well.
+
+    :param repo: GitRef string of the repository, with a path
+    :type repo: GitRef
+    :param dest_path: Destination path of the (sparse) checkout
+    :type dest_path: Path
+    :return: Path to the checkout or None if cloning failed
+    :rtype: Path | None
+    """
+    parsed = parse_git_ref(repo)
+    dest = shlex.quote(str(dest_path))
+    depth = (
+        f" --depth {parsed['depth']}" if parsed["depth"] is not None else ""
+    )
+
+    git_clone_cmd = (
+        f"git clone --quiet --filter=blob:none --no-checkout{depth}"
+    )
+    if parsed["branch"]:
+        git_clone_cmd += f" --branch {shlex.quote(parsed['branch'])}"
+    result = run_git_command(
+        f"{git_clone_cmd} {shlex.quote(parsed['url'])} {dest}"
+    )
+    if result.returncode != 0:
+        print(f"Git clone failed for {parsed['url']}")
+        return None
+
+    if parsed["commit"] and not has_commit(dest_path, parsed["commit"]):
+        run_git_command(
+            f"git -C {dest} fetch --quiet --filter=blob:none{depth} origin "
+            f"{shlex.quote(parsed['commit'])}"
+        )
+
+    sparse_path = "/" + parsed["path"].strip("/")
+    revision = parsed["commit"] or parsed["branch"] or "HEAD"
+    for git_cmd in (
+        f"sparse-checkout set --no-cone {shlex.quote(sparse_path)}",
+        f"checkout --quiet {shlex.quote(revision)}",
+    ):
+        result = run_git_command(f"git -C {dest} {git_cmd}")
+        if result.returncode != 0:
+            print(
+                f"Git checkout of {parsed['path']} failed for {parsed['url']}"
+            )
+            return None
 
     return dest_path
 
@@ -343,25 +926,42 @@ def clone_git_files(
         # Error: Cannot clone dir as file
         return None
 
-    with TemporaryDirectory() as tmp_dir:
-        repo_path = clone_git_repo(
-            repo,
-            dest_path=Path(tmp_dir),
-            overwrite=True,
-        )
-        if repo_path is None:
-            return None
+    # NOTE: The checkout is made next to the destination, so the path can be
+    #       moved (renamed) instead of copied
+    tmp_parent = dest_path.parent if dest_path.parent.is_dir() else None
+    with TemporaryDirectory(dir=tmp_parent, prefix=".gurk_clone_") as tmp_dir:
+        # NOTE: A cached mirror is checked out locally (and is kept up to
+        #       date), else only the path is fetched
+        repo_path = Path(tmp_dir) / "repo"
+        n_bytes = None
+        if get_mirror_key(parsed["url"]) in read_git_cache_index():
+            try:
+                mirror = get_cached_repo(repo)
+                if mirror is None:
+                    print(f"Git clone failed for {parsed['url']}")
+                    return None
+                n_bytes = checkout_cached_repo(mirror, repo, repo_path)
+                if n_bytes is None:
+                    print(f"Git clone failed for {parsed['url']}")
+                    return None
+            except OSError as e:
+                print(f"Git cache not usable ({e}), cloning without it")
+                shutil.rmtree(repo_path, ignore_errors=True)
+        if n_bytes is None:
+            if sparse_clone_git_repo(repo, repo_path) is None:
+                return None
+            n_bytes = get_tree_size(repo_path)
 
         src_path = repo_path / parsed["path"]
         if not src_path.exists():
-            shutil.rmtree(tmp_dir)
             raise FileNotFoundError(
                 f"Path {parsed['path']} not found in repo."
             )
 
-        if src_path.is_dir():
-            shutil.copytree(src_path, dest_path)
-        else:
-            shutil.copy2(src_path, dest_path)
+        n_bytes += move_path(src_path, dest_path)
 
+    print(
+        f"Cloned {parsed['path']} of {parsed['url']} "
+        f"({format_bytes(n_bytes)} written)"
+    )
     return dest_path
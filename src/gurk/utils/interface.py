@@ -1,21 +1,102 @@
+import hashlib
+import os
+import shlex
 import subprocess
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from textwrap import dedent
+from threading import Lock
 
 from rich.prompt import Confirm
 
 from gurk.utils.common import (
+    PACKAGE_CACHE_PATH,
     PACKAGE_SRC_PATH,
     PIPX_PYTHON_PATH,
     CommandKind,
     FilePath,
 )
-from gurk.utils.scripts import Command
+from gurk.utils.scripts import Command, ScriptBlockTypes, get_block_spans
+from gurk.utils.system_info import SystemInfo
 
 PACKAGE_BASH_HELPERS_PATH = (
     PACKAGE_SRC_PATH / "scripts" / "bash" / "helpers" / "helpers.bash"
 )
+BASH_HELPERS_BUNDLE_PATH = (
+    PACKAGE_CACHE_PATH
+    / "bash"
+    / f"helpers_{hashlib.sha1(str(PACKAGE_SRC_PATH).encode()).hexdigest()[:12]}.bash"
+)
+
+
+def _iter_bash_helper_sources() -> list[Path]:
+    """
+    List the bash files sourced by 'helpers.bash', in the same order.
+
+    :return: Paths to the helper and check scripts
+    :rtype: list[Path]
+    """
+    bash_scripts_path = PACKAGE_SRC_PATH / "scripts" / "bash"
+    helpers = sorted(
+        path
+        for path in PACKAGE_BASH_HELPERS_PATH.parent.glob("*.bash")
+        if path != PACKAGE_BASH_HELPERS_PATH
+    )
+    checks = sorted(bash_scripts_path.glob("*/checks.bash"))
+    return [*helpers, *checks]
+
+
+def get_bash_helpers_bundle() -> Path:
+    """
+    Get a single, flattened file equivalent to sourcing 'helpers.bash', with the
+    package paths already resolved (no python call). The bundle is (re)generated
+    on first use and whenever any of its sources is newer than the bundle.
+
+    :return: Path to the bundle, or to 'helpers.bash' if it cannot be written
+    :rtype: Path
+    """
+    sources = [PACKAGE_BASH_HELPERS_PATH, *_iter_bash_helper_sources()]
+    try:
+        bundle_mtime = BASH_HELPERS_BUNDLE_PATH.stat().st_mtime
+        if all(path.stat().st_mtime <= bundle_mtime for path in sources):
+            return BASH_HELPERS_BUNDLE_PATH
+    except FileNotFoundError:
+        pass
+
+    # Header with resolved package paths
+    parts = [
+        dedent(
+            f"""\
+            # Generated by gurk from {PACKAGE_BASH_HELPERS_PATH} - do not edit
+            PACKAGE_SRC_PATH={shlex.quote(str(PACKAGE_SRC_PATH))}
+            PACKAGE_CONFIG_PATH="${{PACKAGE_SRC_PATH}}/config"
+            PACKAGE_HELP_PATH="${{PACKAGE_SRC_PATH}}/scripts/bash/helpers"
+        """
+        )
+    ]
+
+    # Functions defined in 'helpers.bash' itself (without its sourcing logic)
+    helpers_lines = PACKAGE_BASH_HELPERS_PATH.read_text().splitlines()
+    for block in get_block_spans(PACKAGE_BASH_HELPERS_PATH):
+        if block["type"] == ScriptBlockTypes.FUNCTION:
+            start, end = block["lines"]
+            parts.append("\n".join(helpers_lines[start - 1 : end]) + "\n")
+
+    # Helper and check scripts
+    for path in _iter_bash_helper_sources():
+        parts.append(f"# --- {path} ---\n{path.read_text()}")
+
+    # Write atomically, as tasks may request the bundle concurrently
+    try:
+        BASH_HELPERS_BUNDLE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = BASH_HELPERS_BUNDLE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text("\n".join(parts))
+        os.replace(tmp_path, BASH_HELPERS_BUNDLE_PATH)
+    except OSError:
+        # E.g. cache directory owned by another user - use unbundled helpers
+        return PACKAGE_BASH_HELPERS_PATH
+
+    return BASH_HELPERS_BUNDLE_PATH
 
 
 def run_script_function(
@@ -85,19 +166,21 @@ def _run_bash_script_function(
     :rtype: str | CompletedProcess
     """
     # Source pipx venv and helpers
+    helpers_path = get_bash_helpers_bundle()
     sourcing = dedent(
         f"""\
         source {PIPX_PYTHON_PATH.parent / 'activate'}
-        source {PACKAGE_BASH_HELPERS_PATH}
+        source {helpers_path}
     """
     )
 
     # Build script body
     if function:
-        # Simply source and call function
+        # Simply source (unless already sourced as helpers) and call function
+        if Path(script) not in (helpers_path, PACKAGE_BASH_HELPERS_PATH):
+            sourcing += f"source {script}\n"
         body = sourcing + dedent(
             f"""\
-            source {script}
             {function} {' '.join(repr(arg) for arg in args)}
         """
         )
@@ -205,55 +288,191 @@ def _run_python_script_function(
     return wrapper_src
 
 
-def bash_check(check_name: str) -> subprocess.CompletedProcess[str]:
+# Results of already run checks (see 'bash_checks'), shared by the whole process
+_BASH_CHECK_CACHE: dict[str, subprocess.CompletedProcess[str]] = {}
+_BASH_CHECK_CACHE_LOCK = Lock()
+
+# Runs the given check functions one after another in the same shell. Their
+# outputs (and exit codes) are separated by NUL bytes
+_BASH_CHECKS_FUNCTION = dedent(
+    """\
+    #!/usr/bin/env bash
+    _gurk_run_checks() {
+    \tset +eu
+    \tlocal check
+    \tfor check in "$@"; do
+    \t\t"$check"
+    \t\tprintf '\\0%s\\0' "$?"
+    \t\tprintf '\\0' >&2
+    \tdone
+    }
+"""
+)
+
+
+def bash_checks(
+    check_names: list[str],
+    cache: bool = False,
+    timeout: float | None = None,
+    isolated: bool = False,
+) -> dict[str, subprocess.CompletedProcess[str]]:
     """
-    Run a (helper) check function
+    Run multiple (helper) check functions in a single bash process. Thus, the
+    helpers are only sourced once, and checks that need an interactive shell
+    (see '_load_interactive_env') only source ~/.bashrc once.
 
-    :param check_name: Name of the check function to run
-    :type check_name: str
-    :return: CompletedProcess result of the check
-    :rtype: CompletedProcess
+    :param check_names: Names of the check functions to run
+    :type check_names: list[str]
+    :param cache: Whether to reuse (and store) results of previous checks in
+                  this process. Only for checks whose result can not change
+                  meanwhile (e.g. not after installations).
+    :type cache: bool
+    :param timeout: Timeout in seconds for all checks together
+    :type timeout: float | None
+    :param isolated: Whether to run without a controlling terminal (and stdin),
+                     so that no check can prompt (e.g. for a sudo password)
+    :type isolated: bool
+    :return: CompletedProcess results of the checks, by check name
+    :rtype: dict[str, CompletedProcess]
     """
-    # Create a mock bash file (used only as a placeholder)
+    results = {}
+    if cache:
+        with _BASH_CHECK_CACHE_LOCK:
+            results = {
+                name: _BASH_CHECK_CACHE[name]
+                for name in check_names
+                if name in _BASH_CHECK_CACHE
+            }
+    missing = list(dict.fromkeys(n for n in check_names if n not in results))
+    if not missing:
+        return results
+
+    # Create a bash file with the batch runner function
     with NamedTemporaryFile(
         mode="w", suffix=".bash", delete=False
     ) as tmp_file:
-        tmp_file.write("#!/usr/bin/env bash\n")
+        tmp_file.write(_BASH_CHECKS_FUNCTION)
         tmp_file_path = Path(tmp_file.name)
 
     try:
-        # Try running the helper function
-        return run_script_function(
+        wrapper_src = run_script_function(
             script=tmp_file_path,
-            function=check_name,
-            run=True,
-            capture_output=True,
+            function="_gurk_run_checks",
+            args=missing,
+            run=False,
             check=False,
         )
-    except Exception as e:
-        # Return a failed CompletedProcess instead of None
-        return subprocess.CompletedProcess(
-            args=[str(tmp_file_path), check_name],
-            returncode=1,
-            stdout=b"",
-            stderr=str(e).encode(),
+        process = subprocess.run(
+            [CommandKind.BASH.exe, "-c", wrapper_src],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            stdin=subprocess.DEVNULL if isolated else None,
+            start_new_session=isolated,
         )
+        stdout, stderr = process.stdout, process.stderr
+        failure = f"Bash exited early with exit code {process.returncode}"
+    except Exception as e:
+        stdout, stderr, failure = "", "", str(e)
     finally:
         # Always clean up
         tmp_file_path.unlink(missing_ok=True)
 
+    # Split outputs: stdout is "<out>\0<rc>\0" and stderr "<err>\0" per check
+    stdout_parts = stdout.split("\0")
+    stderr_parts = stderr.split("\0")
+    for idx, name in enumerate(missing):
+        if 2 * idx + 1 < len(stdout_parts) - 1:
+            result = subprocess.CompletedProcess(
+                args=[name],
+                returncode=int(stdout_parts[2 * idx + 1]),
+                stdout=stdout_parts[2 * idx],
+                stderr=stderr_parts[idx] if idx < len(stderr_parts) else "",
+            )
+        else:
+            # Return a failed CompletedProcess for checks that did not finish
+            result = subprocess.CompletedProcess(
+                args=[name], returncode=1, stdout="", stderr=failure
+            )
+        results[name] = result
+
+    if cache:
+        with _BASH_CHECK_CACHE_LOCK:
+            _BASH_CHECK_CACHE.update({name: results[name] for name in missing})
 
-def revert_sudo_permissions(path: FilePath) -> None:
+    return results
+
+
+def bash_check(
+    check_name: str, cache: bool = False
+) -> subprocess.CompletedProcess[str]:
     """
-    Revert sudo permissions on the specified path using bash helper.
+    Run a (helper) check function. See 'bash_checks' for details.
 
-    :param path: Path to revert permissions on
-    :type path: FilePath
+    :param check_name: Name of the check function to run
+    :type check_name: str
+    :param cache: Whether to reuse (and store) the result of a previous check
+    :type cache: bool
+    :return: CompletedProcess result of the check
+    :rtype: CompletedProcess
     """
+    return bash_checks([check_name], cache)[check_name]
+
+
+def render_bash_config_args(
+    system_info: SystemInfo,
+    config_file: FilePath | None = None,
+    force: bool = False,
+) -> str:
+    """
+    Render the config args of a task into a sourceable bash file content. This
+    is what the bash 'get_config_args' helper sources for '--config-args-file',
+    which avoids parsing the '--system-info' JSON (and its subprocesses) in bash.
+
+    :param system_info: System information to render into 'SYSTEM_INFO'
+    :type system_info: SystemInfo
+    :param config_file: Path to the task config file to render into 'CONFIG_FILE'
+    :type config_file: FilePath | None
+    :param force: Value to render into 'FORCE'
+    :type force: bool
+    :return: The bash file content
+    :rtype: str
+    """
+
+    def bash_value(value: object) -> str:
+        # Booleans are rendered as in JSON, matching the '--system-info' parsing
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        return shlex.quote(str(value))
+
+    entries = " ".join(
+        f"[{bash_value(key)}]={bash_value(value)}"
+        for key, value in system_info.items()
+    )
+    return dedent(
+        f"""\
+        declare -gA SYSTEM_INFO=({entries})
+        declare -g CONFIG_FILE={bash_value(config_file or '')}
+        declare -g FORCE={bash_value(force)}
+    """
+    )
+
+
+def revert_sudo_permissions(*paths: FilePath) -> None:
+    """
+    Revert sudo permissions on the specified paths using bash helper (a single
+    call for all paths).
+
+    :param paths: Paths to revert permissions on
+    :type paths: FilePath
+    """
+    if not paths:
+        return
+
     run_script_function(
-        script=PACKAGE_BASH_HELPERS_PATH,
+        script=get_bash_helpers_bundle(),
         function="revert_sudo_permissions",
-        args=[str(path)],
+        args=[str(path) for path in paths],
         run=True,
         check=False,
     )
@@ -0,0 +1,931 @@
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, TypedDict
+
+from gurk.utils.common import PACKAGE_LOGS_PATH
+from gurk.utils.files import file_lock, get_tree_size
+from gurk.utils.logger import RunInfo
+
+# Index of all run logs (see 'update_log_index'), next to the run directories
+LOG_INDEX_FILE = "index.sqlite"
+LOG_INDEX_VERSION = 2
+RUN_INFO_FILE = "run.json"
+RUN_ID_FORMAT = "%Y%m%d_%H%M%S"
+_RUN_ID_RE = re.compile(r"^\d{8}_\d{6}$")
+
+# Runs without a 'run.json' (older versions) count as complete once their
+# logs haven't changed for this long
+RUN_STALE_AFTER = 24 * 3600  # 1 day
+
+# Archive of older runs (see 'enforce_log_retention'), in the SQLite archive
+# format (i.e. it can be extracted via 'sqlite3 archive.sqlar -Ax')
+LOG_ARCHIVE_FILE = "archive.sqlar"
+LOG_RETENTION_LOCK = "retention.lock"
+
+# Retention of the run logs: runs among the last LOG_KEEP_RUNS or younger than
+# LOG_KEEP_DAYS are kept as they are, older runs are archived (and can still be
+# listed and searched), and the oldest runs are deleted while all logs take up
+# more than LOG_MAX_SIZE
+LOG_KEEP_RUNS = 10
+LOG_KEEP_DAYS = 14
+LOG_MAX_SIZE = 1024**3  # 1 GiB
+
+# Fraction of the size budget to delete down to, so that runs are deleted in
+# batches (freeing their space in the index takes a rewrite of its segments)
+LOG_PRUNE_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id   TEXT PRIMARY KEY,
+    started  REAL,
+    finished REAL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id   TEXT NOT NULL,
+    task     TEXT NOT NULL,
+    status   TEXT,
+    started  REAL,
+    finished REAL,
+    logfile  TEXT,
+    size     INTEGER NOT NULL DEFAULT 0,
+    n_lines  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, task)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_task ON tasks (task);
+"""
+
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sqlar (
+    name  TEXT PRIMARY KEY,
+    mode  INT,
+    mtime INT,
+    sz    INT,
+    data  BLOB
+)
+"""
+
+
+class LogRun(TypedDict):
+    """TypedDict representing an indexed run."""
+
+    # fmt: off
+    run_id:   str
+    started:  float | None
+    finished: float | None
+    archived: bool
+    n_tasks:  int
+    n_failed: int
+    # fmt: on
+
+
+class LogTask(TypedDict):
+    """TypedDict representing an indexed task of a run."""
+
+    # fmt: off
+    run_id:   str
+    task:     str
+    status:   str | None
+    started:  float | None
+    finished: float | None
+    logfile:  str | None
+    n_lines:  int
+    # fmt: on
+
+
+class LogMatch(TypedDict):
+    """TypedDict representing a line matching a search."""
+
+    # fmt: off
+    run_id:  str
+    task:    str
+    lineno:  int
+    content: str
+    # fmt: on
+
+
+def get_run_started(run_id: str) -> float | None:
+    """
+    Get the start time of a run from its ID (the name of its log directory).
+
+    :param run_id: ID of the run
+    :type run_id: str
+    :return: Start time as a timestamp, or None if the ID is invalid
+    :rtype: float | None
+    """
+    try:
+        return datetime.strptime(run_id, RUN_ID_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def read_run_info(run_path: Path) -> RunInfo | None:
+    """
+    Read the information a run saved about its tasks.
+
+    :param run_path: Path to the log directory of the run
+    :type run_path: Path
+    :return: Information about the run, or None if not available
+    :rtype: RunInfo | None
+    """
+    try:
+        return json.loads((run_path / RUN_INFO_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_run_info(run_path: Path, run_info: RunInfo) -> None:
+    """
+    Atomically write the information about a run (see 'read_run_info').
+
+    :param run_path: Path to the log directory of the run
+    :type run_path: Path
+    :param run_info: Information about the run
+    :type run_info: RunInfo
+    """
+    info_path = run_path / RUN_INFO_FILE
+    tmp_path = info_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(run_info, indent=2))
+    tmp_path.replace(info_path)
+
+
+def _has_fts5(conn: sqlite3.Connection) -> bool:
+    """
+    Check if the lines table of an index is a full-text (FTS5) table, which
+    depends on the SQLite library Python was built with.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :return: True if full-text queries are supported
+    :rtype: bool
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'lines'"
+    ).fetchone()
+    return row is not None and "fts5" in row[0].lower()
+
+
+def _create_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Create the tables of an index, rebuilding it if its version changed.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :return: True if the index was (re)created, i.e. is empty
+    :rtype: bool
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != LOG_INDEX_VERSION:
+        for table in ("runs", "tasks", "lines"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+    # NOTE: Not 'executescript', which would commit the transaction
+    for statement in _SCHEMA.split(";"):
+        conn.execute(statement)
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS lines USING "
+            "fts5(content, run_id UNINDEXED, task UNINDEXED, lineno UNINDEXED)"
+        )
+    except sqlite3.OperationalError:
+        # No FTS5 support: searched with LIKE instead
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS lines "
+            "(content TEXT, run_id TEXT, task TEXT, lineno INTEGER)"
+        )
+    conn.execute(f"PRAGMA user_version = {LOG_INDEX_VERSION}")
+    return version != LOG_INDEX_VERSION
+
+
+@contextmanager
+def open_log_index(
+    logs_path: Path | None = None, update: bool = True
+) -> Iterator[sqlite3.Connection]:
+    """
+    Open the index of the run logs, bringing it up to date first (see
+    'update_log_index'). A (re)created index also indexes the archived runs.
+
+    :param logs_path: Path to the logs directory (default: ~/.gurk/logs)
+    :type logs_path: Path | None
+    :param update: Whether to index new runs/lines first
+    :type update: bool
+    :return: Connection to the index
+    :rtype: Iterator[sqlite3.Connection]
+    """
+    logs_path = logs_path or PACKAGE_LOGS_PATH
+    logs_path.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        logs_path / LOG_INDEX_FILE, timeout=30, isolation_level=None
+    )
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        created = _create_schema(conn)
+        conn.execute("COMMIT")
+        if created:
+            # NOTE: Only takes effect with a VACUUM, which is cheap while the
+            #       index is empty
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            _index_archive(conn, logs_path)
+        if update:
+            update_log_index(conn, logs_path)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _insert_lines(
+    conn: sqlite3.Connection, run_id: str, task: str, data: bytes, n_lines: int
+) -> int:
+    """
+    Insert (complete) lines of a task's log into the index.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :param task: Name of the task
+    :type task: str
+    :param data: Lines to insert
+    :type data: bytes
+    :param n_lines: Number of lines of the log indexed before
+    :type n_lines: int
+    :return: Number of lines inserted
+    :rtype: int
+    """
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    conn.executemany(
+        "INSERT INTO lines (content, run_id, task, lineno) "
+        "VALUES (?, ?, ?, ?)",
+        (
+            (line, run_id, task, n_lines + i)
+            for i, line in enumerate(lines, start=1)
+        ),
+    )
+    return len(lines)
+
+
+def _index_log_file(
+    conn: sqlite3.Connection,
+    run_id: str,
+    log_path: Path,
+    log_size: int,
+    complete: bool,
+) -> int:
+    """
+    Index the lines appended to a task's log since it was last indexed. While
+    the run is going, a last line without a newline is left for later.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :param log_path: Path to the log file
+    :type log_path: Path
+    :param log_size: Current size of the log file
+    :type log_size: int
+    :param complete: Whether the run is complete
+    :type complete: bool
+    :return: Number of lines indexed
+    :rtype: int
+    """
+    task = log_path.stem
+    conn.execute(
+        "INSERT OR IGNORE INTO tasks (run_id, task) VALUES (?, ?)",
+        (run_id, task),
+    )
+    size, n_lines = conn.execute(
+        "SELECT size, n_lines FROM tasks WHERE run_id = ? AND task = ?",
+        (run_id, task),
+    ).fetchone()
+    if log_size < size:
+        # Rewritten log: index it again
+        conn.execute(
+            "DELETE FROM lines WHERE run_id = ? AND task = ?", (run_id, task)
+        )
+        size, n_lines = 0, 0
+    if log_size == size:
+        return 0
+
+    with open(log_path, "rb") as log_file:
+        log_file.seek(size)
+        data = log_file.read(log_size - size)
+    if not complete:
+        data = data[: data.rfind(b"\n") + 1]
+    n_new_lines = _insert_lines(conn, run_id, task, data, n_lines)
+    conn.execute(
+        "UPDATE tasks SET logfile = ?, size = ?, n_lines = ? "
+        "WHERE run_id = ? AND task = ?",
+        (
+            str(log_path),
+            size + len(data),
+            n_lines + n_new_lines,
+            run_id,
+            task,
+        ),
+    )
+    return n_new_lines
+
+
+def _record_run(
+    conn: sqlite3.Connection,
+    run_id: str,
+    run_info: RunInfo | None,
+    last_modified: float | None,
+    complete: bool,
+    archived: bool = False,
+) -> None:
+    """
+    Record a run and the statuses of its tasks in the index.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :param run_info: Information the run saved (None for legacy runs)
+    :type run_info: RunInfo | None
+    :param last_modified: Last modification of its logs (legacy runs' end)
+    :type last_modified: float | None
+    :param complete: Whether the run is complete
+    :type complete: bool
+    :param archived: Whether the run is archived
+    :type archived: bool
+    """
+    for task, record in (run_info or {}).get("tasks", {}).items():
+        conn.execute(
+            "INSERT INTO tasks (run_id, task, status, started, "
+            "finished) VALUES (?, ?, ?, ?, ?) ON CONFLICT "
+            "(run_id, task) DO UPDATE SET status = excluded.status, "
+            "started = excluded.started, "
+            "finished = excluded.finished",
+            (
+                run_id,
+                task,
+                record["status"],
+                record["started"],
+                record["finished"],
+            ),
+        )
+
+    conn.execute(
+        "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)",
+        (
+            run_id,
+            run_info["started"] if run_info else get_run_started(run_id),
+            run_info["finished"] if run_info else last_modified,
+            int(complete),
+            int(archived),
+        ),
+    )
+
+
+def update_log_index(
+    conn: sqlite3.Connection, logs_path: Path | None = None
+) -> int:
+    """
+    Bring the index up to date with the run logs: new runs are added, and of
+    runs that are still going (or were interrupted recently), the task
+    statuses and appended lines. Complete runs are never read again, so an
+    update only lists the logs directory.
+
+    :param conn: Connection to the index (see 'open_log_index')
+    :type conn: sqlite3.Connection
+    :param logs_path: Path to the logs directory (default: ~/.gurk/logs)
+    :type logs_path: Path | None
+    :return: Number of lines indexed
+    :rtype: int
+    """
+    logs_path = logs_path or PACKAGE_LOGS_PATH
+    complete_runs = {
+        row[0]
+        for row in conn.execute("SELECT run_id FROM runs WHERE complete = 1")
+    }
+    with os.scandir(logs_path) as entries:
+        run_paths = sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.is_dir()
+            and _RUN_ID_RE.match(entry.name)
+            and entry.name not in complete_runs
+        )
+    if not run_paths:
+        return 0
+
+    n_lines = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for run_path in run_paths:
+            run_id = run_path.name
+            run_info = read_run_info(run_path)
+            finished = run_info["finished"] if run_info else None
+
+            # Logs (of legacy runs, complete once no longer written to)
+            log_stats = [
+                (Path(entry.path), entry.stat())
+                for entry in os.scandir(run_path)
+                if entry.name.endswith(".log") and entry.is_file()
+            ]
+            last_modified = max(
+                (log_stat.st_mtime for _, log_stat in log_stats),
+                default=None,
+            )
+            complete = finished is not None or (
+                run_info is None
+                and time.time() - (last_modified or 0) > RUN_STALE_AFTER
+            )
+            for log_path, log_stat in log_stats:
+                n_lines += _index_log_file(
+                    conn, run_id, log_path, log_stat.st_size, complete
+                )
+                if run_info is None:
+                    conn.execute(
+                        "UPDATE tasks SET finished = ? "
+                        "WHERE run_id = ? AND task = ?",
+                        (log_stat.st_mtime, run_id, log_path.stem),
+                    )
+
+            _record_run(conn, run_id, run_info, last_modified, complete)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return n_lines
+
+
+def resolve_run_id(conn: sqlite3.Connection, run: str) -> str | None:
+    """
+    Resolve a run given by the user: "latest", a full ID or an ID prefix (the
+    latest matching run, e.g. '20250101' for the last run of that day).
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param run: Run as given by the user
+    :type run: str
+    :return: ID of the run, or None if no run matches
+    :rtype: str | None
+    """
+    prefix = "" if run == "latest" else run
+    row = conn.execute(
+        "SELECT run_id FROM runs WHERE run_id >= ? AND run_id < ? "
+        "ORDER BY run_id DESC LIMIT 1",
+        (prefix, prefix + "\uffff"),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def list_runs(conn: sqlite3.Connection, limit: int = 20) -> list[LogRun]:
+    """
+    List the latest runs, with their number of (failed) tasks.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param limit: Maximum number of runs
+    :type limit: int
+    :return: Runs, latest first
+    :rtype: list[LogRun]
+    """
+    rows = conn.execute(
+        "SELECT r.run_id, r.started, r.finished, r.archived, "
+        "COUNT(t.task) AS n_tasks, "
+        "COALESCE(SUM(t.status = 'Failure'), 0) AS n_failed "
+        "FROM (SELECT * FROM runs ORDER BY run_id DESC LIMIT ?) AS r "
+        "LEFT JOIN tasks AS t USING (run_id) "
+        "GROUP BY r.run_id ORDER BY r.run_id DESC",
+        (limit,),
+    )
+    return [{**dict(row), "archived": bool(row["archived"])} for row in rows]
+
+
+def get_run_tasks(conn: sqlite3.Connection, run_id: str) -> list[LogTask]:
+    """
+    Get the tasks of a run, with their status and duration.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :return: Tasks of the run, in order of their start
+    :rtype: list[LogTask]
+    """
+    rows = conn.execute(
+        "SELECT run_id, task, status, started, finished, logfile, n_lines "
+        "FROM tasks WHERE run_id = ? ORDER BY started, task",
+        (run_id,),
+    )
+    return [dict(row) for row in rows]
+
+
+def search_logs(
+    conn: sqlite3.Connection,
+    query: str,
+    run_id: str | None = None,
+    task: str | None = None,
+    limit: int = 50,
+) -> list[LogMatch]:
+    """
+    Search the lines of all (or one run's/task's) logs. With FTS5, the query
+    may use its syntax (e.g. 'error NOT docker', '"exact phrase"',
+    'pip*'); queries that aren't valid FTS5 are searched as a phrase.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param query: Search query
+    :type query: str
+    :param run_id: ID of the run to search in (default: all)
+    :type run_id: str | None
+    :param task: Task to search in (default: all)
+    :type task: str | None
+    :param limit: Maximum number of matches
+    :type limit: int
+    :return: Matching lines, latest indexed first
+    :rtype: list[LogMatch]
+    """
+    filters, params = "", []
+    if run_id is not None:
+        filters += " AND run_id = ?"
+        params.append(run_id)
+    if task is not None:
+        filters += " AND task = ?"
+        params.append(task)
+
+    def run_query(match: str, value: str) -> list[LogMatch]:
+        rows = conn.execute(
+            "SELECT run_id, task, lineno, content FROM lines "
+            f"WHERE {match}{filters} ORDER BY rowid DESC LIMIT ?",
+            (value, *params, limit),
+        )
+        return [dict(row) for row in rows]
+
+    if not _has_fts5(conn):
+        return run_query("content LIKE ?", f"%{query}%")
+    try:
+        return run_query("lines MATCH ?", query)
+    except sqlite3.OperationalError:
+        phrase = '"' + query.replace('"', '""') + '"'
+        return run_query("lines MATCH ?", phrase)
+
+
+@contextmanager
+def open_log_archive(
+    logs_path: Path | None = None,
+) -> Iterator[sqlite3.Connection]:
+    """
+    Open the archive of older runs (see 'enforce_log_retention'), a SQLite
+    archive with one (zlib-compressed) member per file of a run, named
+    '<run id>/<path>'.
+
+    :param logs_path: Path to the logs directory (default: ~/.gurk/logs)
+    :type logs_path: Path | None
+    :return: Connection to the archive
+    :rtype: Iterator[sqlite3.Connection]
+    """
+    logs_path = logs_path or PACKAGE_LOGS_PATH
+    conn = sqlite3.connect(
+        logs_path / LOG_ARCHIVE_FILE, timeout=30, isolation_level=None
+    )
+    try:
+        # NOTE: Only takes effect on creation, so deleted runs free space
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute(_ARCHIVE_SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _decompress(size: int, data: bytes) -> bytes:
+    """
+    Decompress the data of an archive member (stored uncompressed if that
+    wasn't any smaller).
+
+    :param size: Original size of the member
+    :type size: int
+    :param data: Stored data of the member
+    :type data: bytes
+    :return: Original data of the member
+    :rtype: bytes
+    """
+    return data if len(data) == size else zlib.decompress(data)
+
+
+def read_archived_file(
+    archive: sqlite3.Connection, run_id: str, name: str
+) -> bytes | None:
+    """
+    Read a file of an archived run.
+
+    :param archive: Connection to the archive (see 'open_log_archive')
+    :type archive: sqlite3.Connection
+    :param run_id: ID of the run
+    :type run_id: str
+    :param name: Path of the file, relative to the run's log directory
+    :type name: str
+    :return: Content of the file, or None if not archived
+    :rtype: bytes | None
+    """
+    row = archive.execute(
+        "SELECT sz, data FROM sqlar WHERE name = ?", (f"{run_id}/{name}",)
+    ).fetchone()
+    return _decompress(*row) if row else None
+
+
+def _index_archive(conn: sqlite3.Connection, logs_path: Path) -> None:
+    """
+    Index the archived runs, whose log directories no longer exist (after the
+    index was rebuilt).
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param logs_path: Path to the logs directory
+    :type logs_path: Path
+    """
+    if not (logs_path / LOG_ARCHIVE_FILE).is_file():
+        return
+
+    run_infos: dict[str, RunInfo | None] = {}
+    last_modified: dict[str, float] = {}
+    with open_log_archive(logs_path) as archive:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, mtime, size, data in archive.execute(
+                "SELECT name, mtime, sz, data FROM sqlar ORDER BY name"
+            ):
+                run_id, _, member = name.partition("/")
+                run_infos.setdefault(run_id, None)
+                if member == RUN_INFO_FILE:
+                    run_infos[run_id] = json.loads(_decompress(size, data))
+                elif member.endswith(".log") and "/" not in member:
+                    task = member.removesuffix(".log")
+                    n_lines = _insert_lines(
+                        conn, run_id, task, _decompress(size, data), 0
+                    )
+                    conn.execute(
+                        "INSERT INTO tasks (run_id, task, finished, size, "
+                        "n_lines) VALUES (?, ?, ?, ?, ?)",
+                        (run_id, task, mtime, size, n_lines),
+                    )
+                    last_modified[run_id] = max(
+                        mtime, last_modified.get(run_id, mtime)
+                    )
+            for run_id, run_info in run_infos.items():
+                _record_run(
+                    conn,
+                    run_id,
+                    run_info,
+                    last_modified.get(run_id),
+                    complete=True,
+                    archived=True,
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _archive_run(
+    conn: sqlite3.Connection, archive: sqlite3.Connection, run_path: Path
+) -> None:
+    """
+    Move a (complete) run's log directory into the archive. The run stays in
+    the index, so it can still be listed and searched.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param archive: Connection to the archive
+    :type archive: sqlite3.Connection
+    :param run_path: Path to the log directory of the run
+    :type run_path: Path
+    """
+    run_id = run_path.name
+    members = []
+    for root, _, files in os.walk(run_path):
+        for name in sorted(files):
+            path = Path(root) / name
+            data = path.read_bytes()
+            compressed = zlib.compress(data)
+            file_stat = path.lstat()
+            members.append(
+                (
+                    f"{run_id}/{path.relative_to(run_path)}",
+                    file_stat.st_mode,
+                    int(file_stat.st_mtime),
+                    len(data),
+                    compressed if len(compressed) < len(data) else data,
+                )
+            )
+
+    # NOTE: Each step can be repeated if interrupted (members are replaced,
+    #       and the directories of archived runs removed on the next call)
+    archive.execute("BEGIN IMMEDIATE")
+    archive.executemany(
+        "INSERT OR REPLACE INTO sqlar VALUES (?, ?, ?, ?, ?)", members
+    )
+    archive.execute("COMMIT")
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("UPDATE runs SET archived = 1 WHERE run_id = ?", (run_id,))
+    conn.execute("UPDATE tasks SET logfile = NULL WHERE run_id = ?", (run_id,))
+    conn.execute("COMMIT")
+    shutil.rmtree(run_path)
+
+
+def _delete_runs(
+    conn: sqlite3.Connection,
+    archive: sqlite3.Connection,
+    logs_path: Path,
+    run_ids: list[str],
+) -> None:
+    """
+    Delete runs entirely: their log directories, archive members and lines
+    in the index, whose space is then freed.
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param archive: Connection to the archive
+    :type archive: sqlite3.Connection
+    :param logs_path: Path to the logs directory
+    :type logs_path: Path
+    :param run_ids: IDs of the runs to delete
+    :type run_ids: list[str]
+    """
+    # NOTE: Directories first, so no deleted run is indexed again
+    for run_id in run_ids:
+        shutil.rmtree(logs_path / run_id, ignore_errors=True)
+
+    archive.execute("BEGIN IMMEDIATE")
+    for run_id in run_ids:
+        archive.execute(
+            "DELETE FROM sqlar WHERE name >= ? AND name < ?",
+            (f"{run_id}/", f"{run_id}0"),  # '0' follows '/'
+        )
+    archive.execute("COMMIT")
+    # NOTE: Frees a page per step, which only 'executescript' runs to the end
+    archive.executescript("PRAGMA incremental_vacuum")
+
+    placeholders = ", ".join("?" * len(run_ids))
+    conn.execute("BEGIN IMMEDIATE")
+    for table in ("lines", "tasks", "runs"):
+        conn.execute(
+            f"DELETE FROM {table} WHERE run_id IN ({placeholders})", run_ids
+        )
+    conn.execute("COMMIT")
+    if _has_fts5(conn):
+        # Drop the deleted lines from the full-text index for good
+        conn.execute("INSERT INTO lines (lines) VALUES ('optimize')")
+    conn.executescript("PRAGMA incremental_vacuum")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def enforce_log_retention(
+    logs_path: Path | None = None,
+    keep_runs: int | None = None,
+    keep_days: float | None = None,
+    max_size: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """
+    Enforce the retention of the run logs:
+    - Runs among the last 'keep_runs' or younger than 'keep_days' are kept
+    - Older (complete) runs are compressed into the archive, while staying in
+      the index (so they can still be listed and searched)
+    - If all logs (directories, archive and index) take up more than
+      'max_size', the oldest runs are deleted (down to LOG_PRUNE_TO of it),
+      except the last 'keep_runs'
+    Runs that are still going are never touched. If another process is
+    already enforcing the retention, nothing is done.
+
+    :param logs_path: Path to the logs directory (default: ~/.gurk/logs)
+    :type logs_path: Path | None
+    :param keep_runs: Number of runs to keep (default: LOG_KEEP_RUNS)
+    :type keep_runs: int | None
+    :param keep_days: Days to keep runs for (default: LOG_KEEP_DAYS)
+    :type keep_days: float | None
+    :param max_size: Size budget in bytes (default: LOG_MAX_SIZE)
+    :type max_size: int | None
+    :return: IDs of the archived runs, and of the deleted runs
+    :rtype: tuple[list[str], list[str]]
+    """
+    logs_path = logs_path or PACKAGE_LOGS_PATH
+    keep_runs = LOG_KEEP_RUNS if keep_runs is None else keep_runs
+    keep_days = LOG_KEEP_DAYS if keep_days is None else keep_days
+    max_size = LOG_MAX_SIZE if max_size is None else max_size
+
+    archived, deleted = [], []
+    with file_lock(logs_path / LOG_RETENTION_LOCK, blocking=False) as locked:
+        if locked:
+            with open_log_index(logs_path) as conn, open_log_archive(
+                logs_path
+            ) as archive:
+                archived, deleted = _enforce_log_retention(
+                    conn, archive, logs_path, keep_runs, keep_days, max_size
+                )
+    return archived, deleted
+
+
+def _enforce_log_retention(
+    conn: sqlite3.Connection,
+    archive: sqlite3.Connection,
+    logs_path: Path,
+    keep_runs: int,
+    keep_days: float,
+    max_size: int,
+) -> tuple[list[str], list[str]]:
+    """
+    Enforce the retention of the run logs (see 'enforce_log_retention').
+
+    :param conn: Connection to the index
+    :type conn: sqlite3.Connection
+    :param archive: Connection to the archive
+    :type archive: sqlite3.Connection
+    :param logs_path: Path to the logs directory
+    :type logs_path: Path
+    :param keep_runs: Number of runs to keep
+    :type keep_runs: int
+    :param keep_days: Days to keep runs for
+    :type keep_days: float
+    :param max_size: Size budget in bytes
+    :type max_size: int
+    :return: IDs of the archived runs, and of the deleted runs
+    :rtype: tuple[list[str], list[str]]
+    """
+    runs = conn.execute(
+        "SELECT run_id, started, complete, archived FROM runs "
+        "ORDER BY run_id DESC"
+    ).fetchall()
+    kept = {run["run_id"] for run in runs[:keep_runs]}
+    keep_after = time.time() - keep_days * 24 * 3600
+
+    # Archive older runs
+    archived = []
+    for run in runs:
+        run_path = logs_path / run["run_id"]
+        if run["archived"]:
+            if run_path.is_dir():  # Interrupted archival
+                shutil.rmtree(run_path)
+        elif (
+            run["complete"]
+            and run["run_id"] not in kept
+            and (run["started"] or 0) < keep_after
+        ):
+            _archive_run(conn, archive, run_path)
+            archived.append(run["run_id"])
+
+    # Sizes of the runs, estimating each run's share of the index by the size
+    # of its logs
+    archive_sizes = dict(
+        archive.execute(
+            "SELECT substr(name, 1, instr(name, '/') - 1), "
+            "SUM(length(data)) FROM sqlar GROUP BY 1"
+        )
+    )
+    log_sizes = dict(
+        conn.execute("SELECT run_id, SUM(size) FROM tasks GROUP BY 1")
+    )
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    index_size = sum(
+        path.stat().st_size for path in logs_path.glob(f"{LOG_INDEX_FILE}*")
+    )
+    index_size_per_byte = index_size / (sum(log_sizes.values()) or 1)
+    run_sizes = {
+        run["run_id"]: (
+            archive_sizes[run["run_id"]]
+            if run["run_id"] in archive_sizes
+            else get_tree_size(logs_path / run["run_id"])
+        )
+        for run in runs
+    }
+    # Archived runs are counted via the archive file, which also holds their
+    # share of its overhead
+    total_size = (
+        (logs_path / LOG_ARCHIVE_FILE).stat().st_size
+        + index_size
+        + sum(
+            size
+            for run_id, size in run_sizes.items()
+            if run_id not in archive_sizes
+        )
+    )
+
+    # Delete the oldest runs while over the size budget
+    deleted = []
+    for run in reversed(runs[keep_runs:]):
+        if total_size <= max_size * (LOG_PRUNE_TO if deleted else 1):
+            break
+        run_id = run["run_id"]
+        if run["complete"]:
+            total_size -= run_sizes[run_id]
+            total_size -= index_size_per_byte * log_sizes.get(run_id, 0)
+            deleted.append(run_id)
+    if deleted:
+        _delete_runs(conn, archive, logs_path, deleted)
+
+    return archived, deleted
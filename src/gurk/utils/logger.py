@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import TypeAlias, TypedDict, TypeVar
+from typing import Literal, TypeAlias, TypedDict, TypeVar
 
 from rich.progress import TaskID
 
@@ -87,8 +87,68 @@ class TaskInfo(TypedDict):
     name:      str
     total:     int
     completed: int
+    steps:     int
     logfile:   Path | None
+    exit_code: int | None
     # fmt: on
 
 
 TaskInfos: TypeAlias = dict[TaskID, TaskInfo]
+
+
+class TaskRecord(TypedDict):
+    """
+    Record of a task in a run's 'run.json' (status is None while running).
+    """
+
+    # fmt: off
+    status:   str | None
+    started:  float
+    finished: float | None
+    # fmt: on
+
+
+class RunInfo(TypedDict):
+    """
+    Information about a run, saved as 'run.json' in its log directory.
+    """
+
+    # fmt: off
+    started:  float
+    finished: float | None
+    tasks:    dict[str, TaskRecord]
+    # fmt: on
+
+
+# Output modes of the logger: live rendering with rich (on terminals), or one
+# line per event, as text or JSON (e.g. for CI logs)
+LoggerOutput: TypeAlias = Literal["rich", "plain", "json"]
+LoggerEventType: TypeAlias = Literal[
+    "added", "started", "step", "finished", "log", "resources", "dropped"
+]
+
+
+class LoggerEvent(TypedDict, total=False):
+    """
+    Event of a run (a task state change, step or log message), rendered as
+    one line by the plain/json outputs. Published to the event bus (if any)
+    as well, along with the events only it receives: added tasks, resource
+    samples (see 'ResourceUsage') and the number of events dropped for a
+    slow consumer.
+    """
+
+    # fmt: off
+    time:        float
+    event:       LoggerEventType
+    task:        str
+    message:     str
+    status:      str
+    severity:    str
+    logfile:     str
+    cpu_percent: float | None
+    load:        float
+    mem_used:    int
+    mem_total:   int
+    running:     int
+    count:       int
+    # fmt: on
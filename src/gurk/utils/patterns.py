@@ -73,6 +73,7 @@ class ScriptPatterns(TypedDict):
     FOR:        re.Pattern
     WHILE:      re.Pattern
     UNTIL:      re.Pattern | None
+    APT:        re.Pattern
     # fmt: on
 
 
@@ -115,6 +116,7 @@ class PatternCollection(Enum):
         "FOR":        re.compile(r"^\s*for\s+(.*);\s*do\s*$"),
         "WHILE":      re.compile(r"^\s*while\s+(.*);\s*do\s*$"),
         "UNTIL":      re.compile(r"^\s*until\s+(.*);\s*do\s*$"),
+        "APT":        re.compile(r"^\s*apt_install\s+([^#;&|]*)"),
     }
     PYTHON: EnumValue[ScriptPatterns] = {
         "ENTRYPOINT": re.compile(r'if __name__\s*==\s*[\'"]__main__[\'"]\s*:'),
@@ -127,6 +129,7 @@ class PatternCollection(Enum):
         "FOR":        re.compile(r"^\s*for\s+(.*):\s*$"),
         "WHILE":      re.compile(r"^\s*while\s+(.*):\s*$"),
         "UNTIL":      None,  # Python has no "until"
+        "APT":        re.compile(r"install_packages_from_list\(\s*InstallCommands\.APT,\s*\[([^\]]*)\]"),
     }
     PATH: EnumValue[PathPatterns] = {
         "symlink":    re.compile(r"^symlink://(.*)$"),
@@ -0,0 +1,194 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import TypedDict
+from xml.sax.saxutils import quoteattr
+
+from gurk.utils.logger import RunInfo, TaskInfos, TaskTerminationType
+
+# Reports of a run, written into its log directory (e.g. for CI to track the
+# durations of tasks across runs)
+REPORT_FILE = "report.json"
+JUNIT_FILE = "junit.xml"
+
+
+class TaskReport(TypedDict):
+    """
+    Report of a task (status and times are None if it didn't finish).
+    """
+
+    # fmt: off
+    name:        str
+    status:      str | None
+    started:     float | None
+    finished:    float | None
+    duration:    float | None
+    steps:       int
+    total_steps: int
+    exit_code:   int | None
+    logfile:     str | None
+    # fmt: on
+
+
+class RunReport(TypedDict):
+    """
+    Report of a run, with the number of tasks per status ('None' for tasks
+    that didn't finish).
+    """
+
+    # fmt: off
+    started:  float
+    finished: float | None
+    duration: float | None
+    counts:   dict[str, int]
+    tasks:    list[TaskReport]
+    # fmt: on
+
+
+def _duration(started: float | None, finished: float | None) -> float | None:
+    """
+    Get the duration between two timestamps.
+
+    :param started: Start timestamp (or None if unknown)
+    :type started: float | None
+    :param finished: End timestamp (or None if unknown)
+    :type finished: float | None
+    :return: Duration in seconds, or None
+    :rtype: float | None
+    """
+    if started is None or finished is None:
+        return None
+    return round(finished - started, 3)
+
+
+def build_run_report(run_info: RunInfo, task_infos: TaskInfos) -> RunReport:
+    """
+    Build the report of a run from the logger's records, with the tasks in
+    the order they were started (or skipped).
+
+    :param run_info: Information about the run
+    :type run_info: RunInfo
+    :param task_infos: Progress information about the run's tasks
+    :type task_infos: TaskInfos
+    :return: Report of the run
+    :rtype: RunReport
+    """
+    tasks, counts = [], {}
+    for task_info in task_infos.values():
+        name = task_info["name"]
+        record = run_info["tasks"].get(name, {})
+        started, finished = record.get("started"), record.get("finished")
+        status = record.get("status")
+        counts[str(status)] = counts.get(str(status), 0) + 1
+        tasks.append(
+            TaskReport(
+                name=name,
+                status=status,
+                started=started,
+                finished=finished,
+                duration=_duration(started, finished),
+                steps=task_info["steps"],
+                total_steps=max(task_info["total"] - 1, 0),
+                exit_code=task_info["exit_code"],
+                logfile=(
+                    str(task_info["logfile"]) if task_info["logfile"] else None
+                ),
+            )
+        )
+
+    return RunReport(
+        started=run_info["started"],
+        finished=run_info["finished"],
+        duration=_duration(run_info["started"], run_info["finished"]),
+        counts=counts,
+        tasks=tasks,
+    )
+
+
+def render_junit_xml(report: RunReport, suite: str = "gurk") -> str:
+    """
+    Render the report of a run as JUnit XML: one test case per task, where
+    failed tasks are failures, skipped tasks are skipped, and unfinished
+    tasks are errors. The details of each task (e.g. a partial status) are
+    attached as properties.
+
+    :param report: Report of the run
+    :type report: RunReport
+    :param suite: Name of the test suite
+    :type suite: str
+    :return: JUnit XML document
+    :rtype: str
+    """
+    counts = report["counts"]
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<testsuites>",
+        f"  <testsuite name={quoteattr(suite)}"
+        f' tests="{len(report["tasks"])}"'
+        f' failures="{counts.get(TaskTerminationType.FAILURE.label, 0)}"'
+        f' skipped="{counts.get(TaskTerminationType.SKIPPED.label, 0)}"'
+        f' errors="{counts.get("None", 0)}"'
+        f' time="{report["duration"] or 0:.3f}"'
+        f' timestamp="{datetime.fromtimestamp(report["started"]).isoformat(timespec="seconds")}">',
+    ]
+    for task in report["tasks"]:
+        lines.append(
+            f"    <testcase name={quoteattr(task['name'])}"
+            f" classname={quoteattr(suite)}"
+            f' time="{task["duration"] or 0:.3f}">'
+        )
+        lines.append("      <properties>")
+        lines.append(
+            f'        <property name="status" value="{task["status"]}"/>'
+        )
+        lines.append(
+            f'        <property name="steps" value="{task["steps"]}"/>'
+        )
+        lines.append(
+            '        <property name="total_steps"'
+            f' value="{task["total_steps"]}"/>'
+        )
+        if task["exit_code"] is not None:
+            lines.append(
+                '        <property name="exit_code"'
+                f' value="{task["exit_code"]}"/>'
+            )
+        if task["logfile"] is not None:
+            lines.append(
+                '        <property name="logfile"'
+                f' value={quoteattr(task["logfile"])}/>'
+            )
+        lines.append("      </properties>")
+
+        if task["status"] == TaskTerminationType.FAILURE.label:
+            message = (
+                f"Exit code {task['exit_code']}"
+                if task["exit_code"]
+                else "Task failed"
+            )
+            lines.append(f"      <failure message={quoteattr(message)}/>")
+        elif task["status"] == TaskTerminationType.SKIPPED.label:
+            lines.append(
+                '      <skipped message="A dependency failed or was skipped"/>'
+            )
+        elif task["status"] is None:
+            lines.append('      <error message="Task did not finish"/>')
+        lines.append("    </testcase>")
+    lines += ["  </testsuite>", "</testsuites>", ""]
+    return "\n".join(lines)
+
+
+def write_run_report(run_path: Path, report: RunReport) -> None:
+    """
+    Write the report of a run as JSON and JUnit XML (see 'render_junit_xml')
+    into its log directory.
+
+    :param run_path: Path to the log directory of the run
+    :type run_path: Path
+    :param report: Report of the run
+    :type report: RunReport
+    """
+    # NOTE: Without indentation, which takes the much slower pure Python
+    #       encoder
+    (run_path / REPORT_FILE).write_text(json.dumps(report))
+    (run_path / JUNIT_FILE).write_text(render_junit_xml(report))
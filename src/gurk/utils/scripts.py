@@ -1,4 +1,5 @@
 import ast
+import re
 from copy import deepcopy
 from dataclasses import dataclass, field
 from enum import Enum, auto
@@ -214,6 +215,56 @@ class Command:
     def kind(self) -> CommandKind:
         return CommandKind.from_script(self.script)
 
+    @cached_property
+    def apt_packages(self) -> tuple[str]:
+        """
+        Apt packages that the command installs (with literal names), i.e. those
+        passed to 'apt_install' (bash) or to 'install_packages_from_list' with
+        'InstallCommands.APT' (python) in its function (or the whole script if
+        there is none) and the functions of the script it calls.
+
+        :return: Apt packages installed by the command
+        :rtype: tuple[str]
+        """
+        lines = Path(self.script).read_text(encoding="utf-8").splitlines()
+        functions = {
+            b["name"]: b["lines"]
+            for b in get_block_spans(self.script)
+            if b["type"] == ScriptBlockTypes.FUNCTION
+        }
+
+        # Collect the lines of the function and (recursively) called functions
+        if self.function is None:
+            spans = [(1, len(lines))]
+        else:
+            spans, pending = [], [self.function]
+            while pending:
+                start, end = functions[pending.pop()]
+                spans.append((start, end))
+                body = "\n".join(lines[start:end])
+                pending.extend(
+                    name
+                    for name in functions
+                    if functions[name] not in spans
+                    and name not in pending
+                    and re.search(rf"\b{name}\b", body)
+                )
+
+        apt_re = PatternCollection[self.kind.name].patterns["APT"]
+        packages = []
+        for start, end in sorted(spans):
+            for match in map(apt_re.search, lines[start - 1 : end]):
+                if match is None:
+                    continue
+                if self.kind == CommandKind.PYTHON:
+                    words = re.findall(r"[\"']([^\"']+)[\"']", match[1])
+                else:
+                    words = match[1].split()
+                packages.extend(
+                    word for word in words if re.fullmatch(r"[\w.+:=-]+", word)
+                )
+        return tuple(dict.fromkeys(packages))
+
     def __str__(self) -> str:
         func_suffix = f"@{self.function}" if self.function else ""
         return f"{Path(self.script).stem}{func_suffix}"
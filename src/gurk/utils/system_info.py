@@ -21,6 +21,17 @@ class SystemInfo(TypedDict):
     # fmt: on
 
 
+class ResourceUsage(TypedDict):
+    """System-wide resource usage (see 'get_resource_usage')."""
+
+    # fmt: off
+    cpu_percent: float | None
+    load:        float
+    mem_used:    int
+    mem_total:   int
+    # fmt: on
+
+
 def get_architecture() -> str:
     """
     Retrieve the system architecture using dpkg.
@@ -93,3 +104,56 @@ def get_system_info() -> SystemInfo:
     system_info["manufacturer"] = get_manufacturer()
 
     return system_info
+
+
+def get_cpu_times() -> tuple[int, int]:
+    """
+    Read the time all CPUs spent busy and in total since boot.
+
+    :return: Busy and total time (in clock ticks)
+    :rtype: tuple[int, int]
+    """
+    with open("/proc/stat") as f:
+        # cpu user nice system idle iowait irq softirq steal ...
+        times = [int(value) for value in f.readline().split()[1:]]
+    total = sum(times[:8])
+    return total - times[3] - times[4], total
+
+
+def get_resource_usage(
+    cpu_times: tuple[int, int] | None = None,
+) -> tuple[ResourceUsage, tuple[int, int]]:
+    """
+    Sample the system-wide resource usage (from '/proc').
+
+    :param cpu_times: CPU times of the previous sample (see 'get_cpu_times'),
+                      to get the CPU usage since then
+    :type cpu_times: tuple[int, int] | None
+    :return: Resource usage (CPU usage only with previous CPU times), and the
+             CPU times for the next sample
+    :rtype: tuple[ResourceUsage, tuple[int, int]]
+    """
+    new_cpu_times = get_cpu_times()
+    cpu_percent = None
+    if cpu_times is not None and new_cpu_times[1] > cpu_times[1]:
+        cpu_percent = round(
+            100
+            * (new_cpu_times[0] - cpu_times[0])
+            / (new_cpu_times[1] - cpu_times[1]),
+            1,
+        )
+
+    meminfo = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            meminfo[key] = int(value.split()[0]) * 1024  # kB
+    mem_total = meminfo["MemTotal"]
+
+    usage = ResourceUsage(
+        cpu_percent=cpu_percent,
+        load=os.getloadavg()[0],
+        mem_used=mem_total - meminfo.get("MemAvailable", meminfo["MemFree"]),
+        mem_total=mem_total,
+    )
+    return usage, new_cpu_times
@@ -0,0 +1,127 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from gurk.scripts.python.helpers import package_state
+from gurk.utils import cli
+from gurk.utils.cli import CoreCliProcessor
+from gurk.utils.common import PACKAGE_SRC_PATH
+from gurk.utils.scripts import Command
+from gurk.utils.tasks import ResolvedTask
+
+# Fake apt CLIs: 'apt-cache policy' knows all packages but "unknown-*", and
+# 'apt-get' logs its arguments and "downloads" one .deb per package
+FAKE_APT = {
+    "apt-cache": """\
+        #!/usr/bin/env bash
+        for pkg in "${@:2}"; do
+        \t[[ "$pkg" == unknown-* ]] || printf '%s:\\n  Installed: (none)\\n' "$pkg"
+        done
+    """,
+    "apt-get": """\
+        #!/usr/bin/env bash
+        echo "$@" >>"$FAKE_APT_LOG"
+        archives=$(echo "$@" | sed -n 's/.*Dir::Cache::Archives=\\([^ ]*\\).*/\\1/p')
+        for pkg in "${@:6}"; do touch "$archives/$pkg.deb"; done
+    """,
+    "sudo": """\
+        #!/usr/bin/env bash
+        exec "$@"
+    """,
+    "flock": """\
+        #!/usr/bin/env bash
+        shift
+        exec "$@"
+    """,
+}
+
+# Task script installing apt packages (also via a called function)
+TASK_SCRIPT = """\
+    install_tool() {
+    \tapt_install wget curl "$extra"
+    \t_install_requirements
+    }
+
+    _install_requirements() {
+    \tapt_install unzip # required for the tool
+    }
+
+    install_other() {
+    \tapt_install never-collected
+    }
+"""
+
+
+@pytest.fixture
+def fake_apt(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Use fake apt CLIs (and sudo), and return the path of the apt log."""
+    bin_path = tmp_path / "bin"
+    bin_path.mkdir()
+    for name, script in FAKE_APT.items():
+        (bin_path / name).write_text(dedent(script))
+        (bin_path / name).chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_path}:/usr/bin:/bin")
+    log = tmp_path / "apt.log"
+    monkeypatch.setenv("FAKE_APT_LOG", str(log))
+    monkeypatch.setattr(cli, "APT_ARCHIVES_PATH", tmp_path / "archives")
+    monkeypatch.setattr(cli, "APT_PREFETCH_PATH", tmp_path / "prefetch")
+    (tmp_path / "archives").mkdir()
+    monkeypatch.setitem(
+        package_state._INSTALLED_PACKAGES_CACHE, "APT", {"curl": "7.0"}
+    )
+    return log
+
+
+def test_collect_apt_packages(fake_apt: Path, tmp_path: Path) -> None:
+    """Test that the apt packages of the tasks' scripts and lists are found."""
+    script = tmp_path / "tool.bash"
+    script.write_text(dedent(TASK_SCRIPT))
+    package_list = tmp_path / "install_apt_packages.txt"
+    package_list.write_text("zip  # archiver\nunknown-pkg\nlib*\nwget\n")
+    tasks = [
+        ResolvedTask("install-tool", Command(str(script), "install_tool")),
+        ResolvedTask(
+            "install-apt-packages",
+            Command(
+                str(
+                    PACKAGE_SRC_PATH
+                    / "scripts/python/install/package_managers.py"
+                ),
+                "install_apt_packages",
+            ),
+            config_file=str(package_list),
+        ),
+    ]
+
+    # Installed, unknown and non-literal packages are left out
+    assert CoreCliProcessor.collect_apt_packages(tasks) == [
+        "wget",
+        "unzip",
+        "zip",
+    ]
+
+
+def test_prefetch_apt_packages(fake_apt: Path, tmp_path: Path) -> None:
+    """Test that packages are downloaded ahead, into the apt archive."""
+    result = CoreCliProcessor.prefetch_apt_packages(["wget", "zip"])
+    assert result.returncode == 0
+    assert fake_apt.read_text().split() == [
+        "install",
+        "-y",
+        "--download-only",
+        "-o",
+        f"Dir::Cache::Archives={tmp_path / 'prefetch'}",
+        "wget",
+        "zip",
+    ]
+    assert sorted(p.name for p in (tmp_path / "archives").iterdir()) == [
+        "wget.deb",
+        "zip.deb",
+    ]
+    assert not list((tmp_path / "prefetch").glob("*.deb"))
+
+    # Nothing to download
+    fake_apt.unlink()
+    assert CoreCliProcessor.prefetch_apt_packages([]).returncode == 0
+    assert not fake_apt.exists()
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+from gurk.utils import downloads
+from gurk.utils.downloads import (
+    download_file,
+    evict_downloads_cache,
+    fetch_url,
+    parse_download_ref,
+    read_downloads_index,
+)
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """
+    HTTP server stand-in, serving the server's 'files' with an ETag, and
+    supporting conditional and (If-)Range requests. The first response for a
+    path in the server's 'cuts' is cut off after that many bytes.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.log.append((self.path, dict(self.headers)))
+        body = server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers["If-None-Match"] == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        if self.headers["Range"] and self.headers["If-Range"] == etag:
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+
+        cut = server.cuts.pop(self.path, None)
+        self.wfile.write(body[start:][:cut])
+        if cut is not None:
+            self.close_connection = True
+
+
+@pytest.fixture
+def server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Serve files over HTTP, with an empty downloads cache."""
+    monkeypatch.setattr(downloads, "DOWNLOADS_CACHE_PATH", tmp_path / "cache")
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), FakeHandler)
+    http_server.files, http_server.cuts, http_server.log = {}, {}, []
+    http_server.url = f"http://127.0.0.1:{http_server.server_port}"
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    yield http_server
+    http_server.shutdown()
+
+
+def test_parse_download_ref() -> None:
+    """Test that the checksum fragment is split off the URL."""
+    assert parse_download_ref("https://a.b/c?d=e") == (
+        "https://a.b/c?d=e",
+        None,
+    )
+    assert parse_download_ref("https://a.b/c#sha256=ABC") == (
+        "https://a.b/c",
+        "abc",
+    )
+
+
+def test_download_resume_and_revalidate(server, tmp_path: Path) -> None:
+    """Test that broken downloads resume, and unchanged files aren't sent."""
+    body = bytes(range(256)) * 4096 * 3  # 3 MiB
+    server.files["/file.bin"] = body
+    server.cuts["/file.bin"] = len(body) // 3
+    dest = tmp_path / "file.bin"
+
+    assert download_file(f"{server.url}/file.bin", dest) == "resumed"
+    assert dest.read_bytes() == body
+    assert "Range" not in server.log[0][1]
+    assert server.log[1][1]["Range"] == f"bytes={len(body) // 3}-"
+    assert (
+        server.log[1][1]["If-Range"] == f'"{hashlib.sha1(body).hexdigest()}"'
+    )
+    assert not list((tmp_path / "cache" / "partial").glob("*.part"))
+
+    # Unchanged: conditional request, without transfer
+    dest.write_text("modified locally")
+    assert download_file(f"{server.url}/file.bin", dest) == "not-modified"
+    assert "If-None-Match" in server.log[2][1]
+    assert dest.read_bytes() == body
+
+    # Changed: downloaded again (no stale partial file is resumed)
+    server.files["/file.bin"] = b"changed"
+    assert download_file(f"{server.url}/file.bin", dest) == "downloaded"
+    assert dest.read_bytes() == b"changed"
+
+    with pytest.raises(requests.HTTPError):
+        download_file(f"{server.url}/missing.bin", dest)
+
+
+def test_download_checksum(server, tmp_path: Path) -> None:
+    """Test that checksums are verified, and content shared between URLs."""
+    server.files["/a.txt"] = server.files["/b.txt"] = b"content"
+    sha256 = hashlib.sha256(b"content").hexdigest()
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        fetch_url(f"{server.url}/a.txt#sha256={'0' * 64}")
+    assert read_downloads_index() == {}
+
+    path, status = fetch_url(f"{server.url}/a.txt#sha256={sha256}")
+    assert status == "downloaded" and path.name == sha256
+
+    # Content-addressed: no request at all
+    n_requests = len(server.log)
+    assert fetch_url(f"{server.url}/b.txt#sha256={sha256}") == (path, "cached")
+    assert len(server.log) == n_requests
+    assert sorted(read_downloads_index()) == [
+        f"{server.url}/a.txt",
+        f"{server.url}/b.txt",
+    ]
+
+
+def test_evict_downloads_cache(server) -> None:
+    """Test that the least recently used files are evicted first."""
+    for name in ("old", "new"):
+        server.files[f"/{name}"] = name.encode() * 10
+        fetch_url(f"{server.url}/{name}")
+
+    evicted = evict_downloads_cache(max_size=30)
+    assert evicted == [hashlib.sha256(b"old" * 10).hexdigest()]
+    assert list(read_downloads_index()) == [f"{server.url}/new"]
+    assert not downloads.get_blob_path(evicted[0]).exists()
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="Requires root")
+def test_cache_keeps_owner_as_root(
+    server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cache entries written by root get the cache's owner."""
+    cache_path = tmp_path / "user_cache"
+    cache_path.mkdir()
+    os.chown(cache_path, 1000, 1000)
+    monkeypatch.setattr(
+        downloads, "DOWNLOADS_CACHE_PATH", cache_path / "downloads"
+    )
+    body = b"content" * 1024
+    server.files["/file.bin"] = body
+    server.cuts["/file.bin"] = len(body) // 2
+
+    assert download_file(f"{server.url}/file.bin", tmp_path / "file.bin")
+    owners = {
+        (path.lstat().st_uid, path.lstat().st_gid)
+        for path in (cache_path / "downloads").rglob("*")
+    }
+    assert owners == {(1000, 1000)}
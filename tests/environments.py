@@ -0,0 +1,259 @@
+import json
+import subprocess
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from gurk.scripts.python.helpers import conda, venvs
+from gurk.scripts.python.install import environments
+from gurk.scripts.python.install.environments import install_conda_environments
+
+# Fake conda CLI: solves ('create --dry-run') plan one package per spec (none
+# with a URL for "nourl"), and creations copy their explicit spec. Solves and
+# creations log their start/end time and take some time.
+FAKE_CONDA = dedent(
+    """\
+    #!/usr/bin/env bash
+    log() { echo "$1 $2 $(date +%s.%N)" >>"$FAKE_CONDA_LOG"; }
+    if [[ "$1 $2" == "env list" ]]; then
+    \techo '{"envs": ["/opt/conda", "/opt/conda/envs/existing"]}'
+    elif [[ "$1 $2" == "create --dry-run" ]]; then
+    \tname=$(basename "$5")
+    \tlog solve-start "$name"
+    \tsleep 0.3
+    \tlog solve-end "$name"
+    \tlinks=""
+    \tfor spec in "${@:6}"; do
+    \t\t[[ "$spec" == -c || "$spec" == conda-forge ]] && continue
+    \t\turl="\\"url\\": \\"https://conda.example/$spec-1.0-0.conda\\", "
+    \t\t[[ "$spec" == nourl ]] && url=""
+    \t\tlinks+="${links:+, }{${url}\\"md5\\": \\"0123\\"}"
+    \tdone
+    \techo "{\\"actions\\": {\\"LINK\\": [$links]}}"
+    elif [[ "$1" == "create" ]]; then
+    \tlog create-start "$4"
+    \tcp "$6" "$FAKE_CONDA_SPECS/$4.txt"
+    \tsleep 0.2
+    \tlog create-end "$4"
+    elif [[ "$1 $2" == "env create" ]]; then
+    \tlog create-start yaml
+    \tsleep 0.2
+    \tlog create-end yaml
+    else
+    \tlog other "$1"
+    fi
+"""
+)
+
+
+@pytest.fixture
+def fake_conda(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> tuple[Path, Path]:
+    """Use a fake conda CLI, and return the paths of its log and specs."""
+    conda_exe = tmp_path / "conda"
+    conda_exe.write_text(FAKE_CONDA)
+    conda_exe.chmod(0o755)
+    log, specs = tmp_path / "conda.log", tmp_path / "specs"
+    log.touch()
+    specs.mkdir()
+    monkeypatch.setenv("FAKE_CONDA_LOG", str(log))
+    monkeypatch.setenv("FAKE_CONDA_SPECS", str(specs))
+    monkeypatch.setattr(environments, "CONDA_PKGS_LOCK", tmp_path / "lock")
+    monkeypatch.setattr(
+        environments,
+        "bash_checks",
+        lambda names, cache=False: {
+            name: subprocess.CompletedProcess(
+                [name],
+                0 if name == "check_install_conda" else 1,
+                stdout=f"{conda_exe}\n",
+            )
+            for name in names
+        },
+    )
+    return log, specs
+
+
+def test_get_conda_env_names(fake_conda: tuple[Path, Path]) -> None:
+    """Test that the root prefix is named 'base'."""
+    conda_exe = fake_conda[0].with_name("conda")
+    assert conda.get_conda_env_names(str(conda_exe)) == {"base", "existing"}
+
+
+def test_install_conda_environments(
+    fake_conda: tuple[Path, Path],
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test that solves run concurrently, but creations one at a time."""
+    log, specs = fake_conda
+    env_specs = {
+        name: {
+            "type": "conda",
+            "channels": ["conda-forge"],
+            "conda_packages": packages,
+        }
+        for name, packages in {
+            "first": ["numpy", "scipy"],
+            "second": ["pandas"],
+            "third": ["nourl"],
+            "existing": ["numpy"],
+        }.items()
+    }
+    config_file = tmp_path / "envs.jsonc"
+    config_file.write_text(json.dumps(env_specs))
+    install_conda_environments(f"--config-file={config_file}", "--jobs=3")
+
+    # Solved environments are created from their explicit spec
+    assert (specs / "first.txt").read_text() == (
+        "@EXPLICIT\n"
+        "https://conda.example/numpy-1.0-0.conda#0123\n"
+        "https://conda.example/scipy-1.0-0.conda#0123\n"
+    )
+    assert (specs / "second.txt").exists()
+    assert not (specs / "third.txt").exists()
+
+    events = [line.split() for line in log.read_text().splitlines()]
+    events.sort(key=lambda event: float(event[2]))
+    assert {event[1] for event in events} == {
+        "first",
+        "second",
+        "third",
+        "yaml",
+    }
+
+    # Solves overlap, creations (writing the package cache) don't
+    for kind, expected in (("solve", 3), ("create", 1)):
+        running, max_running = 0, 0
+        for event in events:
+            if event[0].startswith(kind):
+                running += 1 if event[0].endswith("start") else -1
+                max_running = max(max_running, running)
+        assert max_running == expected
+
+    output = capsys.readouterr().out
+    assert "Environment 'existing' already exists" in output
+    assert "Created 3/3 environment(s)" in output
+
+
+def test_install_conda_environments_unknown_envs(
+    fake_conda: tuple[Path, Path],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test that environments are probed if they can't be listed."""
+    log, _ = fake_conda
+    monkeypatch.setattr(environments, "get_conda_env_names", lambda exe: None)
+    config_file = tmp_path / "envs.jsonc"
+    config_file.write_text(
+        json.dumps({"existing": {"type": "conda", "conda_packages": ["x"]}})
+    )
+    install_conda_environments(f"--config-file={config_file}")
+
+    assert [line.split()[:2] for line in log.read_text().splitlines()] == [
+        ["other", "run"]
+    ]
+    assert "Environment 'existing' already exists" in capsys.readouterr().out
+
+
+@pytest.fixture
+def base_venvs_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the base venvs in a temporary directory."""
+    monkeypatch.setattr(venvs, "BASE_VENVS_PATH", tmp_path / "venvs")
+    return tmp_path / "venvs"
+
+
+def test_clone_venv(base_venvs_path: Path, tmp_path: Path) -> None:
+    """Test that cloned venvs work from (and only refer to) their location."""
+    base_venv_dir = venvs.get_base_venv()
+    assert base_venv_dir.parent == base_venvs_path
+    pyvenv_cfg = (base_venv_dir / "pyvenv.cfg").stat()
+    assert venvs.get_base_venv() == base_venv_dir
+    assert (base_venv_dir / "pyvenv.cfg").stat() == pyvenv_cfg
+
+    venv_dir = tmp_path / "clone"
+    venvs.clone_venv(base_venv_dir, venv_dir)
+    assert not (venv_dir / venvs._BASE_VENV_COMPLETE_FILE).exists()
+    for name in ("pip", "activate"):
+        content = (venv_dir / "bin" / name).read_text()
+        assert str(venv_dir) in content
+        assert str(base_venv_dir) not in content
+    assert (
+        (venv_dir / "bin" / "pip")
+        .read_text()
+        .startswith(f"#!{venv_dir / 'bin'}/python")
+    )
+
+    result = subprocess.run(
+        [str(venv_dir / "bin" / "pip"), "--version"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert str(venv_dir) in result.stdout
+
+
+def test_create_venv_fallback(
+    base_venvs_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that venvs are created from scratch if they can't be cloned."""
+    created = []
+    monkeypatch.setattr(
+        venvs.venv,
+        "create",
+        lambda venv_dir, with_pip: created.append(venv_dir)
+        or (venv_dir / "bin").mkdir(parents=True),
+    )
+
+    # Without a base venv, or with one that can't be cloned
+    venvs.create_venv(tmp_path / "fresh", None)
+    venvs.create_venv(tmp_path / "broken", base_venvs_path / "missing")
+    assert created == [tmp_path / "fresh", tmp_path / "broken"]
+
+    # With a base venv, it is cloned
+    base_venv_dir = tmp_path / "base"
+    (base_venv_dir / "bin").mkdir(parents=True)
+    (base_venv_dir / "pyvenv.cfg").write_text(f"home = {base_venv_dir}\n")
+    venvs.create_venv(tmp_path / "clone", base_venv_dir)
+    assert created == [tmp_path / "fresh", tmp_path / "broken"]
+    assert (tmp_path / "clone" / "pyvenv.cfg").read_text() == (
+        f"home = {tmp_path / 'clone'}\n"
+    )
+
+
+def test_install_pip_environments_without_base_venv(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test the fallback without a base venv, and the failure outputs."""
+
+    def fail(*args) -> None:
+        raise subprocess.CalledProcessError(1, ["ensurepip"])
+
+    def create_venv(venv_dir: Path, base_venv_dir: Path | None) -> None:
+        assert base_venv_dir is None
+        (venv_dir / "bin").mkdir(parents=True)
+        (venv_dir / "bin" / "pip").write_text(
+            '#!/usr/bin/env bash\necho "pip $*"\n[[ "$2" != bad ]]\n'
+        )
+        (venv_dir / "bin" / "pip").chmod(0o755)
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(environments, "get_base_venv", fail)
+    monkeypatch.setattr(environments, "create_venv", create_venv)
+    config_file = tmp_path / "envs.jsonc"
+    config_file.write_text(json.dumps({"good": ["good"], "bad": ["bad"]}))
+    environments.install_pip_environments(f"--config-file={config_file}")
+
+    output = capsys.readouterr().out
+    assert "creating the environments from scratch" in output
+    assert "Failed to install packages for environment 'bad'" in output
+    assert output.index("pip install bad") > output.index(
+        "Successfully installed packages for environment 'good'"
+    )
+    assert "pip install good" not in output
+    assert "Created 1/2 environment(s)" in output
@@ -0,0 +1,81 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+
+import pytest
+
+from gurk.core import logger as logger_module
+from gurk.core.logger import Logger
+from gurk.utils.events import EventBus
+from gurk.utils.logger import TaskTerminationType
+
+
+def test_unix_socket(tmp_path: Path) -> None:
+    """Test that events are streamed to a listening Unix socket."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(tmp_path / "events.sock"))
+    server.listen(1)
+
+    bus = EventBus(f"unix:{tmp_path / 'events.sock'}")
+    for i in range(3):
+        bus.publish(
+            {"event": "step", "task": "install-pip", "message": str(i)}
+        )
+    bus.close()
+
+    conn, _ = server.accept()
+    with conn, server, conn.makefile("rb") as stream:
+        events = [json.loads(line) for line in stream]
+    assert [event["message"] for event in events] == ["0", "1", "2"]
+
+
+def test_slow_consumer() -> None:
+    """Test that publishing never blocks on a stalled consumer."""
+    read_fd, write_fd = os.pipe()
+    try:
+        bus = EventBus(f"fd:{write_fd}", buffer_size=10)
+        start = time.monotonic()
+        for i in range(100000):
+            bus.publish({"event": "step", "task": "t", "message": "x" * 100})
+        assert time.monotonic() - start < 5
+        assert bus.dropped > 0
+
+        start = time.monotonic()
+        bus.close(timeout=0.5)  # The pipe is full, nothing is read
+        assert time.monotonic() - start < 2
+    finally:
+        os.close(read_fd)
+
+
+def test_logger_events(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a run's events are published, also for the rich output."""
+    monkeypatch.setattr(logger_module, "PACKAGE_LOGS_PATH", tmp_path / "logs")
+    events_path = tmp_path / "events.jsonl"
+    with Logger(False, "rich", EventBus(str(events_path))) as logger:
+        logger.publish({"event": "added", "task": "install-pip"})
+        task_id = logger.add_task("install-pip")
+        logger.update_task(task_id, "Installing rich")
+        logger.info("Installed [bold]rich[/bold]")
+        logger.finish_task(task_id, TaskTerminationType.SUCCESS)
+
+    events = [
+        json.loads(line) for line in events_path.read_text().split("\n")[:-1]
+    ]
+    assert [
+        event["event"] for event in events if event["event"] != "resources"
+    ] == [
+        "added",
+        "started",
+        "step",
+        "log",
+        "finished",
+    ]
+    usage = next(e for e in events if e["event"] == "resources")
+    assert usage["mem_total"] > 0 and usage["running"] in (0, 1)
+    assert [
+        event["message"] for event in events if event["event"] == "log"
+    ] == ["Installed rich"]
@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from gurk.scripts.python.helpers import filestructure
+from gurk.scripts.python.helpers.filestructure import (
+    FileOp,
+    FileOpKind,
+    apply_filestructure,
+    get_ownership_roots,
+    plan_filestructure,
+)
+
+
+@pytest.fixture
+def ownership_calls(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> list[tuple[Path]]:
+    """
+    Record the ownership fix-ups (instead of running sudo), with an empty
+    recorded state.
+    """
+    monkeypatch.setattr(
+        filestructure, "FILESTRUCTURE_STATE_PATH", tmp_path / "state.json"
+    )
+    calls = []
+    monkeypatch.setattr(
+        filestructure,
+        "revert_sudo_permissions",
+        lambda *paths: calls.append(paths),
+    )
+    return calls
+
+
+def test_plan_filestructure(tmp_path: Path) -> None:
+    """Test that entries are classified, and invalid ones skipped."""
+    source = tmp_path / "source.txt"
+    source.write_text("source")
+    (tmp_path / "dest").mkdir()
+    (tmp_path / "dest" / "existing.txt").touch()
+    structure = {
+        "dir": None,
+        "file.txt": None,
+        "existing.txt": None,
+        "nested": {"copy.txt": str(source), "link.txt": f"symlink://{source}"},
+        "missing.txt": str(tmp_path / "missing.txt"),
+        "download.txt": "https://example.com/file.txt",
+        "invalid": 1,
+    }
+
+    ops = plan_filestructure(tmp_path / "dest", structure, False, False)
+
+    dest = tmp_path / "dest"
+    assert [(op.kind, op.dest) for op in ops] == [
+        (FileOpKind.MKDIR, dest / "dir"),
+        (FileOpKind.TOUCH, dest / "file.txt"),
+        (FileOpKind.TOUCH, dest / "existing.txt"),
+        (FileOpKind.MKDIR, dest / "nested"),
+        (FileOpKind.COPY, dest / "nested" / "copy.txt"),
+        (FileOpKind.SYMLINK, dest / "nested" / "link.txt"),
+        (FileOpKind.DOWNLOAD, dest / "download.txt"),
+    ]
+    # Existing entries are stat'ed (to be compared when applied)
+    assert [op.dest_stat is not None for op in ops] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+        False,
+    ]
+    # Nothing is created while planning
+    assert list(dest.iterdir()) == [dest / "existing.txt"]
+
+
+def test_get_ownership_roots() -> None:
+    """Test that paths inside other paths are covered by them."""
+    paths = [Path(p) for p in ("/h/a/b", "/h/ab", "/h/a", "/h/c/d", "/h/a")]
+    assert get_ownership_roots(paths) == [
+        Path("/h/a"),
+        Path("/h/ab"),
+        Path("/h/c/d"),
+    ]
+
+
+def test_apply_filestructure(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    ownership_calls: list[tuple[Path]],
+) -> None:
+    """Test that leaf operations run concurrently, after their parents."""
+    running, max_running = 0, 0
+    lock = threading.Lock()
+    apply_file_op = filestructure.apply_file_op
+
+    def slow_apply_file_op(op: FileOp) -> bool:
+        nonlocal running, max_running
+        if not op.kind.is_leaf_io:
+            return apply_file_op(op)
+        assert op.dest.parent.is_dir()
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+        return apply_file_op(op)
+
+    monkeypatch.setattr(filestructure, "apply_file_op", slow_apply_file_op)
+    source = tmp_path / "source.txt"
+    source.write_text("source")
+    structure = {
+        f"dir{i}": {"sub": {f"copy{j}.txt": str(source) for j in range(3)}}
+        for i in range(4)
+    }
+    structure["empty"] = {"missing.txt": str(tmp_path / "missing.txt")}
+    (tmp_path / "dest").mkdir()
+    ops = plan_filestructure(tmp_path / "dest", structure, False, False)
+    ops += plan_filestructure(
+        tmp_path / "dest", {"root.txt": None}, False, True
+    )
+    counts = apply_filestructure(ops, jobs=4)
+    assert counts["created"] == len(ops) and counts["failed"] == 0
+
+    assert max_running == 4
+    assert (tmp_path / "dest" / "dir3" / "sub" / "copy2.txt").read_text() == (
+        "source"
+    )
+    # One fix-up, for the outermost user entries only
+    assert ownership_calls == [
+        tuple(
+            tmp_path / "dest" / name
+            for name in ("dir0", "dir1", "dir2", "dir3", "empty")
+        )
+    ]
+
+
+def test_apply_filestructure_diff(
+    tmp_path: Path, ownership_calls: list[tuple[Path]]
+) -> None:
+    """Test that re-runs only update missing/changed entries."""
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (source_dir / name).write_text(name)
+    structure = {
+        "dir": {"file.txt": str(source_dir / "a.txt")},
+        "tree": str(source_dir),
+        "link.txt": f"symlink://{source_dir / 'b.txt'}",
+    }
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    def apply(overwrite: bool) -> dict[str, int]:
+        ops = plan_filestructure(dest, structure, overwrite, False)
+        counts = apply_filestructure(ops)
+        return {status: n for status, n in counts.items() if n}
+
+    assert apply(False) == {"created": 4}
+    ownership_calls.clear()
+    assert apply(True) == {"unchanged": 4}
+    assert ownership_calls == []
+
+    # Same content with another mtime: hashed, not copied
+    os.utime(dest / "tree" / "a.txt", ns=(0, 0))
+    # Changed source: only its copies are updated (with '--force')
+    (source_dir / "b.txt").write_text("changed")
+    mtime = (dest / "tree" / "a.txt").stat().st_mtime_ns
+    assert apply(False) == {"unchanged": 3, "skipped": 1}
+    assert (dest / "tree" / "b.txt").read_text() == "b.txt"
+    assert apply(True) == {"unchanged": 3, "updated": 1}
+    assert (dest / "tree" / "b.txt").read_text() == "changed"
+    assert (dest / "tree" / "a.txt").stat().st_mtime_ns == mtime
+
+    # Removed entry: created again
+    (dest / "link.txt").unlink()
+    assert apply(False) == {"unchanged": 3, "created": 1}
+
+
+def test_apply_filestructure_failed_op(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    ownership_calls: list[tuple[Path]],
+) -> None:
+    """Test that a failing operation doesn't skip the ownership fix-up."""
+    source = tmp_path / "source.txt"
+    source.write_text("source")
+    structure = {"copy.txt": str(source), "full.txt": str(source)}
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    ops = plan_filestructure(dest, structure, False, False)
+
+    copy2 = filestructure.copy2
+
+    def failing_copy2(src: Path, dst: Path) -> Path:
+        if Path(dst).name == "full.txt":
+            Path(dst).write_text("partial")
+            raise OSError(28, "No space left on device")
+        return copy2(src, dst)
+
+    monkeypatch.setattr(filestructure, "copy2", failing_copy2)
+    counts = apply_filestructure(ops)
+    assert counts["created"] == 1 and counts["failed"] == 1
+    assert ownership_calls == [(dest / "copy.txt", dest / "full.txt")]
+
+    # Unexpected errors still revert the ownership of created entries
+    ownership_calls.clear()
+    monkeypatch.setattr(
+        filestructure,
+        "run_concurrently",
+        lambda *args: (_ for _ in ()).throw(KeyboardInterrupt),
+    )
+    (dest / "copy.txt").unlink()
+    ops = plan_filestructure(dest, {"dir": None, **structure}, False, False)
+    with pytest.raises(KeyboardInterrupt):
+        apply_filestructure(ops)
+    assert ownership_calls == [(dest / "dir", dest / "full.txt")]
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="Requires root")
+def test_state_keeps_owner_as_root(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the state written by root gets the cache's owner."""
+    cache_path = tmp_path / "user_cache"
+    cache_path.mkdir()
+    os.chown(cache_path, 1000, 1000)
+    state_path = cache_path / "gurk" / "filestructure.json"
+    monkeypatch.setattr(filestructure, "FILESTRUCTURE_STATE_PATH", state_path)
+
+    filestructure._write_filestructure_state({})
+    for path in (state_path.parent, state_path):
+        assert (path.stat().st_uid, path.stat().st_gid) == (1000, 1000)
@@ -0,0 +1,109 @@
+import os
+import pty
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gurk.utils.forkserver import ForkServer
+from gurk.utils.interface import run_script_function
+
+SCRIPT = """\
+import os
+import sys
+
+
+def main(*args):
+    print(sys.argv[0], *args, os.isatty(1))
+    print(os.environ["GURK_TEST"], os.getcwd())
+    return int(args[0]) if args else None
+
+
+def fail():
+    raise RuntimeError("broken")
+
+
+def message():
+    sys.exit("stopped")
+"""
+
+
+@pytest.fixture(scope="module")
+def forkserver():
+    """Fork server for the tests."""
+    server = ForkServer(sys.executable)
+    yield server
+    server.close()
+
+
+def run_script(
+    forkserver: ForkServer | None,
+    tmp_path: Path,
+    function: str,
+    args: list[str],
+) -> tuple[int, str]:
+    """
+    Run a function of the test script like the scheduler would: forked from
+    the fork server, or else in a new interpreter.
+    """
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT)
+    wrapper = tmp_path / "wrapper" / "wrapper.py"
+    wrapper.parent.mkdir(exist_ok=True)
+    wrapper.write_text(run_script_function(script, function, args, run=False))
+
+    master_fd, slave_fd = pty.openpty()
+    env = {**os.environ, "GURK_TEST": "env"}
+    cwd = os.getcwd()
+    try:
+        os.chdir(tmp_path)
+        if forkserver is not None:
+            process = forkserver.spawn([str(wrapper)], slave_fd, env)
+        else:
+            process = subprocess.Popen(
+                [sys.executable, "-u", str(wrapper)],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                env=env,
+                start_new_session=True,
+            )
+        os.chdir(cwd)
+        os.close(slave_fd)
+
+        output = b""
+        while True:
+            try:
+                data = os.read(master_fd, 4096)
+            except OSError:  # EIO once the process has exited
+                break
+            if not data:
+                break
+            output += data
+        return process.wait(), output.decode().replace("\r\n", "\n")
+    finally:
+        os.chdir(cwd)
+        os.close(master_fd)
+
+
+def test_forked_output(forkserver: ForkServer, tmp_path: Path) -> None:
+    """Test that a task runs on its terminal, with its argv, env and cwd."""
+    code, output = run_script(forkserver, tmp_path, "main", ["3", "x"])
+    assert code == 3
+    assert output == (
+        f"{tmp_path / 'wrapper' / 'wrapper.py'} 3 x True\nenv {tmp_path}\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "function, args",
+    [("main", []), ("main", ["300"]), ("fail", []), ("message", [])],
+)
+def test_forked_exit_codes(
+    forkserver: ForkServer, tmp_path: Path, function: str, args: list[str]
+) -> None:
+    """Test that exit codes and output match those of a new interpreter."""
+    assert run_script(forkserver, tmp_path, function, args) == run_script(
+        None, tmp_path, function, args
+    )
@@ -0,0 +1,424 @@
+import errno
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from gurk.utils import files, git_repos
+from gurk.utils.files import (
+    get_tree_size,
+    materialize_tree,
+    move_path,
+    reflink_file,
+)
+from gurk.utils.git_repos import (
+    checkout_cached_repo,
+    clone_git_files,
+    clone_git_repo,
+    evict_git_cache,
+    get_cached_repo,
+    get_mirror_key,
+    get_remote_heads,
+    get_remote_refs_stats,
+    is_git_repo,
+    read_git_cache_index,
+    resolve_remote_refs,
+    sparse_clone_git_repo,
+)
+
+
+def git(repo_path: Path, *args: str) -> str:
+    """Run a git command in a repository and return its output."""
+    return subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def commit_file(repo_path: Path, name: str, content: str) -> str:
+    """Commit a file to a repository and return the commit hash."""
+    (repo_path / name).write_text(content)
+    git(repo_path, "add", name)
+    git(repo_path, "commit", "-q", "-m", f"Add {name}")
+    return git(repo_path, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a local repository (with a 'dev' branch) and an empty cache."""
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "gurk")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "gurk@example.com")
+    monkeypatch.setattr(git_repos, "GIT_CACHE_PATH", tmp_path / "cache")
+    monkeypatch.setattr(git_repos, "_REMOTE_REFS_CACHE", {})
+    monkeypatch.setattr(
+        git_repos, "_REMOTE_REFS_STATS", {"ls-remote": 0, "cached": 0}
+    )
+
+    repo_path = tmp_path / "origin"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo_path)])
+    git(repo_path, "config", "uploadpack.allowFilter", "true")
+    commit_file(repo_path, "a.txt", "a")
+    git(repo_path, "checkout", "-q", "-b", "dev")
+    commit_file(repo_path, "dev.txt", "dev")
+    git(repo_path, "checkout", "-q", "main")
+    return repo_path
+
+
+@pytest.fixture
+def git_commands(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record the git commands run by the git_repos module."""
+    commands = []
+    run_git_command = git_repos.run_git_command
+
+    def record(command: str, timeout: int = 300):
+        commands.append(command)
+        return run_git_command(command, timeout)
+
+    monkeypatch.setattr(git_repos, "run_git_command", record)
+    return commands
+
+
+def test_clone_populates_and_reuses_cache(
+    origin: Path, tmp_path: Path, git_commands: list[str]
+) -> None:
+    """Test that a repository is mirrored once, then fetched incrementally."""
+    url = f"file://{origin}"
+    assert clone_git_repo(url, tmp_path / "first") == tmp_path / "first"
+    assert (tmp_path / "first" / "a.txt").read_text() == "a"
+    assert git(tmp_path / "first", "remote", "get-url", "origin") == url
+
+    index = read_git_cache_index()
+    assert list(index) == [get_mirror_key(url)]
+    assert index[get_mirror_key(url)]["url"] == url
+    assert index[get_mirror_key(url)]["size"] > 0
+
+    # New commits are fetched into the existing mirror
+    commit_file(origin, "b.txt", "b")
+    assert clone_git_repo(url, tmp_path / "second")
+    assert (tmp_path / "second" / "b.txt").read_text() == "b"
+    assert sum("clone --mirror" in cmd for cmd in git_commands) == 1
+    assert sum("fetch --prune origin" in cmd for cmd in git_commands) == 1
+
+    # An up-to-date mirror is not fetched (remote refs are cached)
+    assert clone_git_repo(url, tmp_path / "third")
+    assert sum("fetch --prune origin" in cmd for cmd in git_commands) == 1
+    assert sum("ls-remote" in cmd for cmd in git_commands) == 1
+
+
+def test_clone_cached_commit_offline(
+    origin: Path, tmp_path: Path, git_commands: list[str]
+) -> None:
+    """Test that a cached commit is checked out without contacting origin."""
+    url = f"file://{origin}"
+    first_commit = git(origin, "rev-parse", "HEAD")
+    commit_file(origin, "b.txt", "b")
+    assert get_cached_repo(url)
+
+    git_commands.clear()
+    origin.rename(origin.with_name("gone"))
+    dest = clone_git_repo(f"{url}?commit={first_commit}", tmp_path / "dest")
+    assert dest is not None
+    assert git(dest, "rev-parse", "HEAD") == first_commit
+    assert not (dest / "b.txt").exists()
+    assert not any("fetch" in cmd for cmd in git_commands)
+
+
+def test_clone_branch_with_depth(origin: Path, tmp_path: Path) -> None:
+    """Test that a shallow clone of an uncached repository isn't mirrored."""
+    url = f"file://{origin}?branch=dev&depth=1"
+    dest = clone_git_repo(url, tmp_path / "dest")
+    assert dest is not None
+    assert (dest / "dev.txt").read_text() == "dev"
+    assert git(dest, "rev-list", "--count", "HEAD") == "1"
+    assert read_git_cache_index() == {}
+
+
+def test_clone_cached_branch_with_depth(
+    origin: Path, tmp_path: Path, git_commands: list[str]
+) -> None:
+    """Test that branch and depth are honored when checking out the mirror."""
+    assert get_cached_repo(f"file://{origin}")
+
+    git_commands.clear()
+    url = f"file://{origin}?branch=dev&depth=1"
+    dest = clone_git_repo(url, tmp_path / "dest")
+    assert dest is not None
+    assert (dest / "dev.txt").read_text() == "dev"
+    assert git(dest, "rev-list", "--count", "HEAD") == "1"
+    assert not any(f"file://{origin} " in cmd for cmd in git_commands)
+
+
+def test_clone_without_usable_cache(
+    origin: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a clone falls back to the remote if the cache is unusable."""
+    cache_path = tmp_path / "not_a_dir"
+    cache_path.write_text("")
+    monkeypatch.setattr(git_repos, "GIT_CACHE_PATH", cache_path)
+
+    dest = clone_git_repo(f"file://{origin}?branch=dev", tmp_path / "dest")
+    assert dest is not None
+    assert (dest / "dev.txt").read_text() == "dev"
+
+
+def test_clone_missing_repo(origin: Path, tmp_path: Path) -> None:
+    """Test that a failed clone leaves neither a checkout nor a mirror."""
+    url = f"file://{tmp_path / 'missing'}"
+    assert clone_git_repo(url, tmp_path / "dest") is None
+    assert not (tmp_path / "dest").exists()
+    assert read_git_cache_index() == {}
+
+
+def test_sparse_clone_git_repo(origin: Path, tmp_path: Path) -> None:
+    """Test that only the blobs of the requested path are fetched."""
+    (origin / "conf").mkdir()
+    commit_file(origin, "conf/app.cfg", "app")
+    commit_file(origin, "large.bin", "x" * 100_000)
+
+    dest = sparse_clone_git_repo(
+        f"file://{origin}?path=conf&depth=1", tmp_path / "dest"
+    )
+    assert dest is not None
+    assert (dest / "conf" / "app.cfg").read_text() == "app"
+    assert not (dest / "large.bin").exists()
+
+    missing = git(dest, "rev-list", "--objects", "--missing=print", "HEAD")
+    missing_blobs = {line[1:] for line in missing.split() if line[0] == "?"}
+    assert missing_blobs == {
+        git(origin, "rev-parse", f"HEAD:{name}")
+        for name in ("a.txt", "large.bin")
+    }
+    assert git(dest, "rev-list", "--count", "HEAD") == "1"
+
+
+def test_clone_git_files_sparse(
+    origin: Path, tmp_path: Path, git_commands: list[str]
+) -> None:
+    """Test that files and directories of any revision can be cloned."""
+    first_commit = git(origin, "rev-parse", "HEAD")
+    commit_file(origin, "a.txt", "changed")
+    url = f"file://{origin}"
+
+    dest = clone_git_files(f"{url}?path=a.txt", tmp_path / "a.txt")
+    assert dest.read_text() == "changed"
+    dest = clone_git_files(
+        f"{url}?commit={first_commit}&path=a.txt", tmp_path / "old.txt"
+    )
+    assert dest.read_text() == "a"
+    dest = clone_git_files(f"{url}?branch=dev&path=dev.txt", tmp_path / "dev")
+    assert dest.read_text() == "dev"
+    with pytest.raises(FileNotFoundError):
+        clone_git_files(f"{url}?path=missing", tmp_path / "missing")
+
+    # No mirror is populated for partial clones
+    assert not any("--mirror" in cmd for cmd in git_commands)
+    assert read_git_cache_index() == {}
+
+
+def test_is_git_repo_local_paths(
+    origin: Path, tmp_path: Path, git_commands: list[str]
+) -> None:
+    """Test that local paths are checked without spawning git."""
+    git(tmp_path, "clone", "-q", "--bare", str(origin), "bare.git")
+    assert is_git_repo(str(origin))
+    assert is_git_repo(str(tmp_path / "bare.git"))
+    assert is_git_repo(str(tmp_path / "bare"))
+    assert not is_git_repo(str(tmp_path / "cache"))
+    assert not is_git_repo(str(tmp_path / "missing"))
+    assert not is_git_repo("relative/path?branch=main")
+    assert git_commands == []
+
+
+def test_resolve_remote_refs(
+    origin: Path,
+    tmp_path: Path,
+    git_commands: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that refs are listed once per URL, and reused until expired."""
+    git(tmp_path, "clone", "-q", "--bare", str(origin), "other.git")
+    url, other_url = f"file://{origin}", f"file://{tmp_path / 'other.git'}"
+    missing_url = f"file://{tmp_path / 'missing'}"
+
+    refs = resolve_remote_refs([url, other_url, url, missing_url])
+    assert refs[url] == refs[other_url]
+    assert refs[url]["refs/heads/dev"] == git(origin, "rev-parse", "dev")
+    assert refs[missing_url] is None
+    assert get_remote_heads(url)["main"] == git(origin, "rev-parse", "main")
+    assert get_remote_heads(url, HEAD=True) == refs[url]["HEAD"]
+    assert is_git_repo(f"{url}?branch=dev") and not is_git_repo(missing_url)
+    assert get_remote_refs_stats() == {"ls-remote": 3, "cached": 4}
+
+    # Valid refs are reused by other processes (until they expire)
+    monkeypatch.setattr(git_repos, "_REMOTE_REFS_CACHE", {})
+    assert resolve_remote_refs([url, missing_url])[url] == refs[url]
+    assert get_remote_refs_stats() == {"ls-remote": 4, "cached": 5}
+    monkeypatch.setattr(git_repos, "_REMOTE_REFS_CACHE", {})
+    monkeypatch.setattr(git_repos, "GIT_REFS_TTL", 0)
+    resolve_remote_refs([url])
+    assert get_remote_refs_stats() == {"ls-remote": 5, "cached": 5}
+    assert sum("ls-remote" in cmd for cmd in git_commands) == 5
+
+
+def test_checkout_is_independent_of_cache(
+    origin: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that objects are shared with the mirror, but not borrowed."""
+    monkeypatch.setattr(os, "geteuid", lambda: 1000)
+    (origin / "large.bin").write_bytes(os.urandom(1 << 20))
+    git(origin, "add", "large.bin")
+    commit_file(origin, "conf.cfg", "conf")
+    url = f"file://{origin}"
+    dest = tmp_path / "dest"
+    n_bytes = checkout_cached_repo(get_cached_repo(url), url, dest)
+
+    # Only the working tree (and git metadata) is written, not the objects
+    worktree_size = get_tree_size(dest, exclude=(".git",))
+    assert worktree_size > 1 << 20
+    assert worktree_size < n_bytes < worktree_size + 100_000
+    assert not (dest / ".git" / "objects" / "info" / "alternates").exists()
+
+    # A path of a cached repository is checked out from the mirror
+    assert clone_git_files(f"{url}?path=conf.cfg", tmp_path / "conf.cfg")
+    assert (tmp_path / "conf.cfg").read_text() == "conf"
+    assert not list(tmp_path.glob(".gurk_clone_*"))
+
+    evict_git_cache(max_size=0)
+    assert read_git_cache_index() == {}
+    assert git(dest, "fsck", "--no-dangling") == ""
+    assert git(dest, "log", "--format=%s", "-1") == "Add conf.cfg"
+
+
+def test_materialize_tree(tmp_path: Path) -> None:
+    """Test that trees are materialized with links, and moved by renaming."""
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "sub" / "file").write_text("content")
+    (src / "link").symlink_to("sub/file")
+    (src / "dirlink").symlink_to("sub")
+
+    assert materialize_tree(src, tmp_path / "linked", hardlink=True) == 0
+    assert (tmp_path / "linked" / "sub" / "file").stat().st_nlink == 2
+    assert os.readlink(tmp_path / "linked" / "link") == "sub/file"
+    assert os.readlink(tmp_path / "linked" / "dirlink") == "sub"
+
+    # Without hardlinks, the files are copied (unless reflinks are supported)
+    written = materialize_tree(src, tmp_path / "copied")
+    assert written in (0, len("content"))
+    assert (tmp_path / "copied" / "sub" / "file").stat().st_nlink == 1
+
+    assert move_path(src, tmp_path / "moved") == 0
+    assert (tmp_path / "moved" / "sub" / "file").read_text() == "content"
+    assert not src.exists()
+
+
+def test_reflink_file_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that only unsupported reflinks are remembered as such."""
+    monkeypatch.setattr(files, "_REFLINK_SUPPORT", {})
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    src.write_text("content")
+    dest.write_text("existing")
+    with pytest.raises(FileExistsError):
+        reflink_file(src, dest)
+    assert dest.read_text() == "existing"
+    dest.unlink()
+
+    def ioctl(fd: int, request: int, arg: int) -> None:
+        raise OSError(error, os.strerror(error))
+
+    monkeypatch.setattr(files.fcntl, "ioctl", ioctl)
+    error = errno.ENOSPC
+    with pytest.raises(OSError):
+        reflink_file(src, dest)
+    assert not dest.exists()
+    assert files._REFLINK_SUPPORT == {}
+
+    error = errno.EOPNOTSUPP
+    assert reflink_file(src, dest) is False
+    assert not dest.exists()
+    assert list(files._REFLINK_SUPPORT.values()) == [False]
+
+
+def test_evict_git_cache(origin: Path, tmp_path: Path) -> None:
+    """Test that expired mirrors, then the least recently used, are evicted."""
+    cache_path = git_repos.GIT_CACHE_PATH
+    cache_path.mkdir(parents=True)
+    now = time.time()
+    index = {
+        "expired": {"url": "expired", "last_used": now - 3600, "size": 1},
+        "old": {"url": "old", "last_used": now - 60, "size": 10},
+        "new": {"url": "new", "last_used": now - 30, "size": 10},
+        "newest": {"url": "newest", "last_used": now, "size": 10},
+    }
+    for key in index:
+        (cache_path / key).mkdir()
+    (cache_path / "index.json").write_text(json.dumps(index))
+
+    evicted = evict_git_cache(max_size=20, max_age=600, keep=("old",))
+    assert evicted == ["expired", "new"]
+    assert sorted(read_git_cache_index()) == ["newest", "old"]
+    assert sorted(path.name for path in cache_path.iterdir()) == [
+        "index.json",
+        "index.lock",
+        "newest",
+        "old",
+    ]
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="Requires root")
+def test_cache_keeps_owner_as_root(
+    origin: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cache entries written by root get the cache's owner."""
+    cache_path = tmp_path / "user_cache"
+    cache_path.mkdir()
+    os.chown(cache_path, 1000, 1000)
+    monkeypatch.setattr(git_repos, "GIT_CACHE_PATH", cache_path / "git")
+    # As with 'sudo', so git trusts the repositories owned by the user
+    monkeypatch.setenv("SUDO_UID", "1000")
+
+    url = f"file://{origin}"
+    assert clone_git_repo(url, tmp_path / "dest")
+    commit_file(origin, "b.txt", "b")
+    monkeypatch.setattr(git_repos, "_REMOTE_REFS_CACHE", {})
+    monkeypatch.setattr(git_repos, "GIT_REFS_TTL", 0)
+    assert clone_git_repo(url, tmp_path / "fetched")
+    assert (tmp_path / "fetched" / "b.txt").read_text() == "b"
+    assert (cache_path / "git" / git_repos.GIT_REFS_CACHE_FILE).exists()
+    owners = {
+        (path.lstat().st_uid, path.lstat().st_gid)
+        for path in (cache_path / "git").rglob("*")
+    }
+    assert owners == {(1000, 1000)}
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="Requires root")
+def test_privileged_checkout_does_not_share_inodes(
+    origin: Path, tmp_path: Path
+) -> None:
+    """Test that privileged checkouts don't hardlink the mirror's objects."""
+    url = f"file://{origin}"
+    mirror = get_cached_repo(url)
+    dest = tmp_path / "dest"
+    assert checkout_cached_repo(mirror, url, dest) is not None
+
+    # Reverting the ownership of the checkout leaves the mirror untouched
+    objects = [
+        p for p in (dest / ".git" / "objects").rglob("*") if p.is_file()
+    ]
+    assert objects
+    for path in objects:
+        os.chown(path, 1000, 1000)
+    assert {
+        path.stat().st_uid
+        for path in (mirror / "objects").rglob("*")
+        if path.is_file()
+    } == {0}
@@ -0,0 +1,246 @@
+import base64
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from gurk.utils.log_index import (
+    LOG_INDEX_FILE,
+    enforce_log_retention,
+    get_run_started,
+    get_run_tasks,
+    list_runs,
+    open_log_archive,
+    open_log_index,
+    read_archived_file,
+    resolve_run_id,
+    search_logs,
+    write_run_info,
+)
+
+
+@pytest.fixture
+def logs_path(tmp_path: Path) -> Path:
+    """Logs directory with a finished run and a running one."""
+    finished = tmp_path / "20250101_020000"
+    finished.mkdir()
+    (finished / "install-pip.log").write_text(
+        "Collecting rich\nERROR: no matching distribution\n"
+    )
+    (finished / "install-docker.log").write_text("docker installed\n")
+    write_run_info(
+        finished,
+        {
+            "started": 100.0,
+            "finished": 200.0,
+            "tasks": {
+                "install-pip": {
+                    "status": "Failure",
+                    "started": 100.0,
+                    "finished": 130.0,
+                },
+                "install-docker": {
+                    "status": "Success",
+                    "started": 130.0,
+                    "finished": 190.0,
+                },
+            },
+        },
+    )
+
+    running = tmp_path / "20250102_020000"
+    running.mkdir()
+    (running / "install-pip.log").write_text("Collecting rich\nDownloa")
+    write_run_info(
+        running,
+        {
+            "started": 300.0,
+            "finished": None,
+            "tasks": {
+                "install-pip": {
+                    "status": None,
+                    "started": 300.0,
+                    "finished": None,
+                },
+            },
+        },
+    )
+    return tmp_path
+
+
+def test_list_runs(logs_path: Path) -> None:
+    """Test that runs and tasks are listed with their statuses."""
+    with open_log_index(logs_path) as conn:
+        runs = list_runs(conn)
+        assert [run["run_id"] for run in runs] == [
+            "20250102_020000",
+            "20250101_020000",
+        ]
+        assert runs[1]["n_tasks"] == 2 and runs[1]["n_failed"] == 1
+        assert resolve_run_id(conn, "latest") == "20250102_020000"
+        assert resolve_run_id(conn, "20250101") == "20250101_020000"
+        assert resolve_run_id(conn, "2024") is None
+
+        tasks = get_run_tasks(conn, "20250101_020000")
+        assert [(t["task"], t["status"]) for t in tasks] == [
+            ("install-pip", "Failure"),
+            ("install-docker", "Success"),
+        ]
+        assert tasks[0]["n_lines"] == 2
+
+
+def test_search_logs(logs_path: Path) -> None:
+    """Test full-text search, with FTS5 syntax and invalid queries."""
+    with open_log_index(logs_path) as conn:
+        matches = search_logs(conn, "rich")
+        assert [(m["run_id"], m["lineno"]) for m in matches] == [
+            ("20250102_020000", 1),
+            ("20250101_020000", 1),
+        ]
+        matches = search_logs(conn, "error NOT docker")
+        assert [m["content"] for m in matches] == [
+            "ERROR: no matching distribution"
+        ]
+        assert len(search_logs(conn, "ERROR:")) == 1
+        assert search_logs(conn, "installed", task="install-pip") == []
+
+
+def test_update_log_index(logs_path: Path) -> None:
+    """Test that only appended lines (and unfinished runs) are indexed."""
+    running = logs_path / "20250102_020000"
+    with open_log_index(logs_path) as conn:
+        # The partial last line is left for later
+        assert search_logs(conn, "Downloading*") == []
+
+    with open(running / "install-pip.log", "a") as log_file:
+        log_file.write("ding rich\nSuccessfully installed rich\n")
+    # Finished runs aren't read again
+    (logs_path / "20250101_020000" / "install-pip.log").write_text("")
+    with open_log_index(logs_path) as conn:
+        assert [m["lineno"] for m in search_logs(conn, "rich")] == [3, 2, 1, 1]
+        tasks = get_run_tasks(conn, "20250101_020000")
+        assert tasks[0]["n_lines"] == 2
+
+
+def test_legacy_runs(tmp_path: Path) -> None:
+    """Test that runs without a 'run.json' are complete once stale."""
+    run_path = tmp_path / "20240101_020000"
+    run_path.mkdir()
+    log_path = run_path / "task.log"
+    log_path.write_text("done")
+    old = time.time() - 2 * 24 * 3600
+    os.utime(log_path, (old, old))
+
+    with open_log_index(tmp_path) as conn:
+        assert [m["content"] for m in search_logs(conn, "done")] == ["done"]
+        (run,) = list_runs(conn)
+        assert run["finished"] == pytest.approx(old)
+        assert conn.execute("SELECT complete FROM runs").fetchone()[0] == 1
+
+
+def create_run(logs_path: Path, run_id: str, size: int = 0) -> None:
+    """Create a finished run, with a log of (at least) the given size."""
+    run_path = logs_path / run_id
+    run_path.mkdir()
+    (run_path / "task.log").write_text(f"{run_id} done\n" + "x" * size)
+    started = get_run_started(run_id)
+    write_run_info(
+        run_path,
+        {
+            "started": started,
+            "finished": started + 1,
+            "tasks": {
+                "task": {
+                    "status": "Success",
+                    "started": started,
+                    "finished": started + 1,
+                },
+            },
+        },
+    )
+
+
+def test_log_retention(tmp_path: Path) -> None:
+    """Test that older runs are archived, yet still listed and searched."""
+    for day in range(1, 6):
+        create_run(tmp_path, f"2025010{day}_020000")
+
+    archived, deleted = enforce_log_retention(
+        tmp_path, keep_runs=2, keep_days=0, max_size=1024**3
+    )
+    assert archived == [
+        "20250103_020000",
+        "20250102_020000",
+        "20250101_020000",
+    ]
+    assert deleted == []
+    assert not (tmp_path / "20250101_020000").exists()
+    assert (tmp_path / "20250104_020000").is_dir()
+
+    with open_log_index(tmp_path) as conn:
+        assert len(list_runs(conn)) == 5
+        assert search_logs(conn, "done", run_id="20250101_020000")
+    with open_log_archive(tmp_path) as archive:
+        assert (
+            read_archived_file(archive, "20250101_020000", "task.log")
+            == b"20250101_020000 done\n"
+        )
+
+    # Rebuilt index: archived runs are indexed from the archive
+    (tmp_path / LOG_INDEX_FILE).unlink()
+    with open_log_index(tmp_path) as conn:
+        assert [run["archived"] for run in list_runs(conn)] == [
+            False,
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert get_run_tasks(conn, "20250101_020000")[0]["status"] == "Success"
+        assert search_logs(conn, "done", run_id="20250101_020000")
+
+
+def test_log_size_budget(tmp_path: Path) -> None:
+    """Test that the oldest runs are deleted while over the size budget."""
+    for day in range(1, 6):
+        create_run(tmp_path, f"2025010{day}_020000", size=1024**2)
+
+    archived, deleted = enforce_log_retention(
+        tmp_path, keep_runs=2, keep_days=0, max_size=6 * 1024**2
+    )
+    assert len(archived) == 3
+    assert deleted == ["20250101_020000", "20250102_020000"]
+
+    with open_log_index(tmp_path) as conn:
+        assert len(list_runs(conn)) == 3
+        assert not search_logs(conn, "done", run_id="20250101_020000")
+    with open_log_archive(tmp_path) as archive:
+        assert not read_archived_file(archive, "20250101_020000", "task.log")
+    assert sum(path.stat().st_size for path in tmp_path.rglob("*")) < (
+        6 * 1024**2
+    )
+
+    # The latest runs are always kept
+    _, deleted = enforce_log_retention(tmp_path, keep_runs=2, max_size=0)
+    assert deleted == ["20250103_020000"]
+
+
+def test_log_size_budget_archived(tmp_path: Path) -> None:
+    """Test that archived runs are counted once against the size budget."""
+    for day in range(1, 6):
+        run_id = f"2025010{day}_020000"
+        create_run(tmp_path, run_id)
+        with open(tmp_path / run_id / "task.log", "a") as file:
+            file.write(base64.b64encode(os.urandom(256 * 1024)).decode())
+    enforce_log_retention(
+        tmp_path, keep_runs=2, keep_days=0, max_size=1024**3
+    )
+
+    # Within budget (by less than the archive's size): nothing is deleted
+    size = sum(path.stat().st_size for path in tmp_path.rglob("*"))
+    archive_size = (tmp_path / "archive.sqlar").stat().st_size
+    _, deleted = enforce_log_retention(
+        tmp_path, keep_runs=2, keep_days=0, max_size=size + archive_size // 2
+    )
+    assert deleted == []
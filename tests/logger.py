@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from gurk.core import logger as logger_module
+from gurk.core.logger import Logger
+from gurk.utils.logger import TaskTerminationType
+
+
+@pytest.fixture(autouse=True)
+def logs_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Log runs to a temporary directory."""
+    monkeypatch.setattr(logger_module, "PACKAGE_LOGS_PATH", tmp_path)
+    return tmp_path
+
+
+def run_task(logger: Logger) -> None:
+    """Log a task with a step, a warning and a message."""
+    task_id = logger.add_task("install-pip", total=2)
+    logger.update_task(task_id, "Installing rich")
+    logger.update_task(task_id, "Retrying", advance=False, warning=True)
+    logger.info("Installed [bold]rich[/bold]\nand its dependencies")
+    logger.finish_task(task_id, TaskTerminationType.PARTIAL)
+
+
+def test_plain_output(capsys: pytest.CaptureFixture) -> None:
+    """Test that non-terminal output is one line per event, without markup."""
+    with Logger(False) as logger:
+        assert logger.output == "plain"
+        run_task(logger)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line[24:] for line in lines] == [
+        "STARTED  install-pip",
+        "STEP     install-pip: Installing rich",
+        "WARNING  install-pip: Retrying",
+        "INFO     Installed rich",
+        " " * 9 + "and its dependencies",  # Indented under the message
+        "PARTIAL  install-pip",
+    ]
+    assert logger.task_infos[0]["completed"] == 2
+
+
+def test_json_output(capsys: pytest.CaptureFixture) -> None:
+    """Test that the JSON output is one object per event."""
+    with Logger(False, "json") as logger:
+        run_task(logger)
+
+    events = [
+        json.loads(line) for line in capsys.readouterr().out.split("\n")[:-1]
+    ]
+    assert [event["event"] for event in events] == [
+        "started",
+        "step",
+        "step",
+        "log",
+        "finished",
+    ]
+    assert events[2]["severity"] == "WARNING"
+    assert events[3]["message"] == "Installed rich\nand its dependencies"
+    assert events[4]["status"] == "Partial"
+    assert all(isinstance(event["time"], float) for event in events)
@@ -0,0 +1,78 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from gurk.scripts.python.helpers.marking import get_gurk_marker, write_marked
+from gurk.utils.common import PACKAGE_SRC_PATH
+
+MARKING_BASH = (
+    PACKAGE_SRC_PATH / "scripts" / "bash" / "helpers" / "marking.bash"
+)
+
+START = get_gurk_marker("START")
+END = get_gurk_marker("END")
+
+
+def bash_write_marked(contents: list[str], file_path: Path) -> None:
+    """Apply contents one by one with the bash 'write_marked' helper."""
+    for content in contents:
+        subprocess.run(
+            [
+                "bash",
+                "-c",
+                f'log_step() {{ :; }}; source "{MARKING_BASH}"; '
+                'write_marked "$1" "$2"',
+                "_",
+                content,
+                str(file_path),
+            ],
+            check=False,
+        )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "export A=1\n",
+        "export A=1",
+        f"a\n{START}\nalias x='y'\n\n{END}\nb\n",
+        f"a\n{START}\nb",
+        f"a\n{END}\r\nb\n",
+        f"{START}\n{START}\n{END}\n",
+    ],
+    ids=["empty", "plain", "no-newline", "both", "start", "end", "invalid"],
+)
+def test_write_marked_matches_bash(tmp_path: Path, text: str) -> None:
+    """Test that the output is byte-identical to the bash helper."""
+    contents = [
+        "alias x='y'",
+        "alias z='(cd /opt && npm start > /dev/null &)'",
+        r"export P=C:\new\path",
+        "alias z='(cd /opt && npm start > /dev/null &)'",
+    ]
+    bash_file, python_file = tmp_path / "bash.rc", tmp_path / "python.rc"
+    bash_file.write_text(text)
+    python_file.write_text(text)
+
+    bash_write_marked(contents, bash_file)
+    written = write_marked(contents, python_file)
+
+    assert python_file.read_bytes() == bash_file.read_bytes()
+    if text.count(START) > 1:
+        assert written is None
+    else:
+        assert "alias z='(cd /opt && npm start > /dev/null &)'" in written
+        assert len(written) == len(set(written))
+
+
+def test_write_marked_unchanged(tmp_path: Path) -> None:
+    """Test that the file is not rewritten if all contents exist."""
+    file_path = tmp_path / "bashrc"
+    file_path.write_text("alias x='y'\n")
+    inode = file_path.stat().st_ino
+
+    assert write_marked(["alias x='y'"], file_path) == []
+    assert file_path.stat().st_ino == inode
+    assert write_marked(["alias x='y'"], tmp_path / "missing") is None
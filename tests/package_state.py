@@ -0,0 +1,147 @@
+from pathlib import Path
+
+import pytest
+
+from gurk.scripts.python.helpers import package_state, processing
+from gurk.scripts.python.helpers.processing import (
+    InstallCommands,
+    install_packages_from_list,
+)
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures" / "package_state"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    """Clear the per-process package state before/after each test."""
+    package_state._INSTALLED_PACKAGES_CACHE.clear()
+    yield
+    package_state._INSTALLED_PACKAGES_CACHE.clear()
+
+
+def test_parse_dpkg_status() -> None:
+    """Test that only installed packages are parsed from a dpkg status file."""
+    installed = package_state.parse_dpkg_status(FIXTURES_PATH / "dpkg_status")
+
+    assert installed == {
+        "curl": "8.5.0-2ubuntu10.6",
+        "curl:amd64": "8.5.0-2ubuntu10.6",
+        "git-lfs": "3.4.1-1ubuntu0.2",
+        "git-lfs:amd64": "3.4.1-1ubuntu0.2",
+        "libc6": "2.39-0ubuntu8.3",
+        "libc6:i386": "2.39-0ubuntu8.3",
+    }
+
+
+@pytest.mark.parametrize(
+    "parser, fixture, expected",
+    [
+        (
+            package_state.parse_snap_list,
+            "snap_list.txt",
+            {"bare": "1.0", "code": "f1e16e1e", "core22": "20240408"},
+        ),
+        (
+            package_state.parse_flatpak_list,
+            "flatpak_list.txt",
+            {
+                "com.spotify.Client": "1.2.31.1205",
+                "org.gimp.GIMP": "2.10.38",
+                "org.freedesktop.Platform": "",
+            },
+        ),
+        (
+            package_state.parse_pipx_list,
+            "pipx_list.json",
+            {"black": "24.4.2", "pre-commit": "3.7.1"},
+        ),
+        (
+            package_state.parse_npm_list,
+            "npm_list.json",
+            {"@angular/cli": "17.3.8", "yarn": "1.22.22"},
+        ),
+        (
+            package_state.parse_vscode_list,
+            "vscode_list.txt",
+            {
+                "eamodio.gitlens": "15.1.0",
+                "github.copilot": "1.196.0",
+                "ms-vscode.cpptools": "1.20.5",
+            },
+        ),
+    ],
+)
+def test_parse_list_outputs(parser, fixture: str, expected: dict) -> None:
+    """Test the parsers of the package manager list commands."""
+    output = (FIXTURES_PATH / fixture).read_text()
+    assert parser(output) == expected
+
+
+@pytest.mark.parametrize(
+    "manager, spec, expected",
+    [
+        ("APT", "curl", ("curl", None)),
+        ("APT", "curl=8.5.0", ("curl", "8.5.0")),
+        ("APT", "curl/noble", ("curl", None)),
+        ("APT", "libc6:i386", ("libc6:i386", None)),
+        ("APT", "python3-*", (None, None)),
+        ("SNAP", "code --classic", ("code", None)),
+        ("FLATPAK", "flathub org.gimp.GIMP", ("org.gimp.GIMP", None)),
+        ("NPM", "yarn@1.22.22", ("yarn", "1.22.22")),
+        ("NPM", "@angular/cli", ("@angular/cli", None)),
+        ("NPM", "@angular/cli@17.3.8", ("@angular/cli", "17.3.8")),
+        ("PIPX", "Pre_Commit[extra]==3.7.1", ("pre-commit", "3.7.1")),
+        ("PIPX", "git+https://github.com/psf/black", (None, None)),
+        ("VSC_EXT", "GitHub.copilot", ("github.copilot", None)),
+        (
+            "VSC_EXT",
+            "ms-vscode.cpptools@1.20.5",
+            ("ms-vscode.cpptools", "1.20.5"),
+        ),
+        ("DOCKER", "ubuntu:24.04", (None, None)),
+    ],
+)
+def test_parse_package_spec(
+    manager: str, spec: str, expected: tuple[str | None, str | None]
+) -> None:
+    """Test that names and pinned versions are extracted from list entries."""
+    assert package_state.parse_package_spec(manager, spec) == expected
+
+
+def test_install_only_missing_packages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that installed packages are skipped, and the state read once."""
+    reads = []
+    parse_dpkg_status = package_state.parse_dpkg_status
+    monkeypatch.setattr(
+        package_state,
+        "parse_dpkg_status",
+        lambda path=FIXTURES_PATH / "dpkg_status": reads.append(path)
+        or parse_dpkg_status(path),
+    )
+    installs = []
+    monkeypatch.setattr(
+        processing,
+        "_install_packages",
+        lambda command, packages: installs.append(packages) or True,
+    )
+
+    missing, present = package_state.split_installed_packages(
+        "APT", ["curl", "zip", "git-lfs=0.1", "git-lfs"]
+    )
+    assert missing == ["zip", "git-lfs=0.1"]
+    assert present == ["curl", "git-lfs"]
+    assert len(reads) == 1
+
+    # Only missing packages are installed (state is already read)
+    install_packages_from_list(InstallCommands.APT, ["curl", "zip", "wget"])
+    assert installs == [["zip", "wget"]]
+    assert len(reads) == 1
+
+    # All packages are installed when forced
+    installs.clear()
+    install_packages_from_list(
+        InstallCommands.APT, ["curl", "zip"], skip_installed=False
+    )
+    assert installs == [["curl", "zip"]]
@@ -0,0 +1,245 @@
+import os
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from gurk.scripts.python.helpers import package_state
+from gurk.scripts.python.helpers.processing import (
+    InstallCommands,
+    install_packages_concurrently,
+    install_packages_from_list,
+    normalize_docker_ref,
+    pull_docker_images,
+)
+
+# Fake docker CLI: 'pull' logs the reference and its start/end time, prints the
+# layer progress and takes some time. 'image inspect' prints a fixed size.
+FAKE_DOCKER = dedent(
+    """\
+    #!/usr/bin/env bash
+    if [[ "$1" == "image" ]]; then
+    \techo 1048576
+    \texit 0
+    fi
+    ref="$2"
+    echo "start $ref $(date +%s.%N)" >>"$FAKE_DOCKER_LOG"
+    if [[ "$ref" == *broken* ]]; then
+    \techo "Error response from daemon: manifest unknown"
+    \techo "end $ref $(date +%s.%N)" >>"$FAKE_DOCKER_LOG"
+    \texit 1
+    fi
+    echo "latest: Pulling from ${ref#*/}"
+    echo "0123456789ab: Pulling fs layer"
+    echo "123456789abc: Already exists"
+    sleep 0.3
+    echo "0123456789ab: Pull complete"
+    echo "Status: Downloaded newer image for $ref"
+    echo "end $ref $(date +%s.%N)" >>"$FAKE_DOCKER_LOG"
+"""
+)
+
+
+# Fake pipx module ('python3 -m pipx'): 'list' reports one installed package
+# (or fails), 'install' logs the package and its start/end time and takes some
+# time.
+FAKE_PIPX = dedent(
+    """\
+    import json
+    import os
+    import sys
+    import time
+
+    if sys.argv[1] == "list":
+        if os.environ.get("FAKE_PIPX_LIST_FAILS"):
+            sys.exit(1)
+        print(json.dumps({"venvs": {"installed": {}}}))
+        sys.exit(0)
+    pkg = sys.argv[2]
+    with open(os.environ["FAKE_PIPX_LOG"], "a") as log:
+        log.write(f"start {pkg} {time.time()}\\n")
+    time.sleep(0.3)
+    with open(os.environ["FAKE_PIPX_LOG"], "a") as log:
+        log.write(f"end {pkg} {time.time()}\\n")
+    if pkg == "broken":
+        print(f"No matching distribution found for {pkg}")
+        sys.exit(1)
+"""
+)
+
+
+@pytest.fixture
+def fake_docker(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a fake docker CLI on the PATH, and return the path of its log."""
+    docker = tmp_path / "docker"
+    docker.write_text(FAKE_DOCKER)
+    docker.chmod(0o755)
+    log = tmp_path / "docker.log"
+    log.touch()
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(log))
+    return log
+
+
+@pytest.mark.parametrize(
+    "ref, expected",
+    [
+        ("ubuntu", "docker.io/library/ubuntu:latest"),
+        ("docker.io/ubuntu:24.04", "docker.io/library/ubuntu:24.04"),
+        ("nvidia/cuda:12.4.1-base", "docker.io/nvidia/cuda:12.4.1-base"),
+        ("ghcr.io/owner/image", "ghcr.io/owner/image:latest"),
+        ("localhost:5000/image:1", "localhost:5000/image:1"),
+        ("ubuntu@sha256:abc", "docker.io/library/ubuntu@sha256:abc"),
+    ],
+)
+def test_normalize_docker_ref(ref: str, expected: str) -> None:
+    """Test that docker references are fully qualified."""
+    assert normalize_docker_ref(ref) == expected
+
+
+def test_pull_docker_images(
+    fake_docker: Path, capsys: pytest.CaptureFixture
+) -> None:
+    """Test that images are pulled once each, concurrently but bounded."""
+    images = [
+        "docker.io/ubuntu:latest",
+        "ubuntu",
+        "docker.io/library/debian:latest",
+        "ghcr.io/owner/image:1",
+        "ghcr.io/owner/broken:1",
+    ]
+    n_bytes = pull_docker_images(images, jobs=2)
+
+    # Duplicates are pulled once, and only downloaded images are counted (by
+    # their image size, as pulls don't report the transferred bytes)
+    events = [line.split() for line in fake_docker.read_text().splitlines()]
+    starts = [event[1] for event in events if event[0] == "start"]
+    assert sorted(starts) == sorted(
+        [
+            "docker.io/library/ubuntu:latest",
+            "docker.io/library/debian:latest",
+            "ghcr.io/owner/image:1",
+            "ghcr.io/owner/broken:1",
+        ]
+    )
+    assert n_bytes == 3 * 1048576
+
+    # At most two pulls run at once, but more than one does
+    running, max_running = 0, 0
+    for event in sorted(events, key=lambda event: float(event[2])):
+        running += 1 if event[0] == "start" else -1
+        max_running = max(max_running, running)
+    assert max_running == 2
+
+    # Progress and results are reported as steps
+    output = capsys.readouterr().out
+    assert "Skipping duplicate docker image: ubuntu" in output
+    assert "(2/2 layers)" in output
+    assert "Failed to pull docker image: ghcr.io/owner/broken:1" in output
+    assert "(image size 1.0 MiB, 1/2 layers downloaded)" in output
+    assert "Pulled 3/4 docker image(s), new images of 3.0 MiB" in output
+
+
+@pytest.mark.parametrize("list_fails", [False, True])
+def test_install_packages_concurrently(
+    list_fails: bool,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that the first package is installed alone, then the others, and that
+    installed packages are skipped (all are installed if they can't be
+    listed).
+    """
+    pipx = tmp_path / "pipx"
+    pipx.mkdir()
+    (pipx / "__main__.py").write_text(FAKE_PIPX)
+    log = tmp_path / "pipx.log"
+    log.touch()
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    monkeypatch.setenv("FAKE_PIPX_LOG", str(log))
+    if list_fails:
+        monkeypatch.setenv("FAKE_PIPX_LIST_FAILS", "1")
+    package_state._INSTALLED_PACKAGES_CACHE.clear()
+
+    packages = ["first", "second", "third", "broken", "fourth", "installed"]
+    install_packages_concurrently(InstallCommands.PIPX, packages, jobs=3)
+
+    events = [line.split() for line in log.read_text().splitlines()]
+    events.sort(key=lambda event: float(event[2]))
+    assert events[0][:2] == ["start", "first"]
+    assert events[1][:2] == ["end", "first"]
+    started = {event[1] for event in events if event[0] == "start"}
+    assert ("installed" in started) == list_fails
+
+    running, max_running = 0, 0
+    for event in events:
+        running += 1 if event[0] == "start" else -1
+        max_running = max(max_running, running)
+    assert max_running == 3
+
+    output = capsys.readouterr().out
+    for pkg in ("first", "second", "third", "fourth"):
+        assert f"Successfully installed package: {pkg}" in output
+    if not list_fails:
+        assert "Package already installed: installed" in output
+    # The output of failed installations comes after all steps
+    assert "Failed to install package: broken" in output
+    assert output.rindex("__: ") < output.index("No matching distribution")
+
+
+def test_install_vscode_extensions_batched(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test that extensions are installed in one call, isolating failures."""
+    code = tmp_path / "code"
+    code.write_text(
+        dedent(
+            """\
+            #!/usr/bin/env bash
+            echo "$*" >>"$FAKE_CODE_LOG"
+            if [[ "$1" == "--list-extensions" ]]; then
+            \tcat "$FAKE_CODE_STATE"
+            \texit 0
+            fi
+            rc=0
+            while [[ $# -gt 0 ]]; do
+            \tif [[ "$2" == broken* ]]; then
+            \t\trc=1
+            \telse
+            \t\techo "$2@1.0.0" >>"$FAKE_CODE_STATE"
+            \tfi
+            \tshift 2
+            done
+            exit $rc
+        """
+        )
+    )
+    code.chmod(0o755)
+    log, state = tmp_path / "code.log", tmp_path / "code.state"
+    state.write_text("publisher.installed@2.0.0\n")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_CODE_LOG", str(log))
+    monkeypatch.setenv("FAKE_CODE_STATE", str(state))
+    package_state._INSTALLED_PACKAGES_CACHE.clear()
+
+    install_packages_from_list(
+        InstallCommands.VSC_EXT,
+        ["Publisher.Installed", "publisher.a", "broken.b", "publisher.c"],
+    )
+
+    assert log.read_text().splitlines() == [
+        "--list-extensions --show-versions",
+        "--install-extension publisher.a --install-extension broken.b "
+        "--install-extension publisher.c",
+        "--list-extensions --show-versions",
+        "--install-extension broken.b",
+    ]
+    output = capsys.readouterr().out
+    assert "Package already installed: Publisher.Installed" in output
+    assert "Successfully installed package: publisher.a" in output
+    assert "Successfully installed package: publisher.c" in output
+    assert "Failed to install package: broken.b" in output
@@ -0,0 +1,63 @@
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from gurk.core import logger as logger_module
+from gurk.core.logger import Logger
+from gurk.utils.logger import TaskTerminationType
+from gurk.utils.report import JUNIT_FILE, REPORT_FILE
+
+
+@pytest.fixture
+def logdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Log directory of a run with a succeeded, failed and skipped task."""
+    monkeypatch.setattr(logger_module, "PACKAGE_LOGS_PATH", tmp_path)
+    with Logger(False, "json") as logger:
+        logger.create_log_dir()
+        for name, status, exit_code in (
+            ("install-pip", TaskTerminationType.SUCCESS, 0),
+            ("install-docker", TaskTerminationType.FAILURE, 100),
+            ("configure-docker", TaskTerminationType.SKIPPED, None),
+        ):
+            task_id = logger.add_task(name, total=3)
+            if exit_code is not None:
+                logger.generate_logfile_path(task_id)
+                logger.update_task(task_id, "Installing")
+                logger.set_exit_code(task_id, exit_code)
+            logger.finish_task(task_id, status)
+    return logger.logdir
+
+
+def test_report_json(logdir: Path) -> None:
+    """Test that the JSON report holds the details of every task."""
+    report = json.loads((logdir / REPORT_FILE).read_text())
+    assert report["counts"] == {"Success": 1, "Failure": 1, "Skipped": 1}
+    assert report["duration"] >= 0
+
+    pip, docker, skipped = report["tasks"]
+    assert pip["status"] == "Success" and pip["exit_code"] == 0
+    assert (pip["steps"], pip["total_steps"]) == (1, 2)
+    assert pip["finished"] - pip["started"] == pytest.approx(
+        pip["duration"], abs=1e-3
+    )
+    assert pip["logfile"] == str(logdir / "install-pip.log")
+    assert docker["exit_code"] == 100
+    assert skipped["exit_code"] is None and skipped["logfile"] is None
+
+
+def test_report_junit(logdir: Path) -> None:
+    """Test that every task is a test case of the JUnit report."""
+    suite = ET.parse(logdir / JUNIT_FILE).getroot().find("testsuite")
+    assert (suite.get("tests"), suite.get("failures")) == ("3", "1")
+    assert suite.get("skipped") == "1" and suite.get("errors") == "0"
+
+    pip, docker, skipped = suite.findall("testcase")
+    assert pip.get("name") == "install-pip" and float(pip.get("time")) >= 0
+    assert pip.find("failure") is None and pip.find("skipped") is None
+    assert docker.find("failure").get("message") == "Exit code 100"
+    assert skipped.find("skipped") is not None
+    assert {
+        prop.get("name"): prop.get("value") for prop in docker.iter("property")
+    }["exit_code"] == "100"